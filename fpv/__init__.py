@@ -0,0 +1,39 @@
+"""
+fpv — importable pipeline for the FIFA player valuation project.
+
+Public names are resolved lazily (PEP 562), so `import fpv` or
+`python -m fpv predict ...` does not pay for pandas / scikit-learn until
+a submodule actually needs them.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'CATEGORICAL_COLS':       'features',
+    'ENGINEERED_COLS':        'features',
+    'NUMERIC_COLS':           'features',
+    'RAW_COLUMNS':            'features',
+    'TARGET_COLS':            'features',
+    'FeatureTransformer':     'features',
+    'build_targets':          'features',
+    'compute_fpvi':           'features',
+    'iter_chunks':            'features',
+    'CategoricalTransformer': 'encoding',
+    'FeatureStore':           'store',
+    'write_store':            'store',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
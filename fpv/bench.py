@@ -0,0 +1,355 @@
+"""
+Reproducible benchmark suite for the pipeline stages and model inference.
+
+For every table size (synthetic players in the CSV schema, see
+`fpv.synthetic`) each stage is timed separately:
+
+    generate      synthetic table
+    features      FeatureTransformer fit + transform (02_features)
+    targets       log targets + FPVI
+    encoding      categorical codes + sparse CSR one-hots
+    fit:<model>   each 03 MODEL_SPECS estimator on the log-FPVI target
+    predict       Scorer.score with the saved regressor + classifier
+    shap          exact TreeSHAP of the saved regressor
+    kmeans_sweep  05 k = 2..8 sweep on the perf features
+
+Recorded per stage: wall clock (min and median over `--repeat` runs),
+rows/s, peak RSS and RSS growth, sampled from a background thread. Model
+fits, SHAP and the KMeans sweep are capped at `--max-*-rows`; the capped
+row count is what the result reports.
+
+Results go to JSON together with the library versions and git commit.
+`--baseline` compares against a saved run, prints the slowdown factors and
+exits non-zero when a stage got slower or heavier than the tolerance.
+
+Run: python -m fpv.bench --sizes 10k 100k --baseline outputs/bench/baseline.json
+     python -m fpv.bench --sizes 10k --stages features predict --save-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .config import OUTPUTS_DIR, RANDOM_STATE, ROOT_DIR
+
+BENCH_DIR     = OUTPUTS_DIR / 'bench'
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+LATEST_PATH   = BENCH_DIR / 'latest.json'
+SIZE_SUFFIX   = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500."""
+    text = str(text).strip().lower()
+    if text[-1] in SIZE_SUFFIX:
+        return int(float(text[:-1]) * SIZE_SUFFIX[text[-1]])
+    return int(text)
+
+
+# ── Memory sampling ───────────────────────────────────────────────────────────
+
+def current_rss():
+    """Resident set size in bytes (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RSSSampler:
+    """Context manager that tracks the peak RSS of this process while active."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start = self.peak = 0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.start = self.peak = current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+# ── Stages ────────────────────────────────────────────────────────────────────
+
+class Context:
+    """Lazily built inputs shared by the stages of one table size."""
+
+    def __init__(self, n_rows, seed, caps):
+        self.n_rows = n_rows
+        self.seed   = seed
+        self.caps   = caps
+        self._cache = {}
+
+    def get(self, key):
+        if key not in self._cache:
+            self._cache[key] = getattr(self, f'_build_{key}')()
+        return self._cache[key]
+
+    def _build_df(self):
+        from .synthetic import generate
+        return generate(self.n_rows, self.seed)
+
+    def _build_X(self):
+        from .features import FeatureTransformer
+        df = self.get('df')
+        return FeatureTransformer().fit(df).transform_frame(df)
+
+    def _build_y(self):
+        from .features import build_targets
+        return build_targets(self.get('df'), self.seed)['log_fpvi'].to_numpy()
+
+    def _build_fit_data(self):
+        n = min(self.n_rows, self.caps['fit'])
+        return self.get('X').iloc[:n], self.get('y')[:n]
+
+    def _build_fit_data_sc(self):
+        from sklearn.preprocessing import StandardScaler
+        X, y = self.get('fit_data')
+        return StandardScaler().fit_transform(X), y
+
+    def _build_scorer(self):
+        from .predict import Scorer
+        return Scorer.from_paths()
+
+    def _build_regressor(self):
+        from .predict import REGRESSOR_PATH, load_bundle
+        return load_bundle(REGRESSOR_PATH)
+
+    def _build_X_perf(self):
+        from .clustering import PERF_FEATURES
+        from sklearn.preprocessing import StandardScaler
+        X = self.get('X')[PERF_FEATURES].iloc[:min(self.n_rows, self.caps['cluster'])]
+        return StandardScaler().fit_transform(X)
+
+    def drop(self, *keys):
+        for key in keys:
+            self._cache.pop(key, None)
+
+
+def _stage_generate(ctx):
+    ctx.drop('df', 'X', 'y')
+    return len(ctx.get('df'))
+
+
+def _stage_features(ctx):
+    from .features import FeatureTransformer
+    return len(FeatureTransformer().fit_transform(ctx.get('df')))
+
+
+def _stage_targets(ctx):
+    from .features import build_targets
+    return len(build_targets(ctx.get('df'), ctx.seed))
+
+
+def _stage_encoding(ctx):
+    from .encoding import CategoricalTransformer
+    ct = CategoricalTransformer().fit(ctx.get('df'))
+    ct.transform(ctx.get('df'))
+    return ct.transform_sparse(ctx.get('df')).shape[0]
+
+
+def _fit_stage(name):
+    def run(ctx):
+        from .zoo import model_specs
+        _, model, scaled = next(s for s in model_specs(ctx.seed) if s[0] == name)
+        X, y = ctx.get('fit_data_sc' if scaled else 'fit_data')
+        model.fit(X, y)
+        return len(X)
+    return run
+
+
+def _stage_predict(ctx):
+    return len(ctx.get('scorer').score(ctx.get('df')))
+
+
+def _stage_shap(ctx):
+    from .explain import compute_shap
+    bundle = ctx.get('regressor')
+    X = ctx.get('X').reindex(columns=bundle['feature_cols'], fill_value=0.0)
+    X = X.iloc[:min(ctx.n_rows, ctx.caps['shap'])]
+    return len(compute_shap(bundle['model'], X, 'exact')[0])
+
+
+def _stage_kmeans_sweep(ctx):
+    from .clustering import sweep
+    X = ctx.get('X_perf')
+    sweep(X, range(2, 9), n_init=ctx.caps['n_init'], sample_size=2000, n_repeats=3,
+          seed=ctx.seed)
+    return len(X)
+
+
+FIT_MODELS = ['Ridge', 'Random Forest', 'Gradient Boosting', 'XGBoost', 'LightGBM']
+
+# stage -> (context inputs built before the clock starts, stage function)
+STAGES = {
+    'generate':     ((), _stage_generate),
+    'features':     (('df',), _stage_features),
+    'targets':      (('df',), _stage_targets),
+    'encoding':     (('df',), _stage_encoding),
+    **{f'fit:{m}': (('fit_data', 'fit_data_sc'), _fit_stage(m)) for m in FIT_MODELS},
+    'predict':      (('df', 'scorer'), _stage_predict),
+    'shap':         (('X', 'regressor'), _stage_shap),
+    'kmeans_sweep': (('X_perf',), _stage_kmeans_sweep),
+}
+
+
+def time_stage(stage, ctx, repeat=1):
+    """Run one stage `repeat` times; returns timing and memory figures."""
+    needs, fn = STAGES[stage]
+    for key in needs:                                   # setup is not timed
+        ctx.get(key)
+    seconds, rows, peak, start = [], 0, 0, None
+    for _ in range(repeat):
+        with RSSSampler() as mem:
+            t0 = time.perf_counter()
+            rows = fn(ctx)
+            seconds.append(time.perf_counter() - t0)
+        start = mem.start if start is None else min(start, mem.start)
+        peak = max(peak, mem.peak)
+    best = min(seconds)
+    return {'rows': int(rows), 'seconds': best, 'seconds_median': float(np.median(seconds)),
+            'seconds_all': seconds, 'rows_per_s': rows / best if best else None,
+            'peak_rss_mb': peak / 2 ** 20, 'rss_delta_mb': (peak - start) / 2 ** 20}
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def environment():
+    import sklearn
+
+    versions = {'python': platform.python_version(), 'numpy': np.__version__,
+                'scikit-learn': sklearn.__version__}
+    for lib in ('pandas', 'lightgbm', 'xgboost', 'shap'):
+        try:
+            versions[lib] = __import__(lib).__version__
+        except ImportError:
+            versions[lib] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'platform': platform.platform(), 'machine': platform.machine(),
+            'cpu_count': os.cpu_count(), 'git_commit': commit or None, 'versions': versions}
+
+
+def run(sizes, stages=tuple(STAGES), repeat=1, seed=RANDOM_STATE, max_fit_rows=100_000,
+        max_shap_rows=20_000, max_cluster_rows=50_000, n_init=20, verbose=True):
+    """Benchmark `stages` at every size; returns the JSON-serialisable report."""
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f'Unknown stages {sorted(unknown)}; choose from {list(STAGES)}')
+    caps = {'fit': max_fit_rows, 'shap': max_shap_rows, 'cluster': max_cluster_rows,
+            'n_init': n_init}
+    results = []
+    for n_rows in sizes:
+        ctx = Context(n_rows, seed, caps)
+        for stage in stages:
+            rec = {'stage': stage, 'size': n_rows, **time_stage(stage, ctx, repeat)}
+            results.append(rec)
+            if verbose:
+                print(f'{n_rows:>10,} {stage:<22} {rec["seconds"]:9.3f}s '
+                      f'{rec["rows_per_s"] or 0:>14,.0f} rows/s  '
+                      f'peak {rec["peak_rss_mb"]:8.1f} MB (+{rec["rss_delta_mb"]:.1f})',
+                      flush=True)
+        del ctx
+    return {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': seed, 'repeat': repeat,
+            'caps': caps, 'environment': environment(), 'results': results}
+
+
+def compare(report, baseline, time_tol=0.15, mem_tol=0.20, min_seconds=0.05, min_mb=32):
+    """
+    Per-(stage, size) ratios against a baseline report. A stage regresses
+    when it is more than `time_tol` slower (ignoring stages under
+    `min_seconds` in both runs) or its RSS growth is more than `mem_tol`
+    higher and at least `min_mb` larger (allocator noise is tens of MB).
+    """
+    base = {(r['stage'], r['size']): r for r in baseline['results']}
+    rows = []
+    for r in report['results']:
+        b = base.get((r['stage'], r['size']))
+        if b is None:
+            continue
+        t_ratio = r['seconds'] / b['seconds'] if b['seconds'] else float('inf')
+        m_ratio = (r['rss_delta_mb'] + 1) / (b['rss_delta_mb'] + 1)     # +1 MB: noise floor
+        slower  = t_ratio > 1 + time_tol and max(r['seconds'], b['seconds']) >= min_seconds
+        heavier = (m_ratio > 1 + mem_tol
+                   and r['rss_delta_mb'] - b['rss_delta_mb'] >= min_mb)
+        rows.append({'stage': r['stage'], 'size': r['size'], 'seconds': r['seconds'],
+                     'baseline_seconds': b['seconds'], 'time_ratio': t_ratio,
+                     'memory_ratio': m_ratio, 'regression': slower or heavier,
+                     'reason': ', '.join(x for x, hit in (('slower', slower),
+                                                          ('more memory', heavier)) if hit)})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.bench', description='Pipeline benchmark suite.')
+    parser.add_argument('--sizes', nargs='+', default=['10k', '100k'],
+                        help='table sizes, e.g. 10k 100k 1M 10M')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), metavar='STAGE',
+                        help=f'subset of: {", ".join(STAGES)}')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--max-fit-rows', type=int, default=100_000)
+    parser.add_argument('--max-shap-rows', type=int, default=20_000)
+    parser.add_argument('--max-cluster-rows', type=int, default=50_000)
+    parser.add_argument('--n-init', type=int, default=20, help='KMeans restarts in the sweep')
+    parser.add_argument('--out', default=str(LATEST_PATH))
+    parser.add_argument('--baseline', help='compare against this report')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'also write the results to {BASELINE_PATH}')
+    parser.add_argument('--time-tol', type=float, default=0.15)
+    parser.add_argument('--mem-tol', type=float, default=0.20)
+    parser.add_argument('--min-mb', type=float, default=32,
+                        help='ignore RSS growth differences smaller than this')
+    args = parser.parse_args(argv)
+
+    report = run([parse_size(s) for s in args.sizes], args.stages, args.repeat, args.seed,
+                 args.max_fit_rows, args.max_shap_rows, args.max_cluster_rows, args.n_init)
+    paths = [Path(args.out)] + ([BASELINE_PATH] if args.save_baseline else [])
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f'Saved → {path}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.time_tol, args.mem_tol, min_mb=args.min_mb)
+        print(f'\nvs baseline {baseline["environment"].get("git_commit")} '
+              f'({baseline["created"]}):')
+        for r in rows:
+            flag = f'  REGRESSION ({r["reason"]})' if r['regression'] else ''
+            print(f'{r["size"]:>10,} {r["stage"]:<22} {r["baseline_seconds"]:8.3f}s → '
+                  f'{r["seconds"]:8.3f}s  ×{r["time_ratio"]:.2f} time  '
+                  f'×{r["memory_ratio"]:.2f} mem{flag}')
+        if any(r['regression'] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Single entry point for the pipeline: `python -m fpv <command> [args...]`.
+
+    features   build outputs/feature_store/ from the raw CSV   (fpv.store)
+    train      regression leaderboards, cached                 (fpv.zoo)
+    predict    batch FPVI + transfer-risk scoring              (fpv.predict)
+    explain    batched, cached SHAP values                     (fpv.explain)
+    cluster    archetype discovery                             (fpv.clustering)
+    figures    incremental render of outputs/*.png             (fpv.figures)
+    report     incremental report/presentation.pptx            (fpv.report)
+    pipeline   all of the above as a cached, parallel DAG      (fpv.pipeline)
+
+plus pass-through commands for the other tools (serve, tune, bench, ...).
+Each command's module is imported only when that command runs, and the
+modules themselves import scikit-learn / shap / boosters inside the
+functions that use them, so e.g. `predict` never loads shap or matplotlib.
+
+`--profile-startup` reruns the command under `python -X importtime` and
+prints where the import time went, grouped by top-level package.
+
+`--trace PATH` records the fpv.trace spans of the command (timings, row
+counts, peak memory, including pool workers) as a Chrome trace, or as span
+JSON with `--trace-format json`, and prints a per-span summary. `--profile
+DIR` writes a cProfile dump for the command and for each pipeline stage.
+
+Run: python -m fpv --profile-startup predict players.csv -o predictions.csv
+     python -m fpv --trace outputs/trace.json --profile outputs/profiles pipeline
+"""
+
+import argparse
+import importlib
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+COMMANDS = {                          # name -> (module, help)
+    'features':       ('fpv.store',          'build the feature store from the raw CSV'),
+    'train':          ('fpv.zoo',            'fit the MODEL_SPECS regression leaderboards'),
+    'predict':        ('fpv.predict',        'batch FPVI + transfer-risk scoring'),
+    'explain':        ('fpv.explain',        'batched, cached SHAP explanations'),
+    'cluster':        ('fpv.clustering',     'archetype discovery'),
+    'figures':        ('fpv.figures',        'render stale outputs/*.png figures'),
+    'report':         ('fpv.report',         'build report/presentation.pptx (or per-club decks)'),
+    'pipeline':       ('fpv.pipeline',       'run the stage DAG, re-executing only invalidated stages'),
+    'schema':         ('fpv.schema',         'compact-dtype memory and metric report'),
+    'cv':             ('fpv.cv',             'k-fold CV of every model with out-of-fold predictions'),
+    'stack':          ('fpv.stacking',       'stacked ensemble of the leaderboard models'),
+    'fused':          ('fpv.fused',          'one-pass FPVI + market value + risk models'),
+    'serve':          ('fpv.serve',          'local scoring service'),
+    'tune':           ('fpv.tuning',         'successive-halving search'),
+    'early-stopping': ('fpv.early_stopping', 'refit a bundle with early stopping'),
+    'update':         ('fpv.incremental',    'apply a delta of new / changed players'),
+    'neighbors':      ('fpv.neighbors',      'comparable-player index'),
+    'synthetic':      ('fpv.synthetic',      'synthetic player data'),
+    'bench':          ('fpv.bench',          'stage benchmarks'),
+    'flat':           ('fpv.flat',           'flat-array model export'),
+}
+HEAVY = ('pandas', 'sklearn', 'scipy', 'xgboost', 'lightgbm', 'shap',
+         'matplotlib', 'seaborn', 'pptx')
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)')
+
+
+def run_command(name, argv):
+    """Import the command's module and hand it the remaining arguments."""
+    module, _ = COMMANDS[name]
+    return importlib.import_module(module).main(argv)
+
+
+# ── Startup profiling ─────────────────────────────────────────────────────────
+
+def parse_importtime(lines):
+    """
+    (self µs by top-level package, set of imported module names) from
+    `-X importtime` stderr lines.
+    """
+    by_package, modules = defaultdict(int), set()
+    for line in lines:
+        m = _IMPORTTIME.match(line)
+        if m:
+            by_package[m.group(4).split('.')[0]] += int(m.group(1))
+            modules.add(m.group(4))
+    return dict(by_package), modules
+
+
+def profile_startup(argv, top=15):
+    """Run `python -m fpv <argv>` with `-X importtime` and print the breakdown."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'fpv', *argv],
+                          stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - t0
+    other = [line for line in proc.stderr.splitlines()
+             if not line.startswith('import time:')]
+    if other:
+        print('\n'.join(other), file=sys.stderr)
+
+    by_package, modules = parse_importtime(proc.stderr.splitlines())
+    total = sum(by_package.values())
+    ranked = sorted(by_package.items(), key=lambda kv: -kv[1])
+    print(f'\nStartup profile: fpv {" ".join(argv)}', file=sys.stderr)
+    print(f'{"package":<24}{"ms":>10}{"share":>8}', file=sys.stderr)
+    for pkg, us in ranked[:top]:
+        print(f'{pkg:<24}{us / 1e3:>10.1f}{us / max(total, 1):>8.1%}', file=sys.stderr)
+    rest = sum(us for _, us in ranked[top:])
+    if rest:
+        print(f'{f"({len(ranked) - top} others)":<24}{rest / 1e3:>10.1f}'
+              f'{rest / max(total, 1):>8.1%}', file=sys.stderr)
+    print(f'{"imports total":<24}{total / 1e3:>10.1f}   '
+          f'({len(modules)} modules, wall {wall:.2f}s)', file=sys.stderr)
+    loaded = [p for p in HEAVY if p in by_package]
+    skipped = [p for p in HEAVY if p not in by_package]
+    print(f'heavy loaded: {", ".join(loaded) or "none"} | '
+          f'not loaded: {", ".join(skipped) or "none"}', file=sys.stderr)
+    return proc.returncode
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(
+        prog='fpv', description='FIFA player valuation pipeline.',
+        epilog='Run `fpv <command> --help` for command options.',
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='report the import-time breakdown of the command')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write timing / row / memory spans of the command to PATH')
+    parser.add_argument('--trace-format', choices=['chrome', 'json'], default='chrome',
+                        help='chrome://tracing events (default) or plain span JSON')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='write a cProfile dump per command / pipeline stage to DIR')
+    sub = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (_, help_) in COMMANDS.items():
+        sub.add_parser(name, help=help_, add_help=False)
+
+    # everything after the command name belongs to the command's own parser
+    split = next((i for i, a in enumerate(argv) if a in COMMANDS), len(argv))
+    args = parser.parse_args(argv[:split + 1])
+    rest = argv[split + 1:]
+
+    if args.profile_startup:
+        sys.exit(profile_startup([args.command, *rest]))
+    if not (args.trace or args.profile):
+        return run_command(args.command, rest)
+    return run_traced(args.command, rest, args.trace, args.trace_format, args.profile)
+
+
+def run_traced(name, argv, path=None, fmt='chrome', profile_dir=None):
+    """`run_command` under an fpv.trace tracer; exports the spans on the way out."""
+    from . import trace
+
+    tracer = trace.enable(profile_dir=profile_dir)
+    try:
+        with trace.span(f'command:{name}', profile=True):
+            return run_command(name, argv)
+    finally:
+        trace.disable()
+        print(f'\n{tracer.summary()}', file=sys.stderr)
+        if path:
+            (tracer.write_json if fmt == 'json' else tracer.write_chrome)(path)
+            print(f'trace → {path}', file=sys.stderr)
+        if profile_dir:
+            print(f'cProfile dumps → {profile_dir}/', file=sys.stderr)
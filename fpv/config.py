@@ -0,0 +1,12 @@
+"""
+Shared paths and constants for the FIFA player valuation pipeline.
+"""
+
+from pathlib import Path
+
+ROOT_DIR    = Path(__file__).resolve().parent.parent
+DATA_PATH   = ROOT_DIR / 'data' / 'fifa_player_performance_market_value.csv'
+OUTPUTS_DIR = ROOT_DIR / 'outputs'
+
+RANDOM_STATE = 42
+CLASSES      = ['Low', 'Medium', 'High']
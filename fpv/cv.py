@@ -0,0 +1,262 @@
+"""
+K-fold cross-validation for every model and target, on fold arrays built once.
+
+03_regression cross-validates only `best_tree`: it concatenates the three
+splits and passes DataFrames to `cross_val_score`, so each estimator
+re-slices and re-converts the frame for every fold. 04 imports
+`StratifiedKFold` but never uses it. This module CVs the MODEL_SPECS and
+classifier specs on the same pooled rows (`X_train + X_val + X_test`):
+
+    fold cache    KFold (regression) / StratifiedKFold (risk) indices, and
+                  per fold a C-contiguous float32 train / test block for the
+                  tree models plus a fold-fitted standardised float64 block
+                  for the linear ones, written once under `outputs/cv_cache/`
+                  and memory-mapped by every worker
+    tasks         (model × fold) cells fanned out over a process pool with
+                  the zoo's per-worker thread budgets
+    results       per-fold metrics, fit / predict seconds, and out-of-fold
+                  predictions (log target or class probabilities) per model
+
+The cache is keyed by a hash of the pooled data, the fold count and the seed,
+so a rerun with unchanged data goes straight to fitting.
+
+Run: python -m fpv.cv --task fpvi --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import OUTPUTS_DIR, RANDOM_STATE
+from .store import SPLITS, STORE_DIR, FeatureStore, _save
+from .trace import pool_map, span
+from .zoo import (array_hash, classifier_specs, model_specs, score_classification,
+                  score_regression, set_threads, thread_budget)
+
+CV_CACHE_DIR = OUTPUTS_DIR / 'cv_cache'
+
+# task -> (kind, fit-target key prefix, score-target key prefix)
+CV_TASKS = {
+    'market_value': ('regression',     'y_mv_log',   'y_mv_raw'),
+    'fpvi':         ('regression',     'y_fpvi_log', 'y_fpvi_raw'),
+    'risk':         ('classification', 'y_cls',      'y_cls'),
+}
+
+
+# ── Fold cache ────────────────────────────────────────────────────────────────
+
+def pooled(store, task):
+    """The notebook's `X_full` / `y_full`: train, val and test rows stacked."""
+    _, fit_key, score_key = CV_TASKS[task]
+    sfx = [s for _, s in SPLITS.values()]
+    X = np.concatenate([store.array(x) for x, _ in SPLITS.values()])
+    y_fit = np.concatenate([store.array(f'{fit_key}_{s}') for s in sfx])
+    y_score = np.concatenate([store.array(f'{score_key}_{s}') for s in sfx])
+    index = np.concatenate([store.index(split) for split in SPLITS])
+    return X, y_fit, y_score, index
+
+
+def fold_ids(y, kind, n_splits, seed):
+    """Test-fold number of every row (stratified on the class for `risk`)."""
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    cv = (StratifiedKFold if kind == 'classification' else KFold)(
+        n_splits=n_splits, shuffle=True, random_state=seed)
+    ids = np.empty(len(y), dtype=np.int8)
+    for k, (_, te) in enumerate(cv.split(np.zeros(len(y)), y)):
+        ids[te] = k
+    return ids
+
+
+def build_folds(store, task, n_splits=5, seed=RANDOM_STATE, cache_dir=CV_CACHE_DIR):
+    """
+    Materialise the fold arrays for `task` (or reuse them) and return the
+    cache directory. Each fold `k` gets `k_X_tr` / `k_X_te` (float32, trees),
+    `k_Xs_tr` / `k_Xs_te` (standardised on the fold's own training rows),
+    `k_y_tr`, `k_y_te` (fit target) and `k_s_te` (score target).
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    kind = CV_TASKS[task][0]
+    X, y_fit, y_score, index = pooled(store, task)
+    key = hashlib.sha256(
+        f'{task}-{n_splits}-{seed}-{array_hash(X, y_fit, y_score)}'.encode()).hexdigest()[:16]
+    path = Path(cache_dir) / f'{task}-{key}'
+    if (path / 'meta.json').exists():
+        return path
+
+    tmp = path.with_name(f'.{path.name}.tmp')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    ids = fold_ids(y_fit, kind, n_splits, seed)
+    X32 = np.ascontiguousarray(X, dtype=np.float32)
+    for k in range(n_splits):
+        tr, te = np.flatnonzero(ids != k), np.flatnonzero(ids == k)
+        scaler = StandardScaler().fit(X[tr])
+        arrays = {'X_tr': X32[tr], 'X_te': X32[te],
+                  'Xs_tr': scaler.transform(X[tr]), 'Xs_te': scaler.transform(X[te]),
+                  'y_tr': y_fit[tr], 'y_te': y_fit[te], 's_te': y_score[te], 'rows': te}
+        for name, arr in arrays.items():
+            _save(tmp / f'{k}_{name}.npy', np.ascontiguousarray(arr))
+    _save(tmp / 'fold_id.npy', ids)
+    _save(tmp / 'index.npy', index)
+    _save(tmp / 'y_fit.npy', y_fit)
+    _save(tmp / 'y_score.npy', y_score)
+    with open(tmp / 'meta.json', 'w') as f:        # written last: marks the cache complete
+        json.dump({'task': task, 'kind': kind, 'n_splits': n_splits, 'seed': seed,
+                   'rows': len(ids), 'feature_cols': store.feature_cols}, f, indent=1)
+    try:
+        tmp.replace(path)
+    except OSError:                                # a concurrent run got there first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def _load(path, k, name):
+    return np.load(Path(path) / f'{k}_{name}.npy', mmap_mode='r')
+
+
+# ── Folds × models ────────────────────────────────────────────────────────────
+
+def _fold_task(job):
+    """Worker: fit one model on one fold; returns metrics, timings and predictions."""
+    from sklearn.base import clone
+
+    name, model, scaled, kind, k, path, n_threads = job
+    with open(Path(path) / 'meta.json') as f:
+        cols = json.load(f)['feature_cols']
+    x = 'Xs' if scaled else 'X'
+    X_tr = pd.DataFrame(_load(path, k, f'{x}_tr'), columns=cols, copy=False)
+    X_te = pd.DataFrame(_load(path, k, f'{x}_te'), columns=cols, copy=False)
+
+    model = set_threads(clone(model), n_threads)
+    t0 = time.perf_counter()
+    with span(f'fit:{name}', rows=len(X_tr), fold=k):
+        model.fit(X_tr, _load(path, k, 'y_tr'))
+    t1 = time.perf_counter()
+    with span(f'predict:{name}', rows=len(X_te), fold=k):
+        pred = model.predict_proba(X_te) if kind == 'classification' else model.predict(X_te)
+    t2 = time.perf_counter()
+
+    y_score = np.asarray(_load(path, k, 's_te'))
+    metrics = (score_classification(y_score, pred) if kind == 'classification'
+               else score_regression(y_score, pred))
+    return {'Model': name, 'fold': k, 'rows': len(X_te), 'fit_seconds': t1 - t0,
+            'predict_seconds': t2 - t1, **metrics, 'pred': pred}
+
+
+def cross_validate(task='fpvi', store_path=STORE_DIR, n_splits=5, workers=1, specs=None,
+                   seed=RANDOM_STATE, cache_dir=CV_CACHE_DIR, n_threads=None):
+    """
+    Cross-validate every spec on `task`. Returns a dict with
+
+        folds    DataFrame, one row per (model, fold): metrics and timings
+        summary  DataFrame, per model: fold mean ± std and out-of-fold metrics
+        oof      {model: out-of-fold predictions in pooled row order}
+        y, y_score, fold_id, index   pooled targets, fold numbers, row labels
+        prepare_seconds              time spent building (or finding) the folds
+    """
+    kind = CV_TASKS[task][0]
+    store = FeatureStore(store_path)
+    if specs is None:
+        rs = store['random_state'] or RANDOM_STATE
+        specs = model_specs(rs) if kind == 'regression' else classifier_specs(rs)
+
+    t0 = time.perf_counter()
+    with span('cv.folds', task=task):
+        path = build_folds(store, task, n_splits, seed, cache_dir)
+    prepare_s = time.perf_counter() - t0
+
+    n_threads = n_threads or thread_budget(workers)
+    jobs = [(name, model, scaled, kind, k, str(path), n_threads)
+            for name, model, scaled in specs for k in range(n_splits)]
+    if workers <= 1:
+        cells = [_fold_task(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            cells = pool_map(pool, _fold_task, jobs)
+
+    fold_id = np.load(path / 'fold_id.npy')
+    y, y_score = np.load(path / 'y_fit.npy'), np.load(path / 'y_score.npy')
+    oof = {}
+    for c in cells:
+        pred = c.pop('pred')
+        if c['Model'] not in oof:
+            oof[c['Model']] = np.empty((len(y),) + pred.shape[1:])
+        oof[c['Model']][np.load(path / f'{c["fold"]}_rows.npy')] = pred
+
+    folds = pd.DataFrame(cells)
+    return {'folds': folds, 'summary': summarize(folds, oof, y_score, kind), 'oof': oof,
+            'y': y, 'y_score': y_score, 'fold_id': fold_id,
+            'index': np.load(path / 'index.npy'), 'prepare_seconds': prepare_s}
+
+
+def summarize(folds, oof, y_score, kind):
+    """Per-model fold mean / std of each metric, OOF metrics and total fit time."""
+    metrics = [c for c in folds.columns
+               if c not in ('Model', 'fold', 'rows', 'fit_seconds', 'predict_seconds')]
+    score = score_classification if kind == 'classification' else score_regression
+    rows = []
+    for name, g in folds.groupby('Model', sort=False):
+        row = {'Model': name}
+        for m in metrics:
+            row[f'{m} mean'], row[f'{m} std'] = g[m].mean(), g[m].std(ddof=0)
+        row.update({f'OOF {m}': v for m, v in score(y_score, oof[name]).items()})
+        row['fit s'], row['predict s'] = g['fit_seconds'].sum(), g['predict_seconds'].sum()
+        rows.append(row)
+    key, asc = ('Macro F1 mean', False) if kind == 'classification' else ('RMSE mean', True)
+    return pd.DataFrame(rows).sort_values(key, ascending=asc)
+
+
+def save_oof(result, path):
+    """Out-of-fold predictions, targets and fold numbers as one .npz (for stacking)."""
+    np.savez(path, y=result['y'], y_score=result['y_score'], fold_id=result['fold_id'],
+             index=result['index'], **{f'oof_{m}': p for m, p in result['oof'].items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.cv',
+                                     description='K-fold CV of every model on a shared fold cache.')
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--task', choices=list(CV_TASKS), default='fpvi')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--model', action='append',
+                        help='restrict to one model by name (repeatable)')
+    parser.add_argument('--cache-dir', default=str(CV_CACHE_DIR))
+    parser.add_argument('--oof', metavar='NPZ', help='write out-of-fold predictions here')
+    args = parser.parse_args(argv)
+
+    specs = None
+    if args.model:
+        rs = FeatureStore(args.store)['random_state'] or RANDOM_STATE
+        all_specs = (model_specs(rs) if CV_TASKS[args.task][0] == 'regression'
+                     else classifier_specs(rs))
+        unknown = set(args.model) - {n for n, _, _ in all_specs}
+        if unknown:
+            parser.error(f'unknown model(s) for {args.task}: {", ".join(sorted(unknown))}')
+        specs = [s for s in all_specs if s[0] in args.model]
+
+    t0 = time.perf_counter()
+    res = cross_validate(args.task, args.store, args.folds, args.workers, specs,
+                         args.seed, args.cache_dir)
+    with pd.option_context('display.width', 200, 'display.max_columns', 30):
+        print(res['summary'].round(4).to_string(index=False))
+    if args.oof:
+        save_oof(res, args.oof)
+        print(f'out-of-fold predictions → {args.oof}')
+    print(f'\n{args.folds} folds × {len(res["oof"])} models in '
+          f'{time.perf_counter() - t0:.1f}s (fold arrays {res["prepare_seconds"]:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
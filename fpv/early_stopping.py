@@ -0,0 +1,178 @@
+"""
+Early stopping on the 02_features validation split.
+
+`X_val` / `y_*_val` are built by 02_features but never used by 03 or 04:
+every booster trains to its full round count. `fit_early_stopping` monitors
+the validation split instead and stops once it has not improved for
+`rounds` iterations, then trims the ensemble to the best iteration so the
+saved model is smaller and `predict` evaluates fewer trees.
+
+- XGBoost   native `early_stopping_rounds` + `eval_set`, booster sliced
+- LightGBM  `lgb.early_stopping` callback, booster rebuilt at best iteration
+- sklearn GradientBoosting  grown in `step`-tree increments with
+            `warm_start`, monitored on the validation split, truncated
+- anything else (Ridge, Random Forest, LogisticRegression) is fitted as-is
+
+Run: python -m fpv.early_stopping --task regression --out outputs/best_regressor.pkl
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from .config import CLASSES, OUTPUTS_DIR, RANDOM_STATE
+from .store import STORE_DIR, FeatureStore
+
+DEFAULT_ROUNDS = 50
+
+
+def _library(model):
+    return type(model).__module__.split('.')[0]
+
+
+def _is_classifier(model):
+    return getattr(model, '_estimator_type', None) == 'classifier' or \
+        type(model).__name__.endswith('Classifier')
+
+
+def _val_loss(model, pred, y_val):
+    """Validation loss of a staged prediction: L2 (regression) or log-loss."""
+    if _is_classifier(model):
+        p = np.clip(pred[np.arange(len(y_val)), np.asarray(y_val, dtype=int)], 1e-15, None)
+        return float(-np.log(p).mean())
+    return float(np.mean((np.asarray(y_val) - pred) ** 2))
+
+
+def _fit_xgboost(model, X_tr, y_tr, X_val, y_val, rounds):
+    model.set_params(early_stopping_rounds=rounds)
+    model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)], verbose=False)
+    best = int(model.best_iteration) + 1
+    model._Booster = model.get_booster()[:best]
+    model.set_params(n_estimators=best, early_stopping_rounds=None)
+    return best
+
+
+def _fit_lightgbm(model, X_tr, y_tr, X_val, y_val, rounds):
+    import lightgbm as lgb
+
+    model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)],
+              callbacks=[lgb.early_stopping(rounds, verbose=False)])
+    best = int(model.best_iteration_) or model.booster_.current_iteration()
+    model._Booster = lgb.Booster(model_str=model.booster_.model_to_string(num_iteration=best))
+    model.set_params(n_estimators=best)
+    return best
+
+
+def _fit_sklearn_gbm(model, X_tr, y_tr, X_val, y_val, rounds, step=25):
+    """Grow a GradientBoosting* model with warm_start until the val loss stalls."""
+    max_rounds = model.n_estimators
+    staged = model.staged_predict_proba if _is_classifier(model) else model.staged_predict
+    model.set_params(warm_start=True)
+
+    losses, n = [], 0
+    while n < max_rounds:
+        n = min(n + step, max_rounds)
+        model.set_params(n_estimators=n)
+        model.fit(X_tr, y_tr)
+        for pred in list(staged(X_val))[len(losses):]:
+            losses.append(_val_loss(model, pred, y_val))
+        if len(losses) - 1 - int(np.argmin(losses)) >= rounds:
+            break
+
+    best = int(np.argmin(losses)) + 1
+    model.estimators_ = model.estimators_[:best]
+    model.train_score_ = model.train_score_[:best]
+    if getattr(model, 'oob_improvement_', None) is not None:
+        model.oob_improvement_ = model.oob_improvement_[:best]
+    model.set_params(n_estimators=best, warm_start=False)
+    return best
+
+
+def fit_early_stopping(model, X_tr, y_tr, X_val, y_val, rounds=DEFAULT_ROUNDS):
+    """
+    Fit `model` with early stopping on (X_val, y_val).
+
+    Returns the best iteration count (number of trees kept), or None for
+    estimators without boosting rounds, which are simply fitted.
+    """
+    lib = _library(model)
+    if lib == 'xgboost':
+        return _fit_xgboost(model, X_tr, y_tr, X_val, y_val, rounds)
+    if lib == 'lightgbm':
+        return _fit_lightgbm(model, X_tr, y_tr, X_val, y_val, rounds)
+    if type(model).__name__.startswith('GradientBoosting'):
+        return _fit_sklearn_gbm(model, X_tr, y_tr, X_val, y_val, rounds)
+    model.fit(X_tr, y_tr)
+    return None
+
+
+# ── Retrain the saved bundles ─────────────────────────────────────────────────
+
+def retrain_bundle(task, store_path=STORE_DIR, rounds=DEFAULT_ROUNDS, name=None):
+    """
+    Refit the model named in the saved regression / classification bundle
+    (or `name`) with early stopping, returning a bundle in the same format
+    plus `best_iteration`, `early_stopping_rounds` and test metrics.
+    """
+    from .zoo import (classifier_specs, model_input, model_specs, score_classification,
+                      score_regression)
+
+    d = FeatureStore(store_path)
+    random_state = d['random_state'] or RANDOM_STATE
+    if task == 'regression':
+        bundle_path = OUTPUTS_DIR / 'best_regressor.pkl'
+        specs, y_keys = model_specs(random_state), ('y_fpvi_log_tr', 'y_fpvi_log_val')
+    else:
+        bundle_path = OUTPUTS_DIR / 'best_classifier.pkl'
+        specs, y_keys = classifier_specs(random_state), ('y_cls_tr', 'y_cls_val')
+
+    if name is None:
+        with open(bundle_path, 'rb') as f:
+            name = pickle.load(f)['name']
+    spec = next((s for s in specs if s[0] == name), None)
+    if spec is None:
+        raise ValueError(f'No {task} spec named {name!r}')
+    _, model, scaled = spec
+    X = model_input(d, scaled)
+
+    t0 = time.perf_counter()
+    best = fit_early_stopping(model, X('X_train'), d[y_keys[0]], X('X_val'), d[y_keys[1]],
+                              rounds)
+    fit_s = time.perf_counter() - t0
+
+    X_te = X('X_test')
+    if task == 'regression':
+        metrics = score_regression(d['y_fpvi_raw_te'].to_numpy(), model.predict(X_te))
+        bundle = {'model': model, 'name': name, 'task': 'FPVI'}
+    else:
+        metrics = score_classification(d['y_cls_te'].to_numpy(), model.predict_proba(X_te))
+        bundle = {'model': model, 'name': name, 'classes': CLASSES}
+    bundle.update({'feature_cols': d['feature_cols'], 'best_iteration': best,
+                   'early_stopping_rounds': rounds, 'fit_seconds': fit_s,
+                   'test_metrics': metrics})
+    return bundle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.early_stopping',
+                                     description='Retrain a saved model with early stopping.')
+    parser.add_argument('--task', choices=['regression', 'classification'], required=True)
+    parser.add_argument('--model', help='spec name (default: the one in the saved bundle)')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--out', help='where to write the bundle (default: print only)')
+    args = parser.parse_args(argv)
+
+    bundle = retrain_bundle(args.task, args.store, args.rounds, args.model)
+    print(f"{bundle['name']}: best_iteration={bundle['best_iteration']} "
+          f"fit={bundle['fit_seconds']:.1f}s  {bundle['test_metrics']}")
+    if args.out:
+        with open(args.out, 'wb') as f:
+            pickle.dump(bundle, f)
+        print(f'Saved → {args.out}')
+
+
+if __name__ == '__main__':
+    main()
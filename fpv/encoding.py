@@ -0,0 +1,110 @@
+"""
+Categorical-native and sparse encodings of the engineered feature set.
+
+The 02_features notebook one-hot encodes `position`, `nationality`, `club`
+and `position_group` into dense int64 columns whose width grows with every
+new club or country. `CategoricalTransformer` keeps those four columns as
+integer codes into a saved vocabulary instead, and can emit:
+
+- `transform`         float matrix, codes in the last 4 columns (NaN = unseen),
+                      for LightGBM with `categorical_feature=CAT_FEATURE_IDX`
+- `transform_frame`   DataFrame with fixed-category `category` dtypes, for
+                      LightGBM (auto-detected) or XGBoost `enable_categorical`
+- `transform_sparse`  SciPy CSR matrix in the one-hot `feature_cols` layout,
+                      built straight from the codes without a dense detour
+
+Unseen categories at scoring time map to missing (native) or to an all-zero
+one-hot row (sparse), so the vocabulary never has to be re-fitted.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .features import (
+    CATEGORICAL_COLS, ENGINEERED_COLS, NUMERIC_COLS,
+    FeatureTransformer, _column_getter, _n_rows,
+)
+
+DENSE_COLS      = NUMERIC_COLS + ENGINEERED_COLS
+NATIVE_COLS     = DENSE_COLS + CATEGORICAL_COLS
+CAT_FEATURE_IDX = list(range(len(DENSE_COLS), len(NATIVE_COLS)))
+
+
+class CategoricalTransformer(FeatureTransformer):
+    """
+    `FeatureTransformer` variant that keeps categoricals as vocabulary codes.
+
+    Fitting, chunked fitting and `save`/`load` of the vocabulary are inherited;
+    only the output layouts differ. `feature_cols` still describes the
+    one-hot layout produced by `transform_sparse`; `native_cols` describes
+    the code layout of `transform` / `transform_frame`.
+    """
+
+    native_cols = NATIVE_COLS
+
+    def transform(self, X, columns=None, dtype=np.float64):
+        """Dense block + one code column per categorical (NaN where unseen)."""
+        self._check_fitted()
+        get = _column_getter(X, columns)
+        out = np.empty((_n_rows(X), len(NATIVE_COLS)), dtype=dtype)
+        self._dense_block(get, out)
+        for j, col in zip(CAT_FEATURE_IDX, CATEGORICAL_COLS):
+            codes = self.codes(get, col)
+            out[:, j] = codes
+            out[codes < 0, j] = np.nan
+        return out
+
+    def transform_frame(self, X, columns=None, dtype=np.float64):
+        """DataFrame with numeric columns plus fixed-vocabulary categoricals."""
+        self._check_fitted()
+        get   = _column_getter(X, columns)
+        dense = self._dense_block(get, np.empty((_n_rows(X), len(DENSE_COLS)), dtype=dtype))
+        index = X.index if isinstance(X, pd.DataFrame) else None
+        frame = pd.DataFrame(dense, columns=DENSE_COLS, index=index)
+        for col in CATEGORICAL_COLS:
+            frame[col] = pd.Categorical.from_codes(
+                self.codes(get, col), categories=self.categories_[col])
+        return frame
+
+    def transform_sparse(self, X, columns=None, dtype=np.float64):
+        """CSR matrix in the one-hot `feature_cols` layout (unseen -> zero row)."""
+        from scipy import sparse
+
+        self._check_fitted()
+        get   = _column_getter(X, columns)
+        n     = _n_rows(X)
+        dense = self._dense_block(get, np.empty((n, len(DENSE_COLS)), dtype=dtype))
+
+        rows, cols = [], []
+        k = 0
+        for col in CATEGORICAL_COLS:
+            codes = self.codes(get, col)
+            hit   = np.flatnonzero(codes >= 0)
+            rows.append(hit)
+            cols.append(k + codes[hit])
+            k += len(self.categories_[col])
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        onehot = sparse.csr_matrix((np.ones(len(rows), dtype=dtype), (rows, cols)),
+                                   shape=(n, k))
+        return sparse.hstack([sparse.csr_matrix(dense), onehot], format='csr')
+
+
+def enable_native_categoricals(model):
+    """
+    Configure a LightGBM / XGBoost sklearn estimator to consume the
+    `category` columns of `CategoricalTransformer.transform_frame` natively.
+    """
+    name = type(model).__module__.split('.')[0]
+    if name == 'xgboost':
+        model.set_params(enable_categorical=True, tree_method='hist')
+    elif name != 'lightgbm':
+        raise TypeError(f'{type(model).__name__} has no native categorical support; '
+                        'use transform_sparse() instead')
+    return model
+
+
+def native_fit_params(model):
+    """Extra `fit` kwargs for the array output of `CategoricalTransformer.transform`."""
+    if type(model).__module__.startswith('lightgbm'):
+        return {'categorical_feature': CAT_FEATURE_IDX}
+    return {}
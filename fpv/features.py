@@ -0,0 +1,285 @@
+"""
+Feature engineering for the FIFA player valuation pipeline.
+
+Importable version of the `02_features` notebook cells: per-90 production,
+rating interactions, contract flag, position group, one-hot encoding and the
+FIFA Performance Value Index (FPVI) target.
+
+`FeatureTransformer` learns the one-hot vocabulary once and then builds the
+full `feature_cols` matrix in a single vectorized pass, writing every column
+straight into a preallocated NumPy array. It accepts pandas frames, 2-D
+object arrays in the CSV column order, or dicts of column arrays, and can
+stream over chunks so arbitrarily large exports never sit in memory at once.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from .config import CLASSES, RANDOM_STATE
+from .trace import span
+
+# --- Raw CSV schema (fifa_player_performance_market_value.csv) ---
+RAW_COLUMNS = [
+    'player_id', 'player_name', 'age', 'nationality', 'club', 'position',
+    'overall_rating', 'potential_rating', 'matches_played', 'goals', 'assists',
+    'minutes_played', 'market_value_million_eur', 'contract_years_left',
+    'injury_prone', 'transfer_risk_level',
+]
+
+NUMERIC_COLS = [
+    'age', 'overall_rating', 'potential_rating', 'matches_played',
+    'goals', 'assists', 'minutes_played', 'contract_years_left',
+]
+ENGINEERED_COLS = [
+    'goals_per_90', 'assists_per_90', 'contributions_p90', 'rating_gap',
+    'rating_x_potential', 'age_rating_ratio', 'expiring_soon', 'injury_prone_bin',
+]
+CATEGORICAL_COLS = ['position', 'nationality', 'club', 'position_group']
+TARGET_COLS      = ['market_value_million_eur', 'log_market_value',
+                    'fpvi', 'log_fpvi', 'transfer_risk_encoded']
+
+POSITION_GROUPS = {
+    'GK': 'Goalkeeper',
+    'CB': 'Defender', 'LB': 'Defender', 'RB': 'Defender',
+    'CDM': 'Midfielder', 'CM': 'Midfielder',
+    'LW': 'Attacker', 'RW': 'Attacker', 'ST': 'Attacker',
+}
+
+
+# ── Column access ─────────────────────────────────────────────────────────────
+
+def _column_getter(X, columns=None):
+    """Return a `name -> 1-D array` accessor for a frame, array or dict."""
+    if isinstance(X, pd.DataFrame):
+        return lambda name: X[name].to_numpy()
+    if isinstance(X, dict):
+        return lambda name: np.asarray(X[name])
+    arr = np.asarray(X)
+    if arr.dtype.names:                          # structured / record array
+        return lambda name: arr[name]
+    if arr.ndim != 2:
+        raise ValueError(f'Expected a 2-D array, got shape {arr.shape}')
+    columns = list(columns) if columns is not None else RAW_COLUMNS
+    if arr.shape[1] != len(columns):
+        raise ValueError(f'Array has {arr.shape[1]} columns but {len(columns)} names were given')
+    pos = {c: i for i, c in enumerate(columns)}
+    return lambda name: arr[:, pos[name]]
+
+
+def _n_rows(X):
+    if isinstance(X, dict):
+        return len(next(iter(X.values())))
+    return len(X)
+
+
+def position_group(position):
+    """Vectorized `position -> position_group` map (unknown positions -> None)."""
+    keys   = pd.Index(list(POSITION_GROUPS))
+    groups = np.array(list(POSITION_GROUPS.values()) + [None], dtype=object)
+    return groups[keys.get_indexer(np.asarray(position, dtype=object))]
+
+
+# ── Engineered features & targets ─────────────────────────────────────────────
+
+def engineer_into(get, out):
+    """
+    Write the engineered columns (ENGINEERED_COLS order) into `out`, a
+    preallocated (n, 8) view. `get` is a `name -> array` accessor.
+    """
+    num = lambda name: np.asarray(get(name), dtype=np.float64)
+    overall, pot = num('overall_rating'), num('potential_rating')
+
+    # Safe per-90 stats (floor denominator at 1 full game to prevent outliers)
+    min_games = np.maximum(num('minutes_played') / 90, 1.0)
+    goals, assists = num('goals'), num('assists')
+    np.clip(goals / min_games, 0, 4, out=out[:, 0])
+    np.clip(assists / min_games, 0, 4, out=out[:, 1])
+    np.add(out[:, 0], out[:, 1], out=out[:, 2])
+
+    np.subtract(pot, overall, out=out[:, 3])
+    np.multiply(overall, pot, out=out[:, 4])
+    np.divide(overall, num('age') + 1, out=out[:, 5])
+    out[:, 6] = num('contract_years_left') <= 1
+    out[:, 7] = get('injury_prone') == 'Yes'
+    return out
+
+
+def fpvi_raw(age, overall_rating, potential_rating, goals_per_90, assists_per_90):
+    """Noise-free FPVI: age-adjusted quality + upside premium + production."""
+    age_fac     = np.exp(-0.08 * np.maximum(0, age - 26) ** 2).clip(0.1, 1.0)
+    rating_norm = (overall_rating - 60) / 34   # 0→1 for rating range 60–94
+    pot_gap     = np.maximum(0, potential_rating - overall_rating)
+    return (
+        rating_norm * 100 * age_fac            # quality × age-prime, up to 100 M€
+        + pot_gap * 1.2 * age_fac              # development upside premium
+        + goals_per_90 * 8                     # goal-scoring threat
+        + assists_per_90 * 5                   # creativity
+    )
+
+
+def compute_fpvi(X, seed=RANDOM_STATE, columns=None):
+    """
+    FIFA Performance Value Index for raw player rows, with the notebook's
+    10 % multiplicative Gaussian noise (`seed=None` disables the noise).
+    """
+    get = _column_getter(X, columns)
+    eng = engineer_into(get, np.empty((_n_rows(X), len(ENGINEERED_COLS))))
+    num = lambda name: np.asarray(get(name), dtype=np.float64)
+    raw = fpvi_raw(num('age'), num('overall_rating'), num('potential_rating'),
+                   eng[:, 0], eng[:, 1])
+    if seed is not None:
+        raw = raw + np.random.RandomState(seed).normal(0, raw * 0.10)
+    return np.clip(raw, 0.5, 200)
+
+
+def build_targets(df, seed=RANDOM_STATE):
+    """Regression and classification targets (TARGET_COLS) for a raw frame."""
+    with span('features.targets', rows=len(df)):
+        fpvi = compute_fpvi(df, seed=seed)
+    mv   = df['market_value_million_eur'].to_numpy(dtype=np.float64)
+    risk = pd.Index(CLASSES).get_indexer(df['transfer_risk_level'].to_numpy())
+    if (risk < 0).any():
+        raise ValueError('Unknown transfer_risk_level values: '
+                         f'{sorted(set(df["transfer_risk_level"][risk < 0]))}')
+    return pd.DataFrame({
+        'market_value_million_eur': mv,
+        'log_market_value':         np.log1p(mv),
+        'fpvi':                     fpvi,
+        'log_fpvi':                 np.log1p(fpvi),
+        'transfer_risk_encoded':    risk,
+    }, index=df.index)
+
+
+# ── Fitted transformer ────────────────────────────────────────────────────────
+
+class FeatureTransformer:
+    """
+    Reusable replacement for the 02_features engineering + `get_dummies` cells.
+
+    `fit` (or repeated `partial_fit` over chunks) records the sorted category
+    vocabulary of every one-hot column; `transform` then produces the exact
+    `feature_cols` layout of the 02_features feature store. Categories unseen at fit
+    time encode as all-zero one-hot rows.
+    """
+
+    def __init__(self):
+        self.categories_ = None
+
+    # --- fitting ---
+    def partial_fit(self, X, columns=None):
+        get = _column_getter(X, columns)
+        seen = {c: set(v) for c, v in (self.categories_ or {}).items()}
+        with span('features.fit', rows=_n_rows(X)):
+            for col in CATEGORICAL_COLS:
+                vals = position_group(get('position')) if col == 'position_group' else get(col)
+                seen.setdefault(col, set()).update(v for v in pd.unique(vals) if v is not None
+                                                   and v == v)
+        self.categories_ = {c: sorted(seen[c]) for c in CATEGORICAL_COLS}
+        return self
+
+    def fit(self, X, columns=None):
+        self.categories_ = None
+        return self.partial_fit(X, columns)
+
+    def fit_chunks(self, chunks):
+        self.categories_ = None
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def _check_fitted(self):
+        if self.categories_ is None:
+            raise RuntimeError(f'{type(self).__name__} is not fitted; call fit() first')
+
+    # --- persistence (vocabulary only; everything else is stateless) ---
+    def save(self, path):
+        self._check_fitted()
+        with open(path, 'w') as f:
+            json.dump({'categories': self.categories_}, f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            obj = cls()
+            obj.categories_ = json.load(f)['categories']
+        return obj
+
+    @classmethod
+    def from_feature_cols(cls, feature_cols):
+        """Rebuild the vocabulary from a saved `feature_cols` list (model bundles)."""
+        obj = cls()
+        obj.categories_ = {c: [] for c in CATEGORICAL_COLS}
+        # longest prefix first: 'position_group_' must win over 'position_'
+        prefixes = sorted(CATEGORICAL_COLS, key=len, reverse=True)
+        for name in feature_cols:
+            col = next((c for c in prefixes if name.startswith(f'{c}_')), None)
+            if col is not None:
+                obj.categories_[col].append(name[len(col) + 1:])
+        if obj.feature_cols != list(feature_cols):
+            raise ValueError('feature_cols do not follow the FeatureTransformer layout')
+        return obj
+
+    def codes(self, get, col):
+        """Integer vocabulary codes of one categorical column (-1 = unseen)."""
+        vals = position_group(get('position')) if col == 'position_group' else get(col)
+        return pd.Index(self.categories_[col]).get_indexer(np.asarray(vals, dtype=object))
+
+    def _dense_block(self, get, out):
+        """Fill the numeric + engineered columns (the first 16) of `out`."""
+        for j, col in enumerate(NUMERIC_COLS):
+            out[:, j] = get(col)
+        k = len(NUMERIC_COLS)
+        engineer_into(get, out[:, k:k + len(ENGINEERED_COLS)])
+        return out
+
+    @property
+    def feature_cols(self):
+        self._check_fitted()
+        return (NUMERIC_COLS + ENGINEERED_COLS
+                + [f'{c}_{v}' for c in CATEGORICAL_COLS for v in self.categories_[c]])
+
+    # --- transforming ---
+    def transform(self, X, columns=None, dtype=np.float64):
+        """Feature matrix (n_rows × len(feature_cols)) in one pass."""
+        self._check_fitted()
+        get = _column_getter(X, columns)
+        n   = _n_rows(X)
+        with span('features.transform', rows=n):
+            out = np.zeros((n, len(self.feature_cols)), dtype=dtype)
+            self._dense_block(get, out)
+
+            k    = len(NUMERIC_COLS) + len(ENGINEERED_COLS)
+            rows = np.arange(n)
+            for col in CATEGORICAL_COLS:
+                codes = self.codes(get, col)
+                hit   = codes >= 0
+                out[rows[hit], k + codes[hit]] = 1
+                k += len(self.categories_[col])
+        return out
+
+    def transform_frame(self, X, columns=None, dtype=np.float64):
+        """`transform` wrapped as a DataFrame indexed like `X` (when it has an index)."""
+        index = X.index if isinstance(X, pd.DataFrame) else None
+        return pd.DataFrame(self.transform(X, columns, dtype),
+                            columns=self.feature_cols, index=index)
+
+    def fit_transform(self, X, columns=None, dtype=np.float64):
+        return self.fit(X, columns).transform(X, columns, dtype)
+
+    def transform_chunks(self, chunks, dtype=np.float64):
+        """Lazily transform an iterable of chunks, yielding one array per chunk."""
+        for chunk in chunks:
+            yield self.transform(chunk, dtype=dtype)
+
+
+def iter_chunks(path, chunksize=100_000, columns=None):
+    """Stream a raw player CSV or Parquet file as DataFrame chunks."""
+    path = str(path)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
@@ -0,0 +1,957 @@
+"""
+Incremental, parallel rendering of the `outputs/*.png` figure set.
+
+Notebooks 01 / 03 / 04 / 05 redraw every figure serially on each run. Here
+each figure is a registered task with declared inputs:
+
+    @figure('eda_scatter_plots', 'raw')
+    def eda_scatter_plots(src): ...
+
+Inputs are named sources: files (the raw CSV, the feature store, the
+leaderboards, the saved models) or derived data computed from other sources
+(`shap_reg`, `shap_cls`, `clusters`). A figure's key hashes its own code, the
+code of any derived sources it reads and the content of every file
+underneath. Code means the function, every same-module helper it reaches,
+the values of module-level constants it reads and the source of any other
+`fpv` module it calls into or imports. `build` re-renders only figures whose key changed (or whose PNG
+is missing) and records keys in `outputs/figures.json`. File digests are
+memoised by (size, mtime), so an unchanged tree costs one `stat` per input.
+
+Stale figures are rendered in a process pool using the Agg backend. Figures
+that share a derived source go to one worker together, so SHAP values or
+the cluster fit are computed once per build and not once per figure.
+
+Run: python -m fpv.figures --workers 4
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .config import CLASSES, DATA_PATH, OUTPUTS_DIR, RANDOM_STATE
+from .store import STORE_DIR
+
+MANIFEST_PATH  = OUTPUTS_DIR / 'figures.json'
+FORMAT_VERSION = 1
+
+SOURCES = {}    # name -> {'path' | 'deps', 'load'}
+FIGURES = {}    # name -> {'fn', 'inputs', 'palette'}
+
+
+def source(name, path=None, deps=()):
+    """Register a loader for a file source (`path`) or a derived one (`deps`)."""
+    def register(load):
+        SOURCES[name] = {'path': path, 'deps': tuple(deps), 'load': load}
+        return load
+    return register
+
+
+def figure(name, *inputs, palette='deep'):
+    """Register a figure task rendering `outputs/<name>.png` from `inputs`."""
+    def register(fn):
+        FIGURES[name] = {'fn': fn, 'inputs': inputs, 'palette': palette}
+        return fn
+    return register
+
+
+# ── Sources ───────────────────────────────────────────────────────────────────
+
+def _read_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+@source('raw', path=DATA_PATH)
+def _raw(path, src):
+    import pandas as pd
+    return pd.read_csv(path)
+
+
+@source('store', path=STORE_DIR)
+def _store(path, src):
+    from .store import FeatureStore
+    return FeatureStore(path)
+
+
+@source('lb_mv', path=OUTPUTS_DIR / 'leaderboard_market_value.csv')
+@source('lb_fpvi', path=OUTPUTS_DIR / 'leaderboard_fpvi.csv')
+@source('lb_cls', path=OUTPUTS_DIR / 'classification_leaderboard.csv')
+def _csv(path, src):
+    import pandas as pd
+    return pd.read_csv(path)
+
+
+@source('regressor', path=OUTPUTS_DIR / 'best_regressor.pkl')
+@source('classifier', path=OUTPUTS_DIR / 'best_classifier.pkl')
+def _bundle(path, src):
+    return _read_pickle(path)
+
+
+@source('shap_reg', deps=('regressor', 'store'))
+def _shap_reg(path, src):
+    from .explain import ShapService
+    bundle = src['regressor']
+    return ShapService(bundle['model'], bundle['feature_cols']).explanation(src['store']['X_test'])
+
+
+@source('shap_cls', deps=('classifier', 'store'))
+def _shap_cls(path, src):
+    from .explain import ShapService
+    bundle = src['classifier']
+    return ShapService(bundle['model'], bundle['feature_cols']).explanation(src['store']['X_test'])
+
+
+@source('clusters', deps=('store',))
+def _clusters(path, src):
+    """05_clustering state: k sweep, best-k refit, profiles and names."""
+    import numpy as np
+    import pandas as pd
+
+    from .clustering import (PERF_FEATURES, make_kmeans, name_clusters, perf_matrix,
+                             sampled_silhouette_samples, sweep)
+    from .store import SPLITS
+
+    store = src['store']
+    X, mean, scale = perf_matrix(store)
+    table  = sweep(X, range(2, 9), n_init=20, sample_size=2000)
+    best_k = int(table['silhouette'].idxmax())
+    km     = make_kmeans(best_k, n_init=30)
+    labels = km.fit_predict(X)
+
+    df_cl = pd.DataFrame(X * scale + mean, columns=PERF_FEATURES)
+    df_cl['cluster'] = labels
+    df_cl['fpvi'] = np.concatenate([store.array(f'y_fpvi_raw_{sfx}') for _, sfx in SPLITS.values()])
+    profile = df_cl.groupby('cluster').mean().round(2)
+    names   = name_clusters(profile)
+    df_cl['archetype'] = df_cl['cluster'].map(names)
+    sil_idx, sil = sampled_silhouette_samples(X, labels)
+    return {'X': X, 'table': table, 'best_k': best_k, 'centroids': km.cluster_centers_,
+            'labels': labels, 'df': df_cl, 'profile': profile, 'names': names,
+            'sil_idx': sil_idx, 'sil': sil}
+
+
+class Sources:
+    """Per-process lazy accessor; values are reused while their digest is unchanged."""
+
+    _loaded = {}
+
+    def __init__(self, digests, paths):
+        self.digests = digests
+        self.paths   = paths
+
+    def __getitem__(self, name):
+        key = (name, self.digests[name])
+        if key not in self._loaded:
+            self._loaded[key] = SOURCES[name]['load'](self.paths.get(name), self)
+        return self._loaded[key]
+
+
+# ── Hashing ───────────────────────────────────────────────────────────────────
+
+def file_digest(path, stat_cache):
+    """Content digest of one file, memoised in `stat_cache` by (size, mtime)."""
+    st  = path.stat()
+    sig = [st.st_size, st.st_mtime_ns]
+    hit = stat_cache.get(str(path))
+    if hit and hit[:2] == sig:
+        return hit[2]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    stat_cache[str(path)] = [*sig, h.hexdigest()[:16]]
+    return h.hexdigest()[:16]
+
+
+def path_digest(path, stat_cache):
+    """Digest of a file or of every file under a directory (None if missing)."""
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(p for p in path.rglob('*') if p.is_file())
+        names = [str(p.relative_to(path)) for p in files]
+    else:
+        files = [path] if path.exists() else []
+        names = [path.name] * len(files)
+    if not files:
+        return None
+    return hashlib.sha256(' '.join(f'{n}={file_digest(p, stat_cache)}'
+                                   for n, p in zip(names, files)).encode()).hexdigest()[:16]
+
+
+_IMPORT = re.compile(r'^\s*from\s+(\.*)([\w.]*)\s+import\s', re.M)
+
+
+def _plain(value):
+    """Data whose repr is stable across processes (no object addresses)."""
+    if value is None or isinstance(value, (str, bytes, int, float, Path)):
+        return True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_plain(v) for v in value)
+    if isinstance(value, dict):
+        return all(_plain(k) and _plain(v) for k, v in value.items())
+    return False
+
+
+def _stable_repr(value):
+    if isinstance(value, (set, frozenset)):
+        return repr(sorted(map(_stable_repr, value)))
+    return repr(value)
+
+
+def _codes(obj):
+    """Code objects of a function (with nested lambdas / comprehensions) or a class's methods."""
+    if inspect.isclass(obj):
+        for member in vars(obj).values():
+            fn = getattr(member, 'func', getattr(member, 'fget', getattr(member, '__func__', member)))
+            if inspect.isfunction(fn):
+                yield from _codes(fn)
+        return
+    stack = [obj.__code__]
+    while stack:
+        code = stack.pop()
+        yield code
+        stack += [c for c in code.co_consts if inspect.iscode(c)]
+
+
+def _module_name(name):
+    """Importable module name: `python -m fpv.figures` runs this module as `__main__`."""
+    spec = getattr(sys.modules.get(name), '__spec__', None)
+    return spec.name if name == '__main__' and spec is not None else name
+
+
+def code_hash(*objs, modules=True):
+    """
+    Source of `objs` (functions or classes) and of the same-module helpers
+    they reach, the repr of module-level constants and defaults they read,
+    and (with `modules`) the source of every other package module they call
+    into or import. The hash is the same whichever entry point
+    (`python -m fpv.X` or `python -m fpv X`) loaded the code.
+    """
+    root = __package__.split('.')[0]
+    seen, todo, parts, deps = set(), list(objs), set(), set()
+    while todo:
+        obj = todo.pop()
+        if obj in seen:
+            continue
+        seen.add(obj)
+        module = sys.modules[obj.__module__]
+        name   = _module_name(module.__name__)
+        source = inspect.getsource(obj)
+        parts.add(f'{name}.{obj.__qualname__}:{source}')
+        for m in _IMPORT.finditer(source):
+            dep = importlib.util.resolve_name(m.group(1) + m.group(2), module.__package__)
+            if modules and dep.split('.')[0] == root and dep != root:
+                deps.add(dep)
+        for default in (getattr(obj, '__defaults__', None) or (),
+                        (getattr(obj, '__kwdefaults__', None) or {}).values()):
+            if _plain(list(default)):
+                parts.add(f'{obj.__qualname__} defaults={_stable_repr(list(default))}')
+        names = {n for code in _codes(obj) for n in code.co_names}
+        for n in sorted(names):
+            if n not in vars(module):
+                continue
+            g = vars(module)[n]
+            if inspect.isfunction(g) or inspect.isclass(g):
+                if g.__module__ == module.__name__:
+                    todo.append(g)
+                elif modules and _module_name(g.__module__).split('.')[0] == root:
+                    deps.add(_module_name(g.__module__))
+            elif inspect.ismodule(g):
+                if modules and _module_name(g.__name__).split('.')[0] == root:
+                    deps.add(_module_name(g.__name__))
+            elif _plain(g):
+                parts.add(f'{name}.{n}={_stable_repr(g)}')
+    for dep in deps:                             # read, not imported: no heavy deps
+        parts.add(f'{dep}:{Path(importlib.util.find_spec(dep).origin).read_text()}')
+    return hashlib.sha256('\n'.join(sorted(parts)).encode()).hexdigest()[:16]
+
+
+def source_digests(paths, stat_cache):
+    """{source: digest} for every registered source (None when a file is missing)."""
+    digests = {}
+
+    def digest(name):
+        if name in digests:
+            return digests[name]
+        spec = SOURCES[name]
+        if spec['deps']:
+            parts = [digest(d) for d in spec['deps']]
+            value = None if None in parts else hashlib.sha256(
+                ' '.join([code_hash(spec['load']), *parts]).encode()).hexdigest()[:16]
+        else:
+            value = path_digest(paths[name], stat_cache)
+        digests[name] = value
+        return value
+
+    for name in SOURCES:
+        digest(name)
+    return digests
+
+
+def figure_key(name, digests):
+    spec  = FIGURES[name]
+    parts = [str(FORMAT_VERSION), spec['palette'], code_hash(spec['fn'])]
+    parts += [f'{i}={digests[i]}' for i in spec['inputs']]
+    return hashlib.sha256(' '.join(parts).encode()).hexdigest()[:16]
+
+
+def source_paths(data=DATA_PATH, store=STORE_DIR):
+    paths = {n: s['path'] for n, s in SOURCES.items() if s['path'] is not None}
+    paths.update(raw=Path(data), store=Path(store))
+    return paths
+
+
+# ── Rendering (runs in workers) ───────────────────────────────────────────────
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _theme(palette):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_theme(style='whitegrid', palette=palette, font_scale=1.1)
+    plt.rcParams['figure.dpi'] = 120
+
+
+def _render_job(job):
+    """Worker: render figures sharing inputs; returns (name, seconds, error)."""
+    import matplotlib.pyplot as plt
+
+    names, digests, paths, out_dir = job
+    src, done = Sources(digests, paths), []
+    for name in names:
+        spec = FIGURES[name]
+        t0 = time.perf_counter()
+        try:
+            _theme(spec['palette'])
+            spec['fn'](src)
+            out = Path(out_dir) / f'{name}.png'
+            tmp = out.with_name(f'.{out.name}.tmp.png')
+            plt.savefig(tmp, bbox_inches='tight')
+            tmp.replace(out)
+            done.append((name, time.perf_counter() - t0, None))
+        except Exception:
+            done.append((name, time.perf_counter() - t0, traceback.format_exc()))
+        finally:
+            plt.close('all')
+    return done
+
+
+def _jobs(names):
+    """One job per figure, except figures reading a derived source share one."""
+    groups = {}
+    for name in names:
+        inputs = FIGURES[name]['inputs']
+        shared = tuple(i for i in inputs if SOURCES[i]['deps'])
+        groups.setdefault(shared or name, []).append(name)
+    # heaviest groups first so they start while the cheap figures fill the pool
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def load_manifest(path=MANIFEST_PATH):
+    path = Path(path)
+    if path.exists():
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get('format') == FORMAT_VERSION:
+            return manifest
+    return {'format': FORMAT_VERSION, 'figures': {}, 'files': {}}
+
+
+def _save_manifest(manifest, path):
+    path = Path(path)
+    tmp  = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    tmp.replace(path)
+
+
+def select(patterns=None):
+    """Registered figure names matching any of the glob `patterns` (all by default)."""
+    if not patterns:
+        return list(FIGURES)
+    names = [n for n in FIGURES if any(fnmatch.fnmatch(n, p) for p in patterns)]
+    if not names:
+        raise KeyError(f'no figure matches {patterns}; known: {sorted(FIGURES)}')
+    return names
+
+
+def plan(names=None, out_dir=OUTPUTS_DIR, manifest_path=MANIFEST_PATH, force=False,
+         data=DATA_PATH, store=STORE_DIR):
+    """
+    (status per figure, keys, digests, paths, manifest). Status is 'fresh',
+    'stale' or 'missing input'.
+    """
+    manifest = load_manifest(manifest_path)
+    paths    = source_paths(data, store)
+    digests  = source_digests(paths, manifest['files'])
+    status, keys = {}, {}
+    for name in select(names):
+        if any(digests[i] is None for i in FIGURES[name]['inputs']):
+            status[name] = 'missing input'
+            continue
+        keys[name] = figure_key(name, digests)
+        fresh = (not force and manifest['figures'].get(name) == keys[name]
+                 and (Path(out_dir) / f'{name}.png').exists())
+        status[name] = 'fresh' if fresh else 'stale'
+    return status, keys, digests, paths, manifest
+
+
+def build(names=None, workers=1, out_dir=OUTPUTS_DIR, manifest_path=MANIFEST_PATH,
+          force=False, data=DATA_PATH, store=STORE_DIR, log=print):
+    """
+    Render every stale figure among `names` (glob patterns; all by default).
+    Returns {figure: (status, seconds)} with status 'fresh', 'rendered',
+    'missing input' or 'failed'.
+    """
+    status, keys, digests, paths, manifest = plan(names, out_dir, manifest_path, force,
+                                                  data, store)
+    stale  = [n for n, s in status.items() if s == 'stale']
+    result = {n: (s, 0.0) for n, s in status.items() if s != 'stale'}
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    jobs = [(group, digests, paths, str(out_dir)) for group in _jobs(stale)]
+
+    def collect(done):
+        for name, seconds, error in done:
+            if error:
+                result[name] = ('failed', seconds)
+                log(f'  {name}: FAILED\n{error}')
+            else:
+                result[name] = ('rendered', seconds)
+                manifest['figures'][name] = keys[name]
+                log(f'  {name:36s} {seconds:6.2f}s')
+        _save_manifest(manifest, manifest_path)
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(min(workers, len(jobs)), initializer=_init_worker) as pool:
+            for fut in as_completed([pool.submit(_render_job, j) for j in jobs]):
+                collect(fut.result())
+    else:
+        for job in jobs:
+            collect(_render_job(job))
+    _save_manifest(manifest, manifest_path)
+    return result
+
+
+# ── 01_eda ────────────────────────────────────────────────────────────────────
+
+EDA_NUM_COLS = ['age', 'overall_rating', 'potential_rating', 'matches_played',
+                'goals', 'assists', 'minutes_played', 'contract_years_left']
+
+
+@figure('eda_target_distribution', 'raw', palette='muted')
+def eda_target_distribution(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
+    df = src['raw']
+    fig, axes = plt.subplots(1, 3, figsize=(16, 4))
+    axes[0].hist(df['market_value_million_eur'], bins=40, color='steelblue', edgecolor='white')
+    axes[0].set_title('Market Value Distribution')
+    axes[0].set_xlabel('Market Value (M EUR)')
+    axes[0].set_ylabel('Count')
+
+    axes[1].hist(np.log1p(df['market_value_million_eur']), bins=40, color='coral', edgecolor='white')
+    axes[1].set_title('Log(1+Market Value) Distribution')
+    axes[1].set_xlabel('log(1 + Market Value)')
+    axes[1].set_ylabel('Count')
+
+    order = df.groupby('position')['market_value_million_eur'].median().sort_values(ascending=False).index
+    sns.boxplot(data=df, x='position', y='market_value_million_eur', order=order, ax=axes[2],
+                hue='position', hue_order=order, palette='Set2', legend=False)
+    axes[2].set_title('Market Value by Position')
+    axes[2].set_xlabel('Position')
+    axes[2].set_ylabel('Market Value (M EUR)')
+    plt.tight_layout()
+
+
+@figure('eda_feature_distributions', 'raw', palette='muted')
+def eda_feature_distributions(src):
+    import matplotlib.pyplot as plt
+
+    df = src['raw']
+    fig, axes = plt.subplots(2, 4, figsize=(18, 8))
+    for ax, col in zip(axes.flat, EDA_NUM_COLS):
+        ax.hist(df[col], bins=30, color='slateblue', edgecolor='white', alpha=0.85)
+        ax.set_title(col)
+        ax.set_xlabel('')
+    plt.suptitle('Numerical Feature Distributions', y=1.01, fontsize=14)
+    plt.tight_layout()
+
+
+@figure('eda_correlation_heatmap', 'raw', palette='muted')
+def eda_correlation_heatmap(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
+    corr = src['raw'][EDA_NUM_COLS + ['market_value_million_eur']].corr()
+    fig, ax = plt.subplots(figsize=(10, 8))
+    mask = np.triu(np.ones_like(corr, dtype=bool))
+    sns.heatmap(corr, mask=mask, annot=True, fmt='.2f', cmap='coolwarm',
+                center=0, square=True, linewidths=0.5, ax=ax)
+    ax.set_title('Pearson Correlation Matrix')
+    plt.tight_layout()
+
+
+@figure('eda_scatter_plots', 'raw', palette='muted')
+def eda_scatter_plots(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    df = src['raw']
+    y  = df['market_value_million_eur']
+    fig, axes = plt.subplots(2, 3, figsize=(16, 9))
+    for ax, feat in zip(axes.flat, ['overall_rating', 'potential_rating', 'age',
+                                    'goals', 'assists', 'minutes_played']):
+        ax.scatter(df[feat], y, alpha=0.3, s=12, color='steelblue')
+        m, b = np.polyfit(df[feat], y, 1)
+        xs = np.linspace(df[feat].min(), df[feat].max(), 100)
+        ax.plot(xs, m * xs + b, color='red', linewidth=1.5, label=f'r={df[feat].corr(y):.2f}')
+        ax.set_xlabel(feat)
+        ax.set_ylabel('Market Value (M EUR)')
+        ax.legend(fontsize=9)
+    plt.suptitle('Feature vs Market Value', fontsize=14)
+    plt.tight_layout()
+
+
+@figure('eda_categorical_analysis', 'raw', palette='muted')
+def eda_categorical_analysis(src):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df = src['raw']
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    sns.boxplot(data=df, x='transfer_risk_level', y='market_value_million_eur', order=CLASSES,
+                ax=axes[0], hue='transfer_risk_level', hue_order=CLASSES, palette='RdYlGn_r',
+                legend=False)
+    axes[0].set_title('Market Value by Transfer Risk')
+
+    sns.boxplot(data=df, x='injury_prone', y='market_value_million_eur', ax=axes[1],
+                hue='injury_prone', palette='Set1', legend=False)
+    axes[1].set_title('Market Value by Injury Prone')
+
+    nat_mv = df.groupby('nationality')['market_value_million_eur'].mean().sort_values(ascending=False)
+    axes[2].bar(nat_mv.index, nat_mv.values, color=sns.color_palette('tab10', len(nat_mv)))
+    axes[2].set_title('Mean Market Value by Nationality')
+    axes[2].set_xticks(range(len(nat_mv)), nat_mv.index, rotation=30, ha='right')
+    axes[2].set_ylabel('Mean Market Value (M EUR)')
+    plt.tight_layout()
+
+
+@figure('eda_age_rating_analysis', 'raw', palette='muted')
+def eda_age_rating_analysis(src):
+    import matplotlib.pyplot as plt
+
+    df = src['raw']
+    rating_gap = df['potential_rating'] - df['overall_rating']
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    sc = axes[0].scatter(df['age'], df['market_value_million_eur'],
+                         c=df['overall_rating'], cmap='viridis', alpha=0.5, s=18)
+    plt.colorbar(sc, ax=axes[0], label='Overall Rating')
+    axes[0].set_xlabel('Age')
+    axes[0].set_ylabel('Market Value (M EUR)')
+    axes[0].set_title('Age vs Market Value (coloured by Rating)')
+
+    sc2 = axes[1].scatter(rating_gap, df['market_value_million_eur'],
+                          c=df['age'], cmap='plasma', alpha=0.5, s=18)
+    plt.colorbar(sc2, ax=axes[1], label='Age')
+    axes[1].set_xlabel('Potential - Overall Rating (Development Gap)')
+    axes[1].set_ylabel('Market Value (M EUR)')
+    axes[1].set_title('Rating Gap vs Market Value (coloured by Age)')
+    plt.tight_layout()
+
+
+@figure('eda_transfer_risk', 'raw', palette='muted')
+def eda_transfer_risk(src):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df = src['raw']
+    fig, axes = plt.subplots(1, 2, figsize=(12, 4))
+    risk_counts = df['transfer_risk_level'].value_counts()
+    axes[0].pie(risk_counts, labels=risk_counts.index, autopct='%1.1f%%',
+                colors=sns.color_palette('Set2'))
+    axes[0].set_title('Transfer Risk Level — Class Distribution')
+
+    risk_profile = df.groupby('transfer_risk_level')[['age', 'overall_rating', 'contract_years_left',
+                                                      'market_value_million_eur']].mean()
+    risk_profile = risk_profile.loc[CLASSES]
+    risk_profile.plot(kind='bar', ax=axes[1], colormap='Set1', edgecolor='white')
+    axes[1].set_title('Mean Feature Values by Transfer Risk')
+    axes[1].set_xlabel('')
+    axes[1].set_xticks(range(len(CLASSES)), risk_profile.index, rotation=0)
+    axes[1].legend(fontsize=8, loc='upper right')
+    plt.tight_layout()
+
+
+# ── 03_regression ─────────────────────────────────────────────────────────────
+
+def _barh_scores(ax, lb, metric, fmt='{:.3f}'):
+    import seaborn as sns
+
+    bars = ax.barh(lb['Model'], lb[metric], color=sns.color_palette('Set2', len(lb)),
+                   edgecolor='white')
+    for bar, val in zip(bars, lb[metric]):
+        ax.text(bar.get_width() + 0.01, bar.get_y() + bar.get_height() / 2,
+                fmt.format(val), va='center', fontsize=9)
+
+
+@figure('regression_r2_comparison', 'lb_mv', 'lb_fpvi')
+def regression_r2_comparison(src):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    for ax, lb, title in [(axes[0], src['lb_mv'],   'Task A: Original Market Value'),
+                          (axes[1], src['lb_fpvi'], 'Task B: FIFA Performance Index (FPVI)')]:
+        _barh_scores(ax, lb, 'R²')
+        ax.axvline(0, color='black', lw=0.8, linestyle='--')
+        ax.set_xlabel('R² (test set)')
+        ax.set_title(title)
+    plt.suptitle('Regression R² — Market Value vs FPVI', fontsize=13)
+    plt.tight_layout()
+
+
+@figure('regression_fpvi_diagnostics', 'regressor', 'store')
+def regression_fpvi_diagnostics(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    bundle, d = src['regressor'], src['store']
+    pred   = np.clip(np.expm1(bundle['model'].predict(d['X_test'])), 0, None)
+    actual = d.array('y_fpvi_raw_te')
+    name   = bundle['name']
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    axes[0].scatter(actual, pred, alpha=0.4, s=14, color='steelblue')
+    lims = [min(actual.min(), pred.min()) - 1, max(actual.max(), pred.max()) + 1]
+    axes[0].plot(lims, lims, 'r--', lw=1.5)
+    axes[0].set_xlabel('Actual FPVI (M€ equiv.)')
+    axes[0].set_ylabel('Predicted FPVI (M€ equiv.)')
+    axes[0].set_title(f'{name} — Predicted vs Actual')
+
+    axes[1].scatter(pred, actual - pred, alpha=0.4, s=14, color='coral')
+    axes[1].axhline(0, color='red', lw=1.5, linestyle='--')
+    axes[1].set_xlabel('Predicted FPVI (M€ equiv.)')
+    axes[1].set_ylabel('Residual')
+    axes[1].set_title(f'{name} — Residual Plot')
+    plt.tight_layout()
+
+
+@figure('regression_fpvi_importance', 'regressor')
+def regression_fpvi_importance(src):
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    bundle = src['regressor']
+    importances = pd.Series(bundle['model'].feature_importances_,
+                            index=bundle['feature_cols']).nlargest(20)
+    fig, ax = plt.subplots(figsize=(9, 7))
+    importances.sort_values().plot(kind='barh', color=sns.color_palette('viridis', 20), ax=ax)
+    ax.set_title(f'Top-20 Feature Importances — {bundle["name"]} (FPVI Task)')
+    ax.set_xlabel('Importance')
+    plt.tight_layout()
+
+
+# ── 04_classification_shap ────────────────────────────────────────────────────
+
+@figure('classification_comparison', 'lb_cls')
+def classification_comparison(src):
+    import matplotlib.pyplot as plt
+
+    lb = src['lb_cls']
+    fig, axes = plt.subplots(1, 3, figsize=(16, 4))
+    for ax, metric in zip(axes, ['Accuracy', 'Macro F1', 'ROC-AUC (OvR)']):
+        _barh_scores(ax, lb, metric)
+        ax.set_title(f'Test {metric}')
+        ax.set_xlim(0, 1.05)
+    plt.suptitle('Classification Model Comparison — Test Set', fontsize=13)
+    plt.tight_layout()
+
+
+@figure('classification_confusion_matrix', 'classifier', 'store')
+def classification_confusion_matrix(src):
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import ConfusionMatrixDisplay, confusion_matrix
+
+    bundle, d = src['classifier'], src['store']
+    cm = confusion_matrix(d.array('y_cls_te'), bundle['model'].predict(d['X_test']))
+    fig, ax = plt.subplots(figsize=(6, 5))
+    ConfusionMatrixDisplay(cm, display_labels=bundle.get('classes', CLASSES)).plot(
+        ax=ax, colorbar=True, cmap='Blues', values_format='d')
+    ax.set_title(f'Confusion Matrix — {bundle["name"]}')
+    plt.tight_layout()
+
+
+@figure('shap_regression_summary', 'shap_reg', 'regressor', 'store')
+def shap_regression_summary(src):
+    import matplotlib.pyplot as plt
+    import shap
+
+    shap.summary_plot(src['shap_reg'], src['store']['X_test'], max_display=15, show=False)
+    plt.title(f'SHAP Summary — {src["regressor"]["name"]} (FPVI Regression)')
+    plt.tight_layout()
+
+
+@figure('shap_regression_bar', 'shap_reg', 'regressor', 'store')
+def shap_regression_bar(src):
+    import matplotlib.pyplot as plt
+    import shap
+
+    shap.summary_plot(src['shap_reg'], src['store']['X_test'], plot_type='bar',
+                      max_display=15, show=False)
+    plt.title(f'Mean |SHAP| — {src["regressor"]["name"]} (FPVI Regression)')
+    plt.tight_layout()
+
+
+def _shap_waterfall(src, pick, label):
+    import matplotlib.pyplot as plt
+    import shap
+
+    y   = src['store'].array('y_fpvi_raw_te')
+    idx = int(pick(y))
+    shap.waterfall_plot(src['shap_reg'][idx], max_display=12, show=False)
+    plt.title(f'{label} (actual={y[idx]:.1f} M€)')
+    plt.tight_layout()
+
+
+@figure('shap_local_high', 'shap_reg', 'store')
+def shap_local_high(src):
+    _shap_waterfall(src, lambda y: y.argmax(), 'High-FPVI Player')
+
+
+@figure('shap_local_low', 'shap_reg', 'store')
+def shap_local_low(src):
+    _shap_waterfall(src, lambda y: y.argmin(), 'Low-FPVI Player ')
+
+
+@figure('shap_dependence', 'shap_reg', 'store')
+def shap_dependence(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import shap
+
+    sv     = src['shap_reg']
+    X_test = src['store']['X_test'].reset_index(drop=True)
+    top2   = np.argsort(np.abs(sv.values).mean(axis=0))[::-1][:2]
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    for ax, i in zip(axes, top2):
+        feat = X_test.columns[i]
+        shap.dependence_plot(feat, sv.values, X_test, ax=ax, show=False,
+                             interaction_index='auto')
+        ax.set_title(f'SHAP Dependence: {feat}')
+    plt.tight_layout()
+
+
+def _shap_class(src, cls_idx):
+    import matplotlib.pyplot as plt
+    import shap
+
+    sv = src['shap_cls']
+    sv = shap.Explanation(values=sv.values[:, :, cls_idx], base_values=sv.base_values[:, cls_idx],
+                          data=sv.data, feature_names=sv.feature_names)
+    shap.summary_plot(sv, src['store']['X_test'], plot_type='bar', max_display=12, show=False)
+    plt.title(f'SHAP Feature Importance — Transfer Risk = {CLASSES[cls_idx]}')
+    plt.tight_layout()
+
+
+@figure('shap_cls_low', 'shap_cls', 'store')
+def shap_cls_low(src):
+    _shap_class(src, 0)
+
+
+@figure('shap_cls_medium', 'shap_cls', 'store')
+def shap_cls_medium(src):
+    _shap_class(src, 1)
+
+
+@figure('shap_cls_high', 'shap_cls', 'store')
+def shap_cls_high(src):
+    _shap_class(src, 2)
+
+
+# ── 05_clustering ─────────────────────────────────────────────────────────────
+
+RADAR_FEATURES = ['age', 'overall_rating', 'goals_per_90', 'assists_per_90',
+                  'rating_gap', 'contract_years_left']
+
+
+@figure('clustering_selection', 'clusters')
+def clustering_selection(src):
+    import matplotlib.pyplot as plt
+
+    cl = src['clusters']
+    table, best_k = cl['table'], cl['best_k']
+    fig, axes = plt.subplots(1, 2, figsize=(13, 4))
+    axes[0].plot(table.index, table['silhouette'], marker='o', color='steelblue')
+    axes[0].axvline(best_k, color='red', linestyle='--', label=f'Optimal k={best_k}')
+    axes[0].set_xlabel('Number of Clusters (k)')
+    axes[0].set_ylabel('Silhouette Score')
+    axes[0].set_title('Silhouette Analysis')
+    axes[0].legend()
+
+    axes[1].plot(table.index, table['inertia'], marker='o', color='coral')
+    axes[1].set_xlabel('Number of Clusters (k)')
+    axes[1].set_ylabel('Inertia (Within-Cluster SS)')
+    axes[1].set_title('Elbow Method')
+    plt.suptitle('K-Means Cluster Selection', fontsize=13)
+    plt.tight_layout()
+
+
+@figure('clustering_radar', 'clusters')
+def clustering_radar(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
+    cl = src['clusters']
+    radar = cl['profile'][RADAR_FEATURES]
+    radar = (radar - radar.min()) / (radar.max() - radar.min() + 1e-9)
+    angles = np.linspace(0, 2 * np.pi, len(RADAR_FEATURES), endpoint=False).tolist()
+    angles += angles[:1]
+
+    palette = sns.color_palette('tab10', cl['best_k'])
+    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw={'projection': 'polar'})
+    for cid in range(cl['best_k']):
+        vals = radar.loc[cid].tolist()
+        vals += vals[:1]
+        ax.plot(angles, vals, color=palette[cid], linewidth=2, label=cl['names'][cid])
+        ax.fill(angles, vals, color=palette[cid], alpha=0.12)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(RADAR_FEATURES, size=10)
+    ax.set_yticks([])
+    ax.set_title('Player Archetype Profiles (normalised)', pad=20)
+    ax.legend(loc='upper right', bbox_to_anchor=(1.35, 1.1))
+    plt.tight_layout()
+
+
+@figure('clustering_pca', 'clusters')
+def clustering_pca(src):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.decomposition import PCA
+
+    cl = src['clusters']
+    pca    = PCA(n_components=2, random_state=RANDOM_STATE)
+    coords = pca.fit_transform(cl['X'])
+    ratio  = pca.explained_variance_ratio_
+    palette = sns.color_palette('tab10', cl['best_k'])
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+    for cid, name in cl['names'].items():
+        mask = cl['labels'] == cid
+        ax.scatter(coords[mask, 0], coords[mask, 1], label=name, s=18, alpha=0.5,
+                   color=palette[cid])
+    centroids = pca.transform(cl['centroids'])
+    ax.scatter(centroids[:, 0], centroids[:, 1], marker='X', s=200, c=palette,
+               edgecolors='black', linewidths=1, zorder=5)
+    ax.set_xlabel(f'PC1 ({ratio[0]:.1%} variance)')
+    ax.set_ylabel(f'PC2 ({ratio[1]:.1%} variance)')
+    ax.set_title('Player Archetypes — PCA 2D Projection')
+    ax.legend(markerscale=2)
+    plt.tight_layout()
+
+
+@figure('clustering_boxplots', 'clusters')
+def clustering_boxplots(src):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    cl = src['clusters']
+    order = [cl['names'][i] for i in range(cl['best_k'])]
+    fig, axes = plt.subplots(2, 3, figsize=(16, 9))
+    for ax, feat in zip(axes.flat, ['age', 'overall_rating', 'goals_per_90',
+                                    'assists_per_90', 'rating_gap', 'fpvi']):
+        sns.boxplot(data=cl['df'], x='archetype', y=feat, order=order, hue='archetype',
+                    hue_order=order, palette='tab10', legend=False, ax=ax)
+        ax.set_title(feat)
+        ax.set_xlabel('')
+        ax.tick_params(axis='x', rotation=20)
+    plt.suptitle('Feature Distributions per Player Archetype', fontsize=13)
+    plt.tight_layout()
+
+
+@figure('clustering_silhouette', 'clusters')
+def clustering_silhouette(src):
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+
+    cl = src['clusters']
+    labels  = cl['labels'][cl['sil_idx']]
+    palette = sns.color_palette('tab10', cl['best_k'])
+    avg     = cl['table'].loc[cl['best_k'], 'silhouette']
+
+    fig, ax = plt.subplots(figsize=(9, 6))
+    y_lower = 10
+    for cid in range(cl['best_k']):
+        sil_c = np.sort(cl['sil'][labels == cid])
+        y_upper = y_lower + len(sil_c)
+        ax.fill_betweenx(np.arange(y_lower, y_upper), 0, sil_c,
+                         facecolor=palette[cid], edgecolor=palette[cid], alpha=0.7)
+        ax.text(-0.05, y_lower + len(sil_c) / 2, cl['names'][cid], fontsize=8)
+        y_lower = y_upper + 5
+    ax.axvline(avg, color='red', linestyle='--', label=f'Avg silhouette = {avg:.3f}')
+    ax.set_xlabel('Silhouette Coefficient')
+    ax.set_ylabel('Cluster')
+    ax.set_yticks([])
+    ax.set_title(f'Silhouette Plot — k={cl["best_k"]} Clusters')
+    ax.legend()
+    plt.tight_layout()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.figures',
+                                     description='Incremental figure rendering.')
+    parser.add_argument('figures', nargs='*', help='figure names or glob patterns (default: all)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--force', action='store_true', help='re-render fresh figures too')
+    parser.add_argument('--dry-run', action='store_true', help='only list what would render')
+    parser.add_argument('--data', default=str(DATA_PATH))
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--out-dir', default=str(OUTPUTS_DIR))
+    parser.add_argument('--manifest', default=str(MANIFEST_PATH))
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        status = plan(args.figures, args.out_dir, args.manifest, args.force,
+                      args.data, args.store)[0]
+        for name, s in status.items():
+            print(f'  {name:36s} {s}')
+        return
+
+    import matplotlib
+    matplotlib.use('Agg')
+    t0 = time.perf_counter()
+    result = build(args.figures, args.workers, args.out_dir, args.manifest, args.force,
+                   args.data, args.store)
+    counts = {}
+    for s, _ in result.values():
+        counts[s] = counts.get(s, 0) + 1
+    print(f'{len(result)} figures: ' + ', '.join(f'{n} {s}' for s, n in sorted(counts.items()))
+          + f' in {time.perf_counter() - t0:.1f}s')
+    if counts.get('failed'):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
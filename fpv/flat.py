@@ -0,0 +1,462 @@
+"""
+Flat-array export of the saved tree ensembles, with a NumPy-only predictor.
+
+`best_regressor.pkl` / `best_classifier.pkl` hold LightGBM (or XGBoost)
+estimators. Unpickling them imports the library plus scikit-learn, and
+every `predict` goes through their Python wrappers. `export` walks the
+booster's own model dump once and packs all trees into flat node arrays:
+
+    feature        split feature per node (0 for leaves)
+    threshold      split threshold per node
+    children       (right, left) child ids per node, interleaved; a leaf
+                   points at itself, so every row can take `max_depth` steps
+    value          leaf value per node
+    default_left   direction for missing values
+    missing        LightGBM missing type: 0 none, 1 zero, 2 NaN
+    cat_set        row of `cat_sets` for categorical splits (-1 otherwise)
+    roots          root node of each tree; `tree_class` its output column
+
+`FlatEnsemble.predict` evaluates every tree for a block of rows at once,
+one level per step. It then adds leaf values in the booster's own tree
+order and precision (float64 for LightGBM, float32 for XGBoost), so its
+raw scores match the native model bit for bit. The file is a plain `.npz`
+(no pickle), and loading and predicting need only NumPy.
+
+Run: python -m fpv.flat export outputs/best_regressor.pkl outputs/best_classifier.pkl
+     python -m fpv.flat bench --rows 100000
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import math
+import pickle
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .config import OUTPUTS_DIR
+
+FORMAT_VERSION = 1
+MISSING_TYPES  = {'None': 0, 'Zero': 1, 'NaN': 2}
+ZERO_THRESHOLD = 1e-35                       # LightGBM kZeroThreshold
+ARRAYS = ('feature', 'threshold', 'children', 'value', 'default_left', 'missing', 'cat_set',
+          'roots', 'tree_class', 'cat_sets')
+
+
+def flat_path(bundle_path):
+    """`outputs/best_regressor.pkl` -> `outputs/best_regressor.flat.npz`."""
+    bundle_path = Path(bundle_path)
+    return bundle_path.with_name(f'{bundle_path.stem}.flat.npz')
+
+
+def _libm_expf():
+    """C `expf` (what XGBoost's float32 transforms call), or None if unavailable."""
+    try:
+        libm = ctypes.CDLL(ctypes.util.find_library('m'))
+        libm.expf.restype, libm.expf.argtypes = ctypes.c_float, [ctypes.c_float]
+        return np.frompyfunc(libm.expf, 1, 1)
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+_EXP  = np.frompyfunc(math.exp, 1, 1)
+_EXPF = _libm_expf()
+
+
+def _exp(x):
+    """
+    Element-wise C-library exp (`exp` for float64, `expf` for float32).
+    NumPy's SIMD exp can differ from the boosters' libm in the last bit.
+    """
+    fn = _EXPF if x.dtype == np.float32 and _EXPF is not None else _EXP
+    return fn(x).astype(x.dtype)
+
+
+# ── Predictor ─────────────────────────────────────────────────────────────────
+
+class FlatEnsemble:
+    """Tree ensemble as flat NumPy arrays; `predict` / `predict_proba` like the original."""
+
+    def __init__(self, arrays, meta):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta          = meta
+        self.library       = meta['library']
+        self.objective     = meta['objective']
+        self.n_outputs     = meta['n_outputs']
+        self.base_score    = meta['base_score']
+        self.max_depth     = meta['max_depth']
+        self.feature_names = meta['feature_names']
+        self.classes_      = np.asarray(meta['classes']) if meta.get('classes') else None
+        self.dtype         = np.float32 if self.library == 'xgboost' else np.float64
+        self.n_features_in_ = len(self.feature_names)
+        # no missing-value or categorical rules: plain threshold compares suffice
+        self._simple = (self.library == 'lightgbm' and not (self.missing == 1).any()
+                        and not (self.cat_set >= 0).any())
+        self._class_trees = [np.flatnonzero(self.tree_class == k) for k in range(self.n_outputs)]
+
+    # --- evaluation ---
+    def _leaves(self, X):
+        """Leaf node reached in every tree, shape (n_trees, n_rows)."""
+        n, n_feat = X.shape
+        flat_X = X.ravel()
+        idx_t  = np.int32 if n * n_feat < 2 ** 31 and 2 * len(self.value) < 2 ** 31 else np.int64
+        offset = (np.arange(n, dtype=idx_t) * n_feat)[None, :]
+        node   = np.repeat(self.roots[:, None], n, axis=1).astype(idx_t)
+        simple = self._simple and not np.isnan(X).any()
+        for _ in range(self.max_depth):
+            feat = self.feature[node]
+            x    = flat_X[offset + feat]
+            thr  = self.threshold[node]
+            go_left = (x < thr) if self.library == 'xgboost' else (x <= thr)
+            if not simple:
+                go_left = self._missing_rule(node, x, go_left)
+            node = self.children[2 * node + go_left]
+        return node
+
+    def _missing_rule(self, node, x, go_left):
+        """Missing-value and categorical decisions (LightGBM / XGBoost semantics)."""
+        nan = np.isnan(x)
+        if self.library == 'xgboost':
+            return np.where(nan, self.default_left[node], go_left)
+        mtype = self.missing[node]
+        x = np.where(nan & (mtype != 2), 0.0, x)
+        is_missing = ((mtype == 1) & (np.abs(x) <= ZERO_THRESHOLD)) | ((mtype == 2) & nan)
+        go_left = np.where(is_missing, self.default_left[node], x <= self.threshold[node])
+        cat = self.cat_set[node]
+        if (cat >= 0).any():
+            code = np.where(nan | (x < 0), -1, np.nan_to_num(x)).astype(np.int64)
+            ok = (cat >= 0) & (code >= 0) & (code < self.cat_sets.shape[1])
+            member = np.zeros_like(ok)
+            member[ok] = self.cat_sets[cat[ok], code[ok]]
+            go_left = np.where(cat >= 0, member, go_left)
+        return go_left
+
+    def predict_raw(self, X, chunk_size=None):
+        """Raw margins, shape (n_rows, n_outputs), summed in the booster's tree order."""
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f'expected {self.n_features_in_} features, got shape {X.shape}')
+        # small blocks keep the (trees × rows) working set in cache
+        chunk_size = chunk_size or max(64, (1 << 18) // max(len(self.roots), 1))
+        out = np.empty((self.n_outputs, len(X)), dtype=self.dtype)
+        out[:] = np.asarray(self.base_score, dtype=self.dtype)[:, None]
+        for i in range(0, len(X), chunk_size):
+            self.accumulate(out[:, i:i + chunk_size], self.value[self._leaves(X[i:i + chunk_size])])
+        return out.T
+
+    def accumulate(self, block, leaves):
+        """
+        Add per-tree leaf values (n_trees, rows) into `block` (n_outputs, rows).
+        `np.add.accumulate` adds the trees of each output strictly in sequence,
+        like the booster, but in one call instead of one per tree.
+        """
+        for k, trees in enumerate(self._class_trees):
+            block[k] = np.add.accumulate(np.concatenate([block[k][None], leaves[trees]]))[-1]
+
+    def predict_proba(self, X):
+        return self.proba_from_raw(self.predict_raw(X))
+
+    def proba_from_raw(self, raw):
+        if self.objective == 'multiclass':
+            e = _exp(raw - raw.max(axis=1, keepdims=True))
+            total = e[:, 0].astype(np.float64)
+            for k in range(1, e.shape[1]):                  # sequential double sum, like both boosters
+                total += e[:, k]
+            return e / total.astype(self.dtype)[:, None]
+        if self.objective == 'binary':
+            one = self.dtype(1)
+            p = one / (one + _exp(-self.dtype(self.meta.get('sigmoid', 1.0)) * raw[:, 0]))
+            return np.column_stack([one - p, p])
+        raise ValueError(f'{self.objective} model has no probabilities')
+
+    def predict(self, X):
+        if self.objective in ('multiclass', 'binary'):
+            return self.classes_[self.predict_proba(X).argmax(axis=1)]
+        return self.predict_raw(X)[:, 0]
+
+    # --- persistence ---
+    def save(self, path):
+        tmp = Path(path).with_name(f'.{Path(path).name}')
+        with open(tmp, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)),
+                     **{name: getattr(self, name) for name in ARRAYS})
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z['meta']))
+            if meta.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f'{path}: unsupported flat format {meta.get("format_version")}')
+            return cls({name: z[name] for name in ARRAYS}, meta)
+
+    def bundle(self):
+        """Bundle dict in the `best_*.pkl` layout, for `fpv.predict.Scorer`."""
+        out = {'model': self, 'name': self.meta.get('name'), 'feature_cols': self.feature_names}
+        if self.classes_ is not None:
+            out['classes'] = self.meta.get('class_names') or list(self.classes_)
+        return out
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+class _Builder:
+    """Accumulates nodes of successive trees into global flat arrays."""
+
+    def __init__(self):
+        self.cols = {k: [] for k in ('feature', 'threshold', 'left', 'right', 'value',
+                                     'default_left', 'missing', 'cat_set')}
+        self.roots, self.tree_class, self.cat_sets = [], [], []
+        self.max_depth = 0
+
+    def node(self, feature=0, threshold=0.0, value=0.0, default_left=False, missing=0,
+             cat_set=-1):
+        idx = len(self.cols['feature'])
+        for key, v in (('feature', feature), ('threshold', threshold), ('left', idx),
+                       ('right', idx), ('value', value), ('default_left', default_left),
+                       ('missing', missing), ('cat_set', cat_set)):
+            self.cols[key].append(v)
+        return idx
+
+    def leaf(self, value):
+        return self.node(value=value)
+
+    def link(self, parent, left, right):
+        self.cols['left'][parent], self.cols['right'][parent] = left, right
+
+    def arrays(self, value_dtype):
+        n_cats = max((len(s) for s in self.cat_sets), default=0)
+        cat_sets = np.zeros((len(self.cat_sets), n_cats), dtype=bool)
+        for i, s in enumerate(self.cat_sets):
+            cat_sets[i, :len(s)] = s
+        children = np.empty(2 * len(self.cols['left']), dtype=np.int32)
+        children[0::2], children[1::2] = self.cols['right'], self.cols['left']
+        return {
+            'feature':      np.asarray(self.cols['feature'], dtype=np.int32),
+            'threshold':    np.asarray(self.cols['threshold'], dtype=value_dtype),
+            'children':     children,
+            'value':        np.asarray(self.cols['value'], dtype=value_dtype),
+            'default_left': np.asarray(self.cols['default_left'], dtype=bool),
+            'missing':      np.asarray(self.cols['missing'], dtype=np.uint8),
+            'cat_set':      np.asarray(self.cols['cat_set'], dtype=np.int32),
+            'roots':        np.asarray(self.roots, dtype=np.int32),
+            'tree_class':   np.asarray(self.tree_class, dtype=np.int32),
+            'cat_sets':     cat_sets,
+        }
+
+
+def _lightgbm_tree(b, node, depth=0):
+    if 'leaf_value' in node or 'split_feature' not in node:
+        b.max_depth = max(b.max_depth, depth)
+        return b.leaf(node.get('leaf_value', 0.0))
+    cat = -1
+    if node['decision_type'] == '==':
+        members = [int(c) for c in str(node['threshold']).split('||')]
+        bits = np.zeros(max(members) + 1, dtype=bool)
+        bits[members] = True
+        b.cat_sets.append(bits)
+        cat, threshold = len(b.cat_sets) - 1, 0.0
+    elif node['decision_type'] == '<=':
+        threshold = float(node['threshold'])
+    else:
+        raise ValueError(f'unsupported LightGBM decision type {node["decision_type"]!r}')
+    idx = b.node(node['split_feature'], threshold, 0.0, node['default_left'],
+                 MISSING_TYPES[node['missing_type']], cat)
+    b.link(idx, _lightgbm_tree(b, node['left_child'], depth + 1),
+           _lightgbm_tree(b, node['right_child'], depth + 1))
+    return idx
+
+
+def export_lightgbm(model):
+    booster = getattr(model, 'booster_', model)
+    dump = booster.dump_model()
+    if any(t.get('is_linear') for t in dump['tree_info']):
+        raise ValueError('linear trees are not supported')
+    per_iter = dump['num_tree_per_iteration']
+    b = _Builder()
+    for t, tree in enumerate(dump['tree_info']):
+        b.roots.append(_lightgbm_tree(b, tree['tree_structure']))
+        b.tree_class.append(t % per_iter)
+    objective = dump['objective'].split()[0]
+    kind = {'multiclass': 'multiclass', 'multiclassova': 'multiclass',
+            'binary': 'binary'}.get(objective, 'regression')
+    if dump.get('average_output'):
+        raise ValueError('random-forest mode (average_output) is not supported')
+    meta = {'library': 'lightgbm', 'objective': kind, 'n_outputs': per_iter,
+            'base_score': [0.0] * per_iter, 'feature_names': dump['feature_names']}
+    if kind == 'binary':
+        sig = [s for s in dump['objective'].split() if s.startswith('sigmoid:')]
+        meta['sigmoid'] = float(sig[0].split(':')[1]) if sig else 1.0
+    return b.arrays(np.float64), b.max_depth, meta
+
+
+def export_xgboost(model):
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    cfg = json.loads(booster.save_raw('json'))['learner']
+    gb = cfg['gradient_booster']
+    if gb['name'] != 'gbtree':
+        raise ValueError(f'unsupported XGBoost booster {gb["name"]!r}')
+    trees, info = gb['model']['trees'], gb['model']['tree_info']
+    b = _Builder()
+    for tree, k in zip(trees, info):
+        if any(int(c) for c in tree.get('split_type', [])):
+            raise ValueError('categorical XGBoost splits are not supported')
+        offset = len(b.cols['feature'])
+        left, right = tree['left_children'], tree['right_children']
+        depth = np.zeros(len(left), dtype=int)
+        for i in range(len(left)):
+            if left[i] == -1:
+                b.leaf(tree['split_conditions'][i])
+            else:
+                depth[left[i]] = depth[right[i]] = depth[i] + 1
+                b.node(tree['split_indices'][i], tree['split_conditions'][i], 0.0,
+                       bool(tree['default_left'][i]))
+                b.link(offset + i, offset + left[i], offset + right[i])
+        b.max_depth = max(b.max_depth, int(depth.max()))
+        b.roots.append(offset)
+        b.tree_class.append(int(k))
+
+    objective = cfg['objective']['name']
+    param = cfg['learner_model_param']
+    base = np.asarray([float(v) for v in str(param['base_score']).strip('[]').split(',')],
+                      dtype=np.float32)
+    n_class = int(param.get('num_class', 0))
+    if objective.startswith('multi:'):
+        kind, n_out = 'multiclass', n_class
+        base = np.broadcast_to(base, (n_class,))
+    elif objective == 'binary:logistic':                  # ProbToMargin, in float32
+        kind, n_out, base = 'binary', 1, -np.log(np.float32(1) / base - np.float32(1))
+    elif objective in ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror'):
+        kind, n_out = 'regression', 1
+    else:
+        raise ValueError(f'unsupported XGBoost objective {objective!r}')
+    meta = {'library': 'xgboost', 'objective': kind, 'n_outputs': n_out,
+            'base_score': base.astype(np.float32).tolist(),
+            'feature_names': booster.feature_names or [f'f{i}' for i in
+                                                       range(int(param['num_feature']))]}
+    return b.arrays(np.float32), b.max_depth, meta
+
+
+def export(model, feature_cols=None, classes=None, name=None):
+    """FlatEnsemble for a fitted LightGBM / XGBoost estimator or booster."""
+    lib = type(model).__module__.split('.')[0]
+    if lib == 'lightgbm':
+        arrays, depth, meta = export_lightgbm(model)
+    elif lib == 'xgboost':
+        arrays, depth, meta = export_xgboost(model)
+    else:
+        raise TypeError(f'cannot export {type(model).__name__}; '
+                        'only LightGBM and XGBoost ensembles are supported')
+    meta.update(format_version=FORMAT_VERSION, max_depth=depth, name=name)
+    if feature_cols is not None:
+        meta['feature_names'] = list(feature_cols)
+    if meta['objective'] != 'regression':
+        meta['classes'] = np.asarray(getattr(model, 'classes_', range(max(2, meta['n_outputs'])))).tolist()
+        if classes is not None:
+            meta['class_names'] = list(classes)
+    return FlatEnsemble(arrays, meta)
+
+
+def export_bundle(bundle_path, out_path=None):
+    """Export the model in a `best_*.pkl` bundle; returns the output path."""
+    with open(bundle_path, 'rb') as f:
+        bundle = pickle.load(f)
+    flat = export(bundle['model'], bundle['feature_cols'], bundle.get('classes'),
+                  bundle.get('name'))
+    out_path = Path(out_path or flat_path(bundle_path))
+    flat.save(out_path)
+    return out_path
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+_LOAD_SNIPPET = r'''
+import json, os, sys, time
+t0 = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - t0
+with open('/proc/self/status') as f:
+    rss = next(int(l.split()[1]) for l in f if l.startswith('VmRSS')) / 1024
+print(json.dumps({{'load_s': elapsed, 'rss_mb': rss}}))
+'''
+
+
+def cold_load(kind, path):
+    """Load time (incl. imports) and RSS of a fresh interpreter holding the model."""
+    body = ("import pickle\nwith open(sys.argv[1], 'rb') as f: m = pickle.load(f)"
+            if kind == 'native' else
+            "from fpv.flat import FlatEnsemble\nm = FlatEnsemble.load(sys.argv[1])")
+    from .config import ROOT_DIR
+    res = subprocess.run([sys.executable, '-c', _LOAD_SNIPPET.format(body=body), str(path)],
+                         capture_output=True, text=True, cwd=ROOT_DIR, check=True)
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def benchmark(bundle_path, n_rows=100_000, seed=0):
+    """Native vs flat: cold load, RSS, file size, rows/s and output equality."""
+    from .features import FeatureTransformer
+    from .synthetic import generate
+
+    with open(bundle_path, 'rb') as f:
+        bundle = pickle.load(f)
+    out_path = export_bundle(bundle_path)
+    flat = FlatEnsemble.load(out_path)
+    X = FeatureTransformer.from_feature_cols(bundle['feature_cols']).transform(
+        generate(n_rows, seed))
+
+    model = bundle['model']
+    is_cls = flat.objective != 'regression'
+    import pandas as pd
+    Xdf = pd.DataFrame(X, columns=bundle['feature_cols'])
+    t0 = time.perf_counter()
+    native = model.predict_proba(Xdf) if is_cls else model.predict(Xdf)
+    native_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ours = flat.predict_proba(X) if is_cls else flat.predict(X)
+    flat_s = time.perf_counter() - t0
+
+    rows = []
+    for kind, path, secs in (('native', bundle_path, native_s), ('flat', out_path, flat_s)):
+        load = cold_load(kind, path)
+        rows.append({'model': kind, 'file_mb': Path(path).stat().st_size / 2 ** 20,
+                     'load_s': load['load_s'], 'rss_mb': load['rss_mb'],
+                     'rows_per_s': n_rows / secs})
+    return rows, {'bit_exact': bool(np.array_equal(native, ours)),
+                  'max_abs_diff': float(np.max(np.abs(native - ours)))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.flat', description='Flat-array tree export.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    e = sub.add_parser('export', help='write <bundle>.flat.npz next to each bundle')
+    e.add_argument('bundles', nargs='*', default=[str(OUTPUTS_DIR / 'best_regressor.pkl'),
+                                                  str(OUTPUTS_DIR / 'best_classifier.pkl')])
+    r = sub.add_parser('bench', help='load time, memory and rows/s vs the native models')
+    r.add_argument('bundles', nargs='*', default=[str(OUTPUTS_DIR / 'best_regressor.pkl'),
+                                                  str(OUTPUTS_DIR / 'best_classifier.pkl')])
+    r.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    for path in args.bundles:
+        if args.command == 'export':
+            out = export_bundle(path)
+            flat = FlatEnsemble.load(out)
+            print(f'{path} → {out}: {len(flat.roots)} trees, {len(flat.value)} nodes, '
+                  f'{out.stat().st_size / 2 ** 10:.0f} KiB')
+        else:
+            rows, check = benchmark(path, args.rows)
+            print(f'\n{path} ({args.rows:,} rows): bit-exact={check["bit_exact"]} '
+                  f'max|diff|={check["max_abs_diff"]:.3g}')
+            for r in rows:
+                print(f'  {r["model"]:<7} file {r["file_mb"]:6.2f} MB  load {r["load_s"]:6.3f}s  '
+                      f'RSS {r["rss_mb"]:7.1f} MB  {r["rows_per_s"]:>12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,475 @@
+"""
+Joint scoring: FPVI, market value and transfer risk from one model.
+
+The three heads are separate boosters over the same `feature_cols` matrix:
+
+    fpvi           best_regressor.pkl (log-FPVI)
+    market_value   the best booster of the zoo's market-value leaderboard
+                   (log market value, taken from the model cache)
+    risk           best_classifier.pkl (Low / Medium / High) if it comes
+                   from the regressor's library, else the best classifier
+                   of that library by macro F1 (model cache)
+
+Scoring them one after the other builds three DataFrames and runs three
+native predict calls, three separate walks over the rows. Two joint modes
+replace them:
+
+    fused         `FusedEnsemble` exports every head with `fpv.flat`,
+                  concatenates their node arrays into one forest and walks
+                  all trees for a block of rows together. Each head sums its
+                  own slice of the leaf values in its booster's tree order
+                  and precision and applies its own link, so every output
+                  matches its native model bit for bit. One pickle-free
+                  `.npz` (`outputs/fused.npz`) that loads without LightGBM,
+                  XGBoost or scikit-learn
+    shared tree   `SharedTreeModel` is one XGBoost forest with vector leaves
+                  (`multi_strategy='multi_output_tree'`), fitted on the
+                  standardised log targets and the one-hot risk classes. A
+                  split must lower the summed squared error of all five
+                  columns (for the one-hot columns that is the Gini
+                  criterion), so one tree walk yields every output. Risk
+                  probabilities are the clipped, renormalised leaf sums.
+                  Refitted, so its accuracy is measured, not guaranteed
+
+`python -m fpv.predict --joint PATH` scores with either file and adds a
+`market_value_pred` column. `bench` compares throughput, load cost and
+test-split accuracy with the three-model baseline (native and one flat
+export per head).
+
+Run: python -m fpv.fused build
+     python -m fpv.fused fit
+     python -m fpv.fused bench --rows 100000
+"""
+
+import argparse
+import json
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import CLASSES, OUTPUTS_DIR, RANDOM_STATE
+from .flat import ARRAYS, FORMAT_VERSION, FlatEnsemble, export
+from .store import STORE_DIR, FeatureStore
+from .trace import span
+
+FUSED_PATH  = OUTPUTS_DIR / 'fused.npz'
+SHARED_PATH = OUTPUTS_DIR / 'shared_tree.pkl'
+HEADS       = ('fpvi', 'market_value', 'risk')
+RISK_COLS   = [f'risk_{c.lower()}' for c in CLASSES]
+# head -> (fit-target key prefix, score-target key prefix)
+TARGET_KEYS = {'fpvi': ('y_fpvi_log', 'y_fpvi_raw'), 'market_value': ('y_mv_log', 'y_mv_raw'),
+               'risk': ('y_cls', 'y_cls')}
+# Loss weight per head in the shared tree. Market value and risk are close to
+# noise in this data; at equal weight their columns dilute the FPVI splits.
+SHARED_WEIGHTS = {'fpvi': 3.0, 'market_value': 1.0, 'risk': 1.0}
+
+
+# ── Predictor ─────────────────────────────────────────────────────────────────
+
+class FusedEnsemble:
+    """Several flat tree ensembles over the same features, evaluated in one pass."""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.feature_cols = meta['feature_cols']
+        self.forest = FlatEnsemble(arrays, {**meta['forest'], 'feature_names': self.feature_cols})
+        self.heads = {}
+        for h in meta['heads']:
+            a, b = h['trees']
+            head_arrays = {**arrays, 'roots': arrays['roots'][a:b],
+                           'tree_class': arrays['tree_class'][a:b]}
+            self.heads[h['name']] = (FlatEnsemble(head_arrays, h['meta']), a, b)
+
+    @classmethod
+    def from_heads(cls, heads, feature_cols):
+        """Fuse {name: FlatEnsemble}; all heads must come from the same library."""
+        libs = {f.library for f in heads.values()}
+        if len(libs) != 1:
+            raise ValueError(f'heads mix libraries {sorted(libs)}; export them from one library')
+        parts = {k: [] for k in ARRAYS}
+        node_off = cat_off = tree_off = 0
+        n_cats = max(f.cat_sets.shape[1] for f in heads.values())
+        meta_heads = []
+        for name, f in heads.items():
+            if list(f.feature_names) != list(feature_cols):
+                raise ValueError(f'head {name!r} was trained on different feature_cols')
+            for k in ('feature', 'threshold', 'value', 'default_left', 'missing', 'tree_class'):
+                parts[k].append(getattr(f, k))
+            parts['children'].append(f.children + node_off)
+            parts['roots'].append(f.roots + node_off)
+            parts['cat_set'].append(np.where(f.cat_set >= 0, f.cat_set + cat_off, -1))
+            cats = np.zeros((len(f.cat_sets), n_cats), dtype=bool)
+            cats[:, :f.cat_sets.shape[1]] = f.cat_sets
+            parts['cat_sets'].append(cats)
+            meta_heads.append({'name': name, 'trees': [tree_off, tree_off + len(f.roots)],
+                               'meta': f.meta})
+            node_off += len(f.value)
+            cat_off += len(f.cat_sets)
+            tree_off += len(f.roots)
+        arrays = {k: np.concatenate(v).astype(parts[k][0].dtype, copy=False)
+                  for k, v in parts.items()}
+        any_head = next(iter(heads.values()))
+        meta = {'format_version': FORMAT_VERSION, 'feature_cols': list(feature_cols),
+                'heads': meta_heads,
+                'forest': {'library': any_head.library, 'objective': 'fused', 'n_outputs': 0,
+                           'base_score': [], 'max_depth': max(f.max_depth for f in heads.values())}}
+        return cls(arrays, meta)
+
+    def predict_raw(self, X, chunk_size=None):
+        """{head: raw margins (n_rows, n_outputs)} from one walk over all trees."""
+        forest = self.forest
+        X = np.ascontiguousarray(X, dtype=forest.dtype)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_cols):
+            raise ValueError(f'expected {len(self.feature_cols)} features, got shape {X.shape}')
+        chunk_size = chunk_size or max(64, (1 << 18) // max(len(forest.roots), 1))
+        out = {}
+        for name, (head, _, _) in self.heads.items():
+            out[name] = np.empty((head.n_outputs, len(X)), dtype=head.dtype)
+            out[name][:] = np.asarray(head.base_score, dtype=head.dtype)[:, None]
+        for i in range(0, len(X), chunk_size):
+            leaves = forest.value[forest._leaves(X[i:i + chunk_size])]
+            for name, (head, a, b) in self.heads.items():
+                head.accumulate(out[name][:, i:i + chunk_size], leaves[a:b])
+        return {name: raw.T for name, raw in out.items()}
+
+    def predict(self, X):
+        """{head: log-target prediction (regressors) or class probabilities (classifiers)}."""
+        out = {}
+        for name, raw in self.predict_raw(X).items():
+            head = self.heads[name][0]
+            out[name] = raw[:, 0] if head.objective == 'regression' else head.proba_from_raw(raw)
+        return out
+
+    # --- persistence ---
+    def save(self, path):
+        tmp = Path(path).with_name(f'.{Path(path).name}')
+        forest = self.forest
+        arrays = {name: getattr(forest, name) for name in ARRAYS}
+        with open(tmp, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(self.meta)), **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z['meta']))
+            if meta.get('format_version') != FORMAT_VERSION or 'heads' not in meta:
+                raise ValueError(f'{path}: not a fused model (format {meta.get("format_version")})')
+            return cls({name: z[name] for name in ARRAYS}, meta)
+
+
+class SharedTreeModel:
+    """
+    One multi-output XGBoost forest for all heads. Output columns are
+    [fpvi, market_value, *risk classes], each scaled by its head's weight;
+    `predict` undoes the scaling and returns the same dict as `FusedEnsemble`.
+    """
+
+    def __init__(self, model, feature_cols, center, scale, weights, classes=CLASSES):
+        self.model = model
+        self.feature_cols = list(feature_cols)
+        self.center = np.asarray(center, dtype=np.float64)    # fpvi, market_value
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.weights = dict(weights)
+        self.classes = list(classes)
+
+    def encode(self, y_fpvi, y_mv, y_cls):
+        w = self.weights
+        reg = (np.column_stack([y_fpvi, y_mv]) - self.center) / self.scale
+        reg *= [w['fpvi'], w['market_value']]
+        return np.hstack([reg, w['risk'] * np.eye(len(self.classes))[y_cls]])
+
+    def predict(self, X):
+        """{head: log-target prediction (regressors) or class probabilities (risk)}."""
+        Z = self.model.predict(pd.DataFrame(X, columns=self.feature_cols, copy=False))
+        Z = Z.astype(np.float64)
+        w = self.weights
+        reg = Z[:, :2] / [w['fpvi'], w['market_value']] * self.scale + self.center
+        proba = np.clip(Z[:, 2:] / w['risk'], 1e-6, None)
+        return {'fpvi': reg[:, 0], 'market_value': reg[:, 1],
+                'risk': proba / proba.sum(axis=1, keepdims=True)}
+
+
+def load_joint(path):
+    """A fused `.npz` or a pickled `SharedTreeModel`."""
+    if str(path).endswith('.npz'):
+        return FusedEnsemble.load(path)
+    return _load_bundle(path)
+
+
+class JointScorer:
+    """`fpv.predict.Scorer` counterpart that scores every head from one feature matrix."""
+
+    def __init__(self, model):
+        from .features import FeatureTransformer
+
+        self.model = model
+        self.ft = FeatureTransformer.from_feature_cols(model.feature_cols)
+        if isinstance(model, FusedEnsemble):
+            self.classes = model.heads['risk'][0].meta.get('class_names') or CLASSES
+        else:
+            self.classes = model.classes
+
+    @classmethod
+    def from_path(cls, path=FUSED_PATH):
+        return cls(load_joint(path))
+
+    def score(self, df):
+        X = self.ft.transform(df)
+        with span('score.joint', rows=len(X)):
+            out = self.model.predict(X)
+        res = pd.DataFrame({'player_id': df['player_id'].to_numpy()} if 'player_id' in df
+                           else {}, index=df.index)
+        res['fpvi_pred'] = np.clip(np.expm1(out['fpvi']), 0, None)
+        res['market_value_pred'] = np.clip(np.expm1(out['market_value']), 0, None)
+        proba = out['risk']
+        for j, col in enumerate(RISK_COLS):
+            res[col] = proba[:, j]
+        res['risk_level'] = np.asarray(self.classes, dtype=object)[proba.argmax(axis=1)]
+        return res
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def _load_bundle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _library(model):
+    return type(model).__module__.split('.')[0]
+
+
+def market_value_model(store_path=STORE_DIR, library='lightgbm'):
+    """Lowest-RMSE `library` booster of the market-value leaderboard (zoo cache)."""
+    from .zoo import run_zoo
+
+    entries = run_zoo(store_path, ('market_value',), write=False)['market_value']
+    boosters = [e for e in entries if _library(e['model_obj']) == library]
+    if not boosters:
+        raise ValueError(f'no {library} model in the market-value leaderboard')
+    return min(boosters, key=lambda e: e['RMSE'])
+
+
+def risk_model(store_path=STORE_DIR, library='lightgbm'):
+    """Highest macro-F1 `library` classifier (fits shared with the zoo's model cache)."""
+    from .zoo import CACHE_DIR, run_classifiers
+
+    entries = run_classifiers(store_path, write=False, cache_dir=CACHE_DIR)
+    boosters = [e for e in entries if _library(e['model_obj']) == library]
+    if not boosters:
+        raise ValueError(f'no {library} classifier in the risk leaderboard; '
+                         f'pass a {library} classifier bundle')
+    return max(boosters, key=lambda e: e['Macro F1'])
+
+
+def head_models(reg_path, cls_path, store_path=STORE_DIR):
+    """
+    The three native heads as {name: (model, feature_cols, classes, label)}.
+    Every head comes from the regressor's library: the classifier bundle is
+    used if it does, the library's best classifier otherwise.
+    """
+    reg, cls = _load_bundle(reg_path), _load_bundle(cls_path)
+    library = _library(reg['model'])
+    mv = market_value_model(store_path, library)
+    if _library(cls['model']) == library:
+        risk = (cls['model'], cls['feature_cols'], cls.get('classes', CLASSES), cls.get('name'))
+    else:
+        best = risk_model(store_path, library)
+        risk = (best['model_obj'], reg['feature_cols'], CLASSES, best['Model'])
+    return {
+        'fpvi':         (reg['model'], reg['feature_cols'], None, reg.get('name')),
+        'market_value': (mv['model_obj'], reg['feature_cols'], None, mv['Model']),
+        'risk':         risk,
+    }
+
+
+def build(reg_path=OUTPUTS_DIR / 'best_regressor.pkl',
+          cls_path=OUTPUTS_DIR / 'best_classifier.pkl', store_path=STORE_DIR,
+          out=FUSED_PATH):
+    """Export and fuse the three heads; returns (FusedEnsemble, native heads)."""
+    natives = head_models(reg_path, cls_path, store_path)
+    cols = natives['fpvi'][1]
+    flats = {name: export(model, fc, classes, label)
+             for name, (model, fc, classes, label) in natives.items()}
+    fused = FusedEnsemble.from_heads(flats, cols)
+    if out:
+        fused.save(out)
+    return fused, natives
+
+
+def shared_tree_spec(random_state=RANDOM_STATE):
+    """The zoo's XGBoost settings, with vector leaves instead of one tree per output."""
+    from xgboost import XGBRegressor
+
+    return XGBRegressor(n_estimators=600, learning_rate=0.04, max_depth=5, subsample=0.8,
+                        colsample_bytree=0.8, reg_alpha=0.1, tree_method='hist',
+                        multi_strategy='multi_output_tree', random_state=random_state,
+                        verbosity=0)
+
+
+def fit_shared(store_path=STORE_DIR, weights=SHARED_WEIGHTS):
+    """Fit the shared-tree model on the store's training split."""
+    from .zoo import model_input
+
+    store = FeatureStore(store_path)
+    y = {h: store.array(f'{TARGET_KEYS[h][0]}_tr') for h in HEADS}
+    reg = np.column_stack([y['fpvi'], y['market_value']])
+    shared = SharedTreeModel(shared_tree_spec(store['random_state'] or RANDOM_STATE),
+                             store.feature_cols, reg.mean(axis=0), reg.std(axis=0), weights)
+    X = model_input(store, False)('X_train')
+    with span('fused.fit_shared', rows=len(X)):
+        shared.model.fit(X, shared.encode(y['fpvi'], y['market_value'], y['risk']))
+    return shared
+
+
+def save_shared(shared, path=SHARED_PATH):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(shared, f)
+    Path(tmp).replace(path)
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+def _native_predict(natives, X):
+    out = {}
+    for name, (model, cols, classes, _) in natives.items():
+        Xdf = pd.DataFrame(X, columns=cols)
+        out[name] = model.predict_proba(Xdf) if classes is not None else model.predict(Xdf)
+    return out
+
+
+def _separate_flat_predict(flats, X):
+    return {name: (f.predict_proba(X) if f.objective != 'regression' else f.predict(X))
+            for name, f in flats.items()}
+
+
+def _cold_load(body, paths):
+    import subprocess
+    import sys
+
+    from .config import ROOT_DIR
+    from .flat import _LOAD_SNIPPET
+
+    res = subprocess.run([sys.executable, '-c', _LOAD_SNIPPET.format(body=body), *map(str, paths)],
+                         capture_output=True, text=True, cwd=ROOT_DIR, check=True)
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def benchmark(n_rows=100_000, store_path=STORE_DIR, seed=0, repeats=3):
+    """
+    Three native models vs three flat exports vs the fused pass vs the
+    shared tree: rows/s on `n_rows` synthetic players, cold load and file
+    size, test-split metrics per head, and whether every fused output is
+    bit-identical to its native model.
+    """
+    import tempfile
+
+    from .features import FeatureTransformer
+    from .synthetic import generate
+    from .zoo import score_classification, score_regression
+
+    fused, natives = build(store_path=store_path, out=None)
+    shared = fit_shared(store_path)
+    flats = {name: head for name, (head, _, _) in fused.heads.items()}   # one walk per head
+    X = FeatureTransformer.from_feature_cols(fused.feature_cols).transform(generate(n_rows, seed))
+
+    modes = {'native × 3':  lambda X: _native_predict(natives, X),
+             'flat × 3':    lambda X: _separate_flat_predict(flats, X),
+             'fused':       fused.predict,
+             'shared tree': shared.predict}
+    rows, outputs = [], {}
+    for mode, fn in modes.items():
+        best = float('inf')
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            outputs[mode] = fn(X)
+            best = min(best, time.perf_counter() - t0)
+        rows.append({'mode': mode, 'rows/s': n_rows / best, 'seconds': best})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pkls = []
+        for name, (model, cols, classes, label) in natives.items():
+            pkls.append(Path(tmp) / f'{name}.pkl')
+            with open(pkls[-1], 'wb') as f:
+                pickle.dump({'model': model, 'feature_cols': cols}, f)
+        fused_path, shared_path = Path(tmp) / 'fused.npz', Path(tmp) / 'shared_tree.pkl'
+        fused.save(fused_path)
+        save_shared(shared, shared_path)
+        load = "from fpv.fused import load_joint\nm = load_joint(sys.argv[1])"
+        loads = {'native × 3': _cold_load(
+                     "import pickle\nm = [pickle.load(open(p, 'rb')) for p in sys.argv[1:]]", pkls),
+                 'fused': _cold_load(load, [fused_path]),
+                 'shared tree': _cold_load(load, [shared_path])}
+        sizes = {'native × 3': sum(p.stat().st_size for p in pkls),
+                 'fused': fused_path.stat().st_size, 'shared tree': shared_path.stat().st_size}
+    for r in rows:
+        load = loads.get(r['mode'], {})
+        r.update({'load s': load.get('load_s'), 'RSS MB': load.get('rss_mb'),
+                  'file MB': sizes[r['mode']] / 2 ** 20 if r['mode'] in sizes else None})
+
+    bit_exact = {name: bool(np.array_equal(outputs['native × 3'][name], outputs['fused'][name]))
+                 for name in HEADS}
+
+    store = FeatureStore(store_path)
+    X_te = store.array('X_test')
+    test = {'native': _native_predict(natives, X_te), 'fused': fused.predict(X_te),
+            'shared tree': shared.predict(X_te)}
+    acc = []
+    for name in HEADS:
+        y = store.array(f'{TARGET_KEYS[name][1]}_te')
+        score = score_classification if name == 'risk' else score_regression
+        for mode, out in test.items():
+            label = 'one forest, all heads' if mode == 'shared tree' else natives[name][3]
+            acc.append({'head': name, 'mode': mode, 'model': label, **score(y, out[name])})
+    return pd.DataFrame(rows), pd.DataFrame(acc), bit_exact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.fused',
+                                     description='One-pass FPVI + market value + risk scoring.')
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--regressor', default=str(OUTPUTS_DIR / 'best_regressor.pkl'))
+    parser.add_argument('--classifier', default=str(OUTPUTS_DIR / 'best_classifier.pkl'))
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help='export and fuse the three heads (bit-exact)')
+    b.add_argument('--out', default=str(FUSED_PATH))
+    f = sub.add_parser('fit', help='fit the shared-tree multi-output model')
+    f.add_argument('--out', default=str(SHARED_PATH))
+    r = sub.add_parser('bench', help='throughput, load cost and accuracy vs three models')
+    r.add_argument('--rows', type=int, default=100_000)
+    r.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        fused, natives = build(args.regressor, args.classifier, args.store, args.out)
+        heads = ', '.join(f'{n}: {natives[n][3]} ({b - a} trees)'
+                          for n, (_, a, b) in fused.heads.items())
+        print(f'{heads}\n→ {args.out} ({Path(args.out).stat().st_size / 2 ** 10:.0f} KiB, '
+              f'{len(fused.forest.value):,} nodes)')
+        return
+    if args.command == 'fit':
+        t0 = time.perf_counter()
+        shared = fit_shared(args.store)
+        save_shared(shared, args.out)
+        print(f'{shared.model.n_estimators} vector-leaf trees, {len(HEADS)} heads '
+              f'({time.perf_counter() - t0:.1f}s)\n→ {args.out}')
+        return
+
+    speed, acc, bit_exact = benchmark(args.rows, args.store, repeats=args.repeats)
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(f'Throughput ({args.rows:,} synthetic rows, best of {args.repeats}):')
+        print(speed.round(3).to_string(index=False))
+        print('\nTest split:')
+        print(acc.round(4).to_string(index=False))
+    print('\nfused == native: ' + ', '.join(f'{n} {"bit-exact" if ok else "DIFFERS"}'
+                                           for n, ok in bit_exact.items()))
+
+
+if __name__ == '__main__':
+    from fpv.fused import main   # pickle SharedTreeModel under its import path
+    main()
@@ -0,0 +1,324 @@
+"""
+Incremental retraining when new player-seasons arrive.
+
+Instead of re-splitting, re-scaling, re-encoding and refitting from
+`data/fifa_player_performance_market_value.csv`, `update` works only on the
+rows that changed since the last run:
+
+1. Diff the incoming raw file against the manifest (`player_id` + a hash of
+   every raw column) stored next to the feature store: appended, changed,
+   unchanged and removed players. The bundle keeps its own manifest of the
+   train-split rows its model was fitted on (`seen_rows`), so a delta that
+   another bundle already wrote into the store is still trained into this
+   one. Changed validation / test rows are updated in the store but never
+   trained into the model.
+2. Engineer features for the appended / changed rows only.
+3. Update the category vocabulary (`FeatureTransformer.partial_fit`) and the
+   `StandardScaler` statistics in place. Changed rows are first removed from
+   the running mean / variance, then the new values are added.
+4. Write the delta into the feature store. Changed rows are replaced where
+   they live; appended rows join the train split.
+5. Continue boosting the saved model from its existing trees on the delta
+   plus a replay sample of earlier training rows. LightGBM uses `init_model`,
+   XGBoost `xgb_model`, and sklearn ensembles `warm_start`.
+
+Nothing is written until the model has been updated: the bundle is saved
+first, then the store, vocabulary and manifest, each with write-then-rename.
+A failed fit leaves the delta pending for the next run.
+
+New categories are added to the saved vocabulary but not to the model's
+one-hot layout (continued trees need identical columns). The report flags
+them, because using them needs a full rebuild.
+
+Run: python -m fpv.incremental new_players.csv --bundle outputs/best_regressor.pkl --rounds 50
+"""
+
+import argparse
+import json
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import DATA_PATH, OUTPUTS_DIR, RANDOM_STATE
+from .features import RAW_COLUMNS, FeatureTransformer, build_targets
+from .store import (MANIFEST, SPLITS, STORE_DIR, TARGET_SETS, VOCAB, FeatureStore,
+                    write_store)
+
+
+# ── Manifest / diff ───────────────────────────────────────────────────────────
+
+def raw_row_hashes(df):
+    return pd.util.hash_pandas_object(df[RAW_COLUMNS], index=False).to_numpy()
+
+
+def load_manifest(store_path=STORE_DIR, source=DATA_PATH):
+    """
+    (player_id, row_hash, store index label) arrays. Bootstrapped from the
+    source CSV when there is no manifest, or when its labels are not the
+    store's rows (the store was rebuilt since, e.g. by `fpv.pipeline`).
+    """
+    path = Path(store_path) / MANIFEST
+    if path.exists():
+        store = FeatureStore(store_path)
+        rows = np.concatenate([store.index(split) for split in SPLITS])
+        with np.load(path) as z:
+            if np.array_equal(np.sort(z['label']), np.sort(rows)):
+                return z['player_id'], z['row_hash'], z['label']
+    df = pd.read_csv(source)                     # store labels are the CSV row positions
+    return df['player_id'].to_numpy(), raw_row_hashes(df), df.index.to_numpy()
+
+
+def bundle_manifest(bundle, store, source=DATA_PATH):
+    """(player_id, row_hash) of the train rows the bundle's model was fitted on."""
+    seen = bundle.get('seen_rows')
+    if seen is not None:
+        return seen['player_id'], seen['row_hash']
+    df = pd.read_csv(source)                     # fitted on the CSV's train split
+    train = store.index('train')
+    df = df.iloc[train[train < len(df)]]
+    return df['player_id'].to_numpy(), raw_row_hashes(df)
+
+
+def save_manifest(store_path, player_id, row_hash, label):
+    tmp = store_path / f'.{MANIFEST}'
+    with open(tmp, 'wb') as f:
+        np.savez(f, player_id=player_id, row_hash=row_hash, label=label)
+    tmp.replace(store_path / MANIFEST)
+
+
+def diff_players(df, manifest):
+    """Boolean masks over `df` (appended, changed) and the count of removed players."""
+    old_ids, old_hash = manifest[:2]
+    pos      = pd.Index(old_ids).get_indexer(df['player_id'].to_numpy())
+    hashes   = raw_row_hashes(df)
+    appended = pos < 0
+    changed  = ~appended & (old_hash[np.where(appended, 0, pos)] != hashes)
+    removed  = len(old_ids) - int((~appended).sum())
+    return appended, changed, removed, pos, hashes
+
+
+def merge_manifest(manifest, df, appended, changed, pos, hashes):
+    """`(player_id, row_hash)` after applying a diff's appended / changed rows."""
+    ids, row_hash = manifest[:2]
+    row_hash = row_hash.copy()
+    row_hash[pos[changed]] = hashes[changed]
+    return (np.concatenate([ids, df['player_id'].to_numpy()[appended]]),
+            np.concatenate([row_hash, hashes[appended]]))
+
+
+# ── Scaler statistics ─────────────────────────────────────────────────────────
+
+def scaler_remove(scaler, X):
+    """Exactly remove rows `X` from a fitted StandardScaler's running statistics."""
+    X = np.asarray(X, dtype=np.float64)
+    n, m = scaler.n_samples_seen_, len(X)
+    if m == 0:
+        return scaler
+    if m >= n:
+        raise ValueError('cannot remove every sample from the scaler')
+    mean, var = scaler.mean_, scaler.var_
+    sum_sq  = n * (var + mean ** 2) - (X ** 2).sum(axis=0)
+    n_new   = n - m
+    mean_new = (n * mean - X.sum(axis=0)) / n_new
+    var_new  = np.maximum(sum_sq / n_new - mean_new ** 2, 0.0)
+    scale    = np.sqrt(var_new)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0   # sklearn's zero-variance rule
+    scaler.mean_, scaler.var_, scaler.scale_ = mean_new, var_new, scale
+    scaler.n_samples_seen_ = type(scaler.n_samples_seen_)(n_new)
+    return scaler
+
+
+# ── Continued boosting ────────────────────────────────────────────────────────
+
+def n_trees(model):
+    lib = type(model).__module__.split('.')[0]
+    if lib == 'lightgbm':
+        return model.booster_.current_iteration()
+    if lib == 'xgboost':
+        return model.get_booster().num_boosted_rounds()
+    return len(getattr(model, 'estimators_', []))
+
+
+def continue_boosting(model, X, y, rounds):
+    """Add `rounds` trees to a fitted ensemble, trained on (X, y)."""
+    from sklearn.base import clone
+
+    lib = type(model).__module__.split('.')[0]
+    if lib == 'lightgbm':
+        new = clone(model).set_params(n_estimators=rounds)
+        return new.fit(X, y, init_model=model.booster_)
+    if lib == 'xgboost':
+        new = clone(model).set_params(n_estimators=rounds, early_stopping_rounds=None)
+        return new.fit(X, y, xgb_model=model.get_booster())
+    if 'warm_start' in model.get_params():
+        model.set_params(warm_start=True, n_estimators=n_trees(model) + rounds)
+        model.fit(X, y)
+        return model.set_params(warm_start=False)
+    raise TypeError(f'{type(model).__name__} cannot continue training incrementally')
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def _write_atomic(path, write, mode='wb'):
+    """`write(f)` into a temp file next to `path`, then rename it over `path`."""
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, mode) as f:
+        write(f)
+    tmp.replace(path)
+
+
+def update(new_path, bundle_path=OUTPUTS_DIR / 'best_regressor.pkl', store_path=STORE_DIR,
+           rounds=50, replay=1.0, out_path=None, seed=RANDOM_STATE):
+    """
+    Apply the appended / changed players in `new_path` to the feature store,
+    scaler, vocabulary and the model in `bundle_path`. Returns a report dict.
+    """
+    t0 = time.perf_counter()
+    store_path = Path(store_path)
+    store = FeatureStore(store_path)
+    df    = pd.read_csv(new_path)
+    with open(bundle_path, 'rb') as f:
+        bundle = pickle.load(f)
+
+    manifest = load_manifest(store_path)
+    appended, changed, removed, pos, hashes = diff_players(df, manifest)
+    delta = appended | changed                   # rows the store has not seen
+    old_ids, old_hash, old_label = manifest
+    labels = np.where(appended, -1, old_label[np.where(appended, 0, pos)])
+    next_label = int(old_label.max()) + 1
+    labels[appended] = np.arange(next_label, next_label + int(appended.sum()))
+    in_train = appended | np.isin(labels, store.index('train'))   # appended rows join train
+
+    seen = bundle_manifest(bundle, store)
+    fit_app, fit_chg, _, fit_pos, _ = diff_players(df, seen)
+    fit_app &= in_train                          # val / test rows are never fitted
+    fit_chg &= in_train
+    unseen = fit_app | fit_chg                   # train rows the model has not seen
+    report = {'rows_in_file': len(df), 'appended': int(appended.sum()),
+              'changed': int(changed.sum()), 'removed_ignored': removed,
+              'unchanged_skipped': int((~delta).sum()), 'unseen_by_model': int(unseen.sum())}
+    if not delta.any() and not unseen.any():
+        report.update(seconds=time.perf_counter() - t0, status='up to date')
+        return report
+
+    feature_cols = list(bundle['feature_cols'])
+    if feature_cols != store.feature_cols:
+        raise ValueError('bundle feature_cols do not match the feature store')
+
+    # --- vocabulary (grows in place; model layout stays frozen) ---
+    vocab_path = store_path / VOCAB
+    ft = (FeatureTransformer.load(vocab_path) if vocab_path.exists()
+          else FeatureTransformer.from_feature_cols(feature_cols))
+    before = {c: set(v) for c, v in ft.categories_.items()}
+    ft.partial_fit(df[delta])
+    new_cats = {c: sorted(set(v) - before[c]) for c, v in ft.categories_.items()
+                if set(v) - before[c]}
+
+    # --- features + targets for the store delta and the model's unseen rows ---
+    work    = delta | unseen
+    frozen  = FeatureTransformer.from_feature_cols(feature_cols)
+    X_work  = frozen.transform_frame(df[work])
+    y_work  = build_targets(df[work], seed=seed)
+
+    # --- store + scaler (in memory until the model is saved) ---
+    data   = store.to_bundle()
+    scaler = data['scaler']
+    X_work.index = y_work.index = labels[work]
+
+    chg_labels = pd.Index(labels[changed])
+    for split, (x_key, sfx) in SPLITS.items():
+        X = data[x_key]
+        hit = X.index.isin(chg_labels)
+        if split == 'train' and hit.any():
+            scaler_remove(scaler, X[hit])
+        X.loc[hit] = X_work.loc[X.index[hit]]
+        for prefix, name in TARGET_SETS.items():
+            data[f'{prefix}_{sfx}'].loc[hit] = y_work.loc[X.index[hit], name]
+
+    new_rows = pd.Index(labels[appended])
+    data['X_train'] = pd.concat([data['X_train'], X_work.loc[new_rows]])
+    for prefix, name in TARGET_SETS.items():
+        data[f'{prefix}_tr'] = pd.concat([data[f'{prefix}_tr'], y_work.loc[new_rows, name]])
+    train_delta = data['X_train'].index.isin(labels[delta])
+    if train_delta.any():
+        scaler.partial_fit(data['X_train'][train_delta])
+
+    # --- continue boosting on the unseen rows + replay sample ---
+    model  = bundle['model']
+    is_cls = 'classes' in bundle
+    target = 'transfer_risk_encoded' if is_cls else 'log_fpvi'
+    y_key  = 'y_cls_tr' if is_cls else 'y_fpvi_log_tr'
+    trees_before = trees_after = n_trees(model)
+    fit_rows, fit_s = pd.Index(labels[unseen]), 0.0
+    fit_rows = fit_rows[fit_rows.isin(data['X_train'].index)]     # train split only
+    if unseen.any():
+        old_rows = data['X_train'].index[~data['X_train'].index.isin(fit_rows)]
+        n_replay = min(len(old_rows), int(round(replay * len(fit_rows))))
+        replay_rows = np.random.RandomState(seed).choice(old_rows, n_replay, replace=False)
+        X_fit = pd.concat([X_work.loc[fit_rows], data['X_train'].loc[replay_rows]])
+        y_fit = pd.concat([y_work.loc[fit_rows, target], data[y_key].loc[replay_rows]])
+
+        t_fit = time.perf_counter()
+        new_model = continue_boosting(model, X_fit, y_fit, rounds)
+        fit_s = time.perf_counter() - t_fit
+        trees_after = n_trees(new_model)
+        if trees_after > trees_before:
+            ids, row_hash = merge_manifest(seen, df, fit_app, fit_chg, fit_pos, hashes)
+            bundle.update(model=new_model, seen_rows={'player_id': ids, 'row_hash': row_hash},
+                          incremental_updates=bundle.get('incremental_updates', 0) + 1)
+            _write_atomic(out_path or bundle_path, lambda f: pickle.dump(bundle, f))
+            status = 'updated'
+        else:                                    # rows stay unseen: retried with the next delta
+            trees_after = trees_before
+            status = (f'delta too small: {len(X_fit)} rows fitted, no split met the '
+                      f'model\'s constraints, no trees added')
+    else:
+        status = 'store updated; model already trained on these rows'
+
+    # --- commit the store, vocabulary and manifest ---
+    if delta.any():
+        write_store(data, store_path)
+        _write_atomic(vocab_path, lambda f: json.dump({'categories': ft.categories_}, f,
+                                                     indent=1), 'w')
+        ids, row_hash = merge_manifest(manifest, df, appended, changed, pos, hashes)
+        save_manifest(store_path, ids, row_hash, np.concatenate([old_label, labels[appended]]))
+
+    total_rows = len(data['X_train']) + len(data['X_val']) + len(data['X_test'])
+    report.update({
+        'status':            status,
+        'new_categories':    new_cats,
+        'rows_engineered':   int(work.sum()),
+        'rows_in_store':     total_rows,
+        'rows_fitted':       len(fit_rows),
+        'trees_reused':      trees_before,
+        'trees_added':       trees_after - trees_before,
+        'fit_seconds':       fit_s,
+        'seconds':           time.perf_counter() - t0,
+        'work_skipped_rows': 1 - work.sum() / max(total_rows, 1),
+        'work_skipped_trees': trees_before / max(trees_after, 1),
+    })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.incremental',
+                                     description='Incremental update from new player rows.')
+    parser.add_argument('input', help='raw players CSV (full or appended export)')
+    parser.add_argument('--bundle', default=str(OUTPUTS_DIR / 'best_regressor.pkl'))
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--rounds', type=int, default=50, help='trees to add')
+    parser.add_argument('--replay', type=float, default=1.0,
+                        help='old training rows replayed per delta row')
+    parser.add_argument('--out', help='output bundle (default: overwrite --bundle)')
+    args = parser.parse_args(argv)
+
+    report = update(args.input, args.bundle, args.store, args.rounds, args.replay, args.out)
+    print(json.dumps(report, indent=1, default=float))
+
+
+if __name__ == '__main__':
+    main()
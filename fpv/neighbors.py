@@ -0,0 +1,433 @@
+"""
+"Comparable players" similarity index over the scaled feature space.
+
+Answers "the k players most similar to X, and what are they worth" without
+scanning every row. Vectors are the 05_clustering `perf_features` (or all
+44 `feature_cols`) standardised with the 02_features `StandardScaler`.
+
+Two backends behind one `ComparablesIndex`:
+
+    exact  sklearn KD-tree (<= 16 dims) or ball tree. Inserted players go
+           to a brute-force tail buffer that is merged into a rebuilt tree
+           once it passes `rebuild_fraction` of the indexed rows.
+    ivf    inverted-file index: a KMeans coarse quantizer with ~sqrt(n)
+           lists, and a query scans only the `nprobe` nearest lists.
+           Insertion appends to the nearest list, so no rebuild is needed.
+
+Queries run in batches with optional `position_group` / age filters. A
+`benchmark` helper reports recall@k against brute force and the latency
+of each backend.
+
+Run: python -m fpv.neighbors build --backend ivf
+     python -m fpv.neighbors query 17 42 --k 20 --position-group Attacker
+     python -m fpv.neighbors bench --rows 200000
+"""
+
+import argparse
+import json
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from .clustering import PERF_FEATURES
+from .config import OUTPUTS_DIR, RANDOM_STATE
+from .features import FeatureTransformer, compute_fpvi, position_group
+from .store import SPLITS, STORE_DIR, FeatureStore
+
+INDEX_PATH = OUTPUTS_DIR / 'comparables.pkl'
+META_COLS  = ['player_id', 'age', 'position_group', 'market_value_million_eur', 'fpvi']
+
+
+def _sq_dists(Q, X):
+    """Squared Euclidean distances between every row of Q and X."""
+    d = (Q ** 2).sum(1)[:, None] - 2 * Q @ X.T + (X ** 2).sum(1)[None, :]
+    return np.maximum(d, 0.0)
+
+
+def _top_k(dist, k):
+    """Column positions and distances of the k smallest entries per row (sorted)."""
+    k = min(k, dist.shape[1])
+    part = np.argpartition(dist, k - 1, axis=1)[:, :k] if k < dist.shape[1] else \
+        np.broadcast_to(np.arange(dist.shape[1]), dist.shape).copy()
+    d = np.take_along_axis(dist, part, axis=1)
+    order = np.argsort(d, axis=1, kind='stable')
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(d, order, axis=1)
+
+
+def _pad(pos, dist, k):
+    """Pad per-query results shorter than k with (-1, inf)."""
+    out_p = np.full(k, -1, dtype=np.int64)
+    out_d = np.full(k, np.inf)
+    out_p[:len(pos)], out_d[:len(dist)] = pos[:k], dist[:k]
+    return out_p, out_d
+
+
+def _pad_rows(pos, dist, k):
+    """Batch version of `_pad` for (n_queries, <= k) result blocks."""
+    if pos.shape[1] == k:
+        return pos, dist
+    out = [_pad(p, d, k) for p, d in zip(pos, dist)]
+    return np.stack([o[0] for o in out]), np.stack([o[1] for o in out])
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+class ExactBackend:
+    """KD / ball tree over the bulk of the rows plus a brute-force tail buffer."""
+
+    def __init__(self, leaf_size=40, rebuild_fraction=0.1):
+        self.leaf_size        = leaf_size
+        self.rebuild_fraction = rebuild_fraction
+        self.tree             = None
+        self.n_tree           = 0
+
+    def build(self, X):
+        from sklearn.neighbors import BallTree, KDTree
+
+        tree_cls  = KDTree if X.shape[1] <= 16 else BallTree
+        self.tree = tree_cls(X, leaf_size=self.leaf_size)
+        self.n_tree = len(X)
+
+    def add(self, X, n_total):
+        """Called after rows were appended to the shared matrix `X`."""
+        if n_total - self.n_tree > self.rebuild_fraction * max(self.n_tree, 1):
+            self.build(X)
+
+    def search(self, X, Q, k, mask=None):
+        tail = np.arange(self.n_tree, len(X))
+        if mask is not None and mask.mean() < 0.05:            # very selective filter
+            allowed = np.flatnonzero(mask)
+            if not len(allowed):
+                return np.full((len(Q), k), -1, dtype=np.int64), np.full((len(Q), k), np.inf)
+            pos, dist = _top_k(_sq_dists(Q, X[allowed]), k)
+            return _pad_rows(allowed[pos], np.sqrt(dist), k)
+
+        if mask is None:                                        # one batched tree query
+            dist, pos = self.tree.query(Q, k=min(k, self.n_tree))
+            if len(tail):
+                td = np.sqrt(_sq_dists(Q, X[tail]))
+                both_d = np.hstack([dist, td])
+                sel, dist = _top_k(both_d, k)
+                pos = np.hstack([pos, np.broadcast_to(tail, td.shape)])
+                pos = np.take_along_axis(pos, sel, axis=1)
+            return _pad_rows(pos, dist, k)
+
+        results = []
+        for q in range(len(Q)):
+            kk = min(self.n_tree, 4 * k)
+            while True:                                         # widen until k rows pass
+                dist, pos = self.tree.query(Q[q:q + 1], k=kk)
+                keep = mask[pos[0]]
+                dist, pos = dist[0][keep], pos[0][keep]
+                if len(pos) >= k or kk == self.n_tree:
+                    break
+                kk = min(self.n_tree, 2 * kk)
+            t = tail[mask[tail]]
+            if len(t):
+                td = np.sqrt(_sq_dists(Q[q:q + 1], X[t])[0])
+                pos, dist = np.concatenate([pos, t]), np.concatenate([dist, td])
+                order = np.argsort(dist, kind='stable')[:k]
+                pos, dist = pos[order], dist[order]
+            results.append(_pad(pos, dist, k))
+        return np.stack([r[0] for r in results]), np.stack([r[1] for r in results])
+
+
+class IVFBackend:
+    """Inverted lists keyed by a KMeans coarse quantizer; probes `nprobe` lists."""
+
+    def __init__(self, n_lists=None, nprobe=8, seed=RANDOM_STATE):
+        self.n_lists   = n_lists
+        self.nprobe    = nprobe
+        self.seed      = seed
+        self.centroids = None
+        self.assign    = np.empty(0, dtype=np.int32)
+        self._lists    = None
+
+    def build(self, X):
+        from sklearn.cluster import MiniBatchKMeans
+
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(X))))
+        km = MiniBatchKMeans(n_clusters=n_lists, n_init=3, batch_size=4096,
+                             random_state=self.seed).fit(X)
+        self.centroids = km.cluster_centers_
+        self.assign    = self._nearest_list(X)
+        self._lists    = None
+
+    def _nearest_list(self, X, chunk_size=65_536):
+        out = np.empty(len(X), dtype=np.int32)
+        for i in range(0, len(X), chunk_size):
+            out[i:i + chunk_size] = _sq_dists(X[i:i + chunk_size], self.centroids).argmin(1)
+        return out
+
+    def add(self, X, n_total):
+        new = X[len(self.assign):n_total]
+        self.assign = np.concatenate([self.assign, self._nearest_list(new)])
+        self._lists = None
+
+    @property
+    def lists(self):
+        """CSR layout of the inverted lists: (row order, offsets)."""
+        if self._lists is None:
+            order   = np.argsort(self.assign, kind='stable')
+            offsets = np.searchsorted(self.assign[order], np.arange(len(self.centroids) + 1))
+            self._lists = (order, offsets)
+        return self._lists
+
+    def search(self, X, Q, k, mask=None, nprobe=None):
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        order, offsets = self.lists
+        probe, _ = _top_k(_sq_dists(Q, self.centroids), nprobe)
+        out_p = np.full((len(Q), k), -1, dtype=np.int64)
+        out_d = np.full((len(Q), k), np.inf)
+        for q in range(len(Q)):
+            cand = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe[q]])
+            if mask is not None:
+                cand = cand[mask[cand]]
+            if not len(cand):
+                continue
+            pos, dist = _top_k(_sq_dists(Q[q:q + 1], X[cand]), k)
+            out_p[q], out_d[q] = _pad(cand[pos[0]], np.sqrt(dist[0]), k)
+        return out_p, out_d
+
+
+BACKENDS = {'exact': ExactBackend, 'ivf': IVFBackend}
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+class ComparablesIndex:
+    """Scaled player vectors + metadata + one search backend."""
+
+    def __init__(self, vectors, meta, mean, scale, features, layout, backend='exact',
+                 **backend_kwargs):
+        if backend not in BACKENDS:
+            raise ValueError(f'backend must be one of {list(BACKENDS)}')
+        self.features = list(features)
+        self.layout   = list(layout)                 # full feature_cols, for insertion
+        self.mean     = np.asarray(mean, dtype=np.float64)
+        self.scale    = np.asarray(scale, dtype=np.float64)
+        self.meta     = meta.reset_index(drop=True)[META_COLS]
+        self._X       = np.ascontiguousarray(vectors, dtype=np.float64)
+        self._n       = len(self._X)
+        self.backend_name = backend
+        self.backend  = BACKENDS[backend](**backend_kwargs)
+        self.backend.build(self.vectors)
+        self._row_of  = pd.Index(self.meta['player_id'])
+
+    @property
+    def vectors(self):
+        return self._X[:self._n]
+
+    def __len__(self):
+        return self._n
+
+    @classmethod
+    def from_store(cls, store_path=STORE_DIR, features='perf', backend='exact', **backend_kwargs):
+        """Index every player in the feature store (all three splits)."""
+        from .incremental import load_manifest
+
+        d = FeatureStore(store_path)
+        cols = PERF_FEATURES if features == 'perf' else d.feature_cols
+        idx  = [d.feature_cols.index(c) for c in cols]
+        scaler = d['scaler']
+
+        X, parts = [], []
+        groups = [c for c in d.feature_cols if c.startswith('position_group_')]
+        g_idx  = [d.feature_cols.index(c) for c in groups]
+        g_name = np.array([c[len('position_group_'):] for c in groups], dtype=object)
+        for split, (x_key, sfx) in SPLITS.items():
+            arr = d.array(x_key)
+            X.append(arr[:, idx])
+            parts.append(pd.DataFrame({
+                'label':          d.index(split),
+                'age':            arr[:, d.feature_cols.index('age')],
+                'position_group': g_name[np.asarray(arr[:, g_idx]).argmax(1)],
+                'market_value_million_eur': d.array(f'y_mv_raw_{sfx}'),
+                'fpvi':           d.array(f'y_fpvi_raw_{sfx}'),
+            }))
+        meta = pd.concat(parts, ignore_index=True)
+        ids, _, labels = load_manifest(d.path)
+        meta['player_id'] = pd.Series(ids, index=labels).reindex(meta['label']).to_numpy()
+        X = (np.concatenate(X) - scaler.mean_[idx]) / scaler.scale_[idx]
+        return cls(X, meta, scaler.mean_[idx], scaler.scale_[idx], cols, d.feature_cols,
+                   backend, **backend_kwargs)
+
+    # --- insertion ---
+    def add(self, players, seed=RANDOM_STATE):
+        """
+        Insert raw players (source CSV schema). Features are engineered with
+        the frozen vocabulary and scaled with the stored statistics. Player ids
+        must be new: a repeated or already indexed id raises ValueError and
+        nothing is inserted.
+        """
+        ids = pd.Index(players['player_id'])
+        dup = ids[ids.duplicated() | ids.isin(self._row_of)].unique()
+        if len(dup):
+            raise ValueError(f'players already in the index: {list(dup)}')
+        ft   = FeatureTransformer.from_feature_cols(self.layout)
+        feat = ft.transform_frame(players)
+        vecs = (feat[self.features].to_numpy(dtype=np.float64) - self.mean) / self.scale
+        meta = pd.DataFrame({
+            'player_id':      players['player_id'].to_numpy(),
+            'age':            players['age'].to_numpy(dtype=np.float64),
+            'position_group': position_group(players['position']),
+            'market_value_million_eur': players['market_value_million_eur'].to_numpy(),
+            'fpvi':           compute_fpvi(players, seed=seed),
+        })
+        n_new = self._n + len(vecs)
+        if n_new > len(self._X):                                 # amortised growth
+            grown = np.empty((max(n_new, 2 * len(self._X)), self._X.shape[1]))
+            grown[:self._n] = self.vectors
+            self._X = grown
+        self._X[self._n:n_new] = vecs
+        self._n = n_new
+        self.meta    = pd.concat([self.meta, meta], ignore_index=True)
+        self._row_of = pd.Index(self.meta['player_id'])
+        self.backend.add(self.vectors, n_new)
+        return self
+
+    # --- queries ---
+    def filter_mask(self, position_group=None, age=None):
+        """Boolean mask over indexed rows; `age` is an inclusive (min, max) pair."""
+        if position_group is None and age is None:
+            return None
+        mask = np.ones(self._n, dtype=bool)
+        if position_group is not None:
+            groups = [position_group] if isinstance(position_group, str) else list(position_group)
+            mask &= self.meta['position_group'].isin(groups).to_numpy()
+        if age is not None:
+            ages = self.meta['age'].to_numpy()
+            mask &= (ages >= age[0]) & (ages <= age[1])
+        return mask
+
+    def search(self, Q, k=20, position_group=None, age=None, **kwargs):
+        """Batch top-k over scaled query vectors: (row positions, distances), -1 padded."""
+        Q = np.atleast_2d(np.asarray(Q, dtype=np.float64))
+        mask = self.filter_mask(position_group, age)
+        return self.backend.search(self.vectors, Q, k, mask, **kwargs)
+
+    def comparables(self, player_ids, k=20, position_group=None, age=None, **kwargs):
+        """Long DataFrame of the k most similar indexed players for each query id."""
+        rows = self._row_of.get_indexer(np.atleast_1d(player_ids))
+        if (rows < 0).any():
+            missing = np.atleast_1d(player_ids)[rows < 0]
+            raise KeyError(f'players not in the index: {list(missing)}')
+        pos, dist = self.search(self.vectors[rows], k + 1, position_group, age, **kwargs)
+        out = []
+        for q, row in enumerate(rows):
+            keep = (pos[q] >= 0) & (pos[q] != row)
+            hits = self.meta.iloc[pos[q][keep][:k]].copy()
+            hits.insert(0, 'query_id', self.meta['player_id'].iat[row])
+            hits.insert(1, 'rank', np.arange(1, len(hits) + 1))
+            hits['distance'] = dist[q][keep][:k]
+            out.append(hits)
+        return pd.concat(out, ignore_index=True)
+
+    # --- persistence ---
+    def save(self, path=INDEX_PATH):
+        self._X = self.vectors.copy()
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path=INDEX_PATH):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+def jittered(X, n_rows, noise=0.05, seed=RANDOM_STATE):
+    """Scale a vector set up to `n_rows` by resampling rows with Gaussian jitter."""
+    rng = np.random.RandomState(seed)
+    base = X[rng.randint(len(X), size=n_rows)]
+    return base + rng.normal(0.0, noise, size=base.shape)
+
+
+def benchmark(X, n_queries=200, k=20, nprobes=(1, 4, 8, 16, 32), seed=RANDOM_STATE):
+    """
+    Recall@k against brute force and per-query latency for the exact tree
+    and the IVF index at several `nprobe` values. Returns a DataFrame.
+    """
+    rng = np.random.RandomState(seed)
+    Q = X[rng.choice(len(X), n_queries, replace=False)] + rng.normal(0, 0.01, (n_queries, X.shape[1]))
+
+    t0 = time.perf_counter()
+    truth = np.concatenate([_top_k(_sq_dists(Q[i:i + 64], X), k)[0]
+                            for i in range(0, n_queries, 64)])
+    rows = [{'backend': 'brute force', 'nprobe': None, 'build_s': 0.0,
+             'ms_per_query': 1e3 * (time.perf_counter() - t0) / n_queries, 'recall': 1.0}]
+
+    def recall(found):
+        return float(np.mean([len(np.intersect1d(f, t)) / k for f, t in zip(found, truth)]))
+
+    for name, kwargs_list in (('exact', [{}]), ('ivf', [{'nprobe': p} for p in nprobes])):
+        t0 = time.perf_counter()
+        backend = BACKENDS[name]()
+        backend.build(X)
+        build_s = time.perf_counter() - t0
+        for kwargs in kwargs_list:
+            t0 = time.perf_counter()
+            found, _ = backend.search(X, Q, k, **kwargs)
+            rows.append({'backend': name, 'nprobe': kwargs.get('nprobe'), 'build_s': build_s,
+                         'ms_per_query': 1e3 * (time.perf_counter() - t0) / n_queries,
+                         'recall': recall(found)})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.neighbors', description='Comparable-player index.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    b = sub.add_parser('build', help='index every player in the feature store')
+    b.add_argument('--backend', choices=list(BACKENDS), default='exact')
+    b.add_argument('--features', choices=['perf', 'all'], default='perf')
+    b.add_argument('--store', default=str(STORE_DIR))
+    b.add_argument('--out', default=str(INDEX_PATH))
+
+    q = sub.add_parser('query', help='top-k comparables for player ids')
+    q.add_argument('player_id', type=int, nargs='+')
+    q.add_argument('--k', type=int, default=20)
+    q.add_argument('--position-group', choices=['Goalkeeper', 'Defender', 'Midfielder', 'Attacker'])
+    q.add_argument('--age', type=float, nargs=2, metavar=('MIN', 'MAX'))
+    q.add_argument('--index', default=str(INDEX_PATH))
+    q.add_argument('--out', help='write the comparables to this CSV')
+
+    r = sub.add_parser('bench', help='recall / latency of exact vs IVF')
+    r.add_argument('--rows', type=int, default=0,
+                   help='jitter-resample the store up to this many rows (0 = as is)')
+    r.add_argument('--queries', type=int, default=200)
+    r.add_argument('--k', type=int, default=20)
+    r.add_argument('--features', choices=['perf', 'all'], default='perf')
+    r.add_argument('--store', default=str(STORE_DIR))
+    r.add_argument('--json', help='write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        t0 = time.perf_counter()
+        index = ComparablesIndex.from_store(args.store, args.features, args.backend)
+        index.save(args.out)
+        print(f'{len(index)} players, {len(index.features)} dims, {args.backend} backend '
+              f'built in {time.perf_counter() - t0:.2f}s → {args.out}')
+    elif args.command == 'query':
+        index = ComparablesIndex.load(args.index)
+        hits = index.comparables(args.player_id, args.k, args.position_group, args.age)
+        print(hits.round(3).to_string(index=False))
+        if args.out:
+            hits.to_csv(args.out, index=False)
+    else:
+        X = ComparablesIndex.from_store(args.store, args.features).vectors
+        if args.rows:
+            X = jittered(X, args.rows)
+        table = benchmark(X, args.queries, args.k)
+        print(f'{len(X)} rows × {X.shape[1]} dims, k={args.k}, {args.queries} queries')
+        print(table.round(4).to_string(index=False))
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(table.to_dict(orient='records'), f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,551 @@
+"""
+The notebook workflow (01 → 02 → 03 → 04 → 05 → report) as a DAG of stages.
+
+Each stage declares the artifacts it reads and writes:
+
+    features                raw                    → store (feature store, 02)
+    regression              store                  → lb_mv, lb_fpvi, regressor (03)
+    classification          store                  → lb_cls, classifier (04)
+    clustering              store                  → archetypes, profiles (05)
+    eda_figures ...         whatever the figures read (see fpv.figures)
+    report                  leaderboards, profiles, store, figures → deck
+
+A stage's key hashes its code (the stage function plus the functions or
+modules it declares), its parameters and the content digests of its
+inputs. Modules a stage imports but does not declare are not part of the
+key, so e.g. an edit to `zoo.model_specs` only re-runs `regression`. After a stage runs, every file it wrote is copied into a
+content-addressed object store under `outputs/artifacts/objects/`, and a
+run record `runs/<key>.json` maps each output to its file digests.
+
+On the next run a stage whose key has a record is not executed. If its
+outputs in the workspace are missing, or still hold what an earlier
+pipeline run left there, they are restored from the object store. Because
+keys are built from output *content*, a stage that reruns but writes
+identical files does not invalidate anything downstream. Switching a
+hyperparameter back restores the earlier outputs instead of refitting.
+
+Outputs changed outside the pipeline (e.g. by `fpv.incremental`) are never
+overwritten. `workspace.json` remembers what the pipeline last left in the
+workspace. A stage whose outputs differ from that is `kept`: it neither
+restores nor runs, and the stages after it are keyed on the changed
+content. `--force STAGE` overwrites them. Files other tools keep in the
+store directory (`store.SIDECAR_FILES`) are not part of its content.
+
+Ready stages run concurrently in a process pool, e.g. clustering,
+classification and the EDA figures all start as soon as the feature store
+exists. Each stage's stdout/stderr goes to `outputs/artifacts/logs/`.
+
+Run: python -m fpv.pipeline --workers 4
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from . import trace
+from .config import DATA_PATH, OUTPUTS_DIR
+from .figures import FIGURES, SOURCES, _render_job, _theme, code_hash, file_digest, select
+from .store import SIDECAR_FILES, STORE_DIR
+
+ARTIFACTS_DIR  = OUTPUTS_DIR / 'artifacts'
+FORMAT_VERSION = 1
+
+ARTIFACTS = {                         # name -> workspace path
+    'raw':        DATA_PATH,
+    'store':      STORE_DIR,
+    'lb_mv':      OUTPUTS_DIR / 'leaderboard_market_value.csv',
+    'lb_fpvi':    OUTPUTS_DIR / 'leaderboard_fpvi.csv',
+    'regressor':  OUTPUTS_DIR / 'best_regressor.pkl',
+    'lb_cls':     OUTPUTS_DIR / 'classification_leaderboard.csv',
+    'classifier': OUTPUTS_DIR / 'best_classifier.pkl',
+    'archetypes': OUTPUTS_DIR / 'archetypes.json',
+    'profiles':   OUTPUTS_DIR / 'cluster_profiles.csv',
+    'deck':       OUTPUTS_DIR.parent / 'report' / 'presentation.pptx',
+}
+ARTIFACTS.update({name: OUTPUTS_DIR / f'{name}.png' for name in FIGURES})
+
+STAGES    = {}    # name -> {'fn', 'inputs', 'outputs', 'code', 'params'}
+PRODUCERS = {}    # artifact -> stage writing it
+
+
+def stage(name, inputs, outputs, code=(), **params):
+    """
+    Register `fn(threads, **params)` as a stage. `code` lists extra functions
+    or 'module' / 'module:function' names whose source is part of the key.
+    """
+    def register(fn):
+        missing = [a for a in inputs if a not in PRODUCERS and a != 'raw']
+        if missing:
+            raise ValueError(f'stage {name!r}: no earlier stage writes {missing}')
+        for a in outputs:
+            if a in PRODUCERS:
+                raise ValueError(f'{a!r} is written by both {PRODUCERS[a]!r} and {name!r}')
+            PRODUCERS[a] = name
+        STAGES[name] = {'fn': fn, 'inputs': tuple(inputs), 'outputs': tuple(outputs),
+                        'code': tuple(code), 'params': params}
+        return fn
+    return register
+
+
+def _dump(obj, path):
+    with open(path, 'wb') as f:
+        pickle.dump(obj, f)
+
+
+# ── Stages ────────────────────────────────────────────────────────────────────
+
+@stage('features', ['raw'], ['store'], code=['fpv.features', 'fpv.store', 'fpv.schema'])
+def features_stage(threads):
+    from .schema import read_raw
+    from .store import build_bundle, write_store
+    write_store(build_bundle(read_raw(ARTIFACTS['raw'])), ARTIFACTS['store'])
+
+
+@stage('regression', ['store'], ['lb_mv', 'lb_fpvi', 'regressor'],
+       code=['fpv.zoo:run_zoo', 'fpv.zoo:_fit_task', 'fpv.zoo:best_tree'])
+def regression_stage(threads):
+    from .store import FeatureStore
+    from .zoo import best_tree, run_zoo
+
+    results = run_zoo(ARTIFACTS['store'], n_threads=threads)
+    best = best_tree(results['fpvi'])
+    _dump({'model': best['model_obj'], 'name': best['Model'], 'task': 'FPVI',
+           'feature_cols': FeatureStore(ARTIFACTS['store']).feature_cols},
+          ARTIFACTS['regressor'])
+
+
+@stage('classification', ['store'], ['lb_cls', 'classifier'],
+       code=['fpv.zoo:run_classifiers', 'fpv.zoo:classifier_specs'])
+def classification_stage(threads):
+    from .config import CLASSES
+    from .store import FeatureStore
+    from .zoo import run_classifiers
+
+    best = run_classifiers(ARTIFACTS['store'], n_threads=threads)[0]
+    _dump({'model': best['model_obj'], 'name': best['Model'],
+           'feature_cols': FeatureStore(ARTIFACTS['store']).feature_cols, 'classes': CLASSES},
+          ARTIFACTS['classifier'])
+
+
+@stage('clustering', ['store'], ['archetypes', 'profiles'],
+       code=['fpv.clustering', 'fpv.figures:RADAR_FEATURES'])
+def clustering_stage(threads):
+    import numpy as np
+    import pandas as pd
+
+    from .clustering import PERF_FEATURES, build_archetypes, perf_matrix
+    from .figures import RADAR_FEATURES
+    from .store import SPLITS, FeatureStore
+
+    model, _, labels = build_archetypes(ARTIFACTS['store'])
+    model.save(ARTIFACTS['archetypes'])
+
+    # the 05_clustering `summary` table
+    store = FeatureStore(ARTIFACTS['store'])
+    X, mean, scale = perf_matrix(store)
+    df = pd.DataFrame(X * scale + mean, columns=PERF_FEATURES)
+    df['fpvi'] = np.concatenate([store.array(f'y_fpvi_raw_{sfx}') for _, sfx in SPLITS.values()])
+    df['archetype'] = pd.Series(labels).map(model.names)
+    summary = df.groupby('archetype')[RADAR_FEATURES + ['fpvi']].mean().round(2)
+    summary['n_players'] = df['archetype'].value_counts()
+    summary.to_csv(ARTIFACTS['profiles'])
+
+
+def figure_stage(threads, patterns):
+    """Render a group of fpv.figures tasks; staleness is decided by the pipeline."""
+    import tempfile
+
+    from .figures import build
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = build(list(patterns), workers=1, manifest_path=Path(tmp) / 'figures.json',
+                       force=True, data=ARTIFACTS['raw'], store=ARTIFACTS['store'])
+    failed = [n for n, (s, _) in result.items() if s != 'rendered']
+    if failed:
+        raise RuntimeError(f'figures not rendered: {failed}')
+
+
+def _source_files(name):
+    """Workspace artifacts behind a figure source (derived sources expand to their deps)."""
+    deps = SOURCES[name]['deps']
+    return {name} if not deps else set().union(*map(_source_files, deps))
+
+
+def _source_loaders(name):
+    deps = SOURCES[name]['deps']
+    return [SOURCES[name]['load'], *[f for d in deps for f in _source_loaders(d)]]
+
+
+# fpv modules a figure source's loader imports at call time; their code is
+# part of the figure stages' keys, as for the stages that produce the data
+SOURCE_MODULES = {
+    'store':    ['fpv.store'],
+    'shap_reg': ['fpv.explain'],
+    'shap_cls': ['fpv.explain'],
+    'clusters': ['fpv.clustering', 'fpv.store'],
+}
+
+
+def _source_modules(name):
+    deps = SOURCES[name]['deps']
+    return [*SOURCE_MODULES.get(name, ()), *[m for d in deps for m in _source_modules(d)]]
+
+
+FIGURE_STAGES = {
+    'eda_figures':            ('eda_*',),
+    'regression_figures':     ('regression_*',),
+    'shap_figures':           ('shap_regression_*', 'shap_local_*', 'shap_dependence'),
+    'classification_figures': ('classification_*', 'shap_cls_*'),
+    'clustering_figures':     ('clustering_*',),
+}
+for _name, _patterns in FIGURE_STAGES.items():
+    _figs = select(_patterns)
+    _srcs = sorted({s for f in _figs for s in FIGURES[f]['inputs']})
+    stage(_name, sorted(set().union(*map(_source_files, _srcs))), _figs,
+          code=[_render_job, _theme, *[FIGURES[f]['fn'] for f in _figs],
+                *dict.fromkeys(f for s in _srcs for f in _source_loaders(s)),
+                *sorted({m for s in _srcs for m in _source_modules(s)})],
+          patterns=_patterns)(figure_stage)
+
+
+def _report_inputs():
+    from .report import INPUTS, SLIDES, deck_slides
+    return sorted({i for n in deck_slides(None) for i in SLIDES[n]['inputs']},
+                  key=lambda i: (i not in INPUTS, i))
+
+
+@stage('report', _report_inputs(), ['deck'], code=['fpv.report'])
+def report_stage(threads):
+    from .report import build
+    build(out=ARTIFACTS['deck'], data=ARTIFACTS['raw'], store=ARTIFACTS['store'])
+
+
+# ── Artifact store ────────────────────────────────────────────────────────────
+
+class ArtifactStore:
+    """Content-addressed file objects plus one run record per stage key."""
+
+    def __init__(self, root=ARTIFACTS_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / 'index.json'
+        self.workspace_path = self.root / 'workspace.json'
+        self.stat_cache, self.workspace = {}, {}     # workspace: artifact -> digest left there
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.stat_cache = json.load(f)
+        if self.workspace_path.exists():
+            with open(self.workspace_path) as f:
+                self.workspace = json.load(f)
+
+    def save_index(self):
+        self._write_json(self.index_path, self.stat_cache)
+        self._write_json(self.workspace_path, self.workspace)
+
+    def modified(self, name, tree):
+        """True if artifact `name` (current `tree`) was changed outside the pipeline."""
+        left = self.workspace.get(name)
+        return tree is not None and left is not None and self.digest(tree) != left
+
+    @staticmethod
+    def _write_json(path, obj):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(obj, f, indent=1, sort_keys=True)
+        tmp.replace(path)
+
+    # --- digests ---
+    def tree(self, path):
+        """{relative file name: digest} for a file or directory (None if missing)."""
+        path = Path(path)
+        if path.is_dir():
+            files = sorted(p for p in path.rglob('*') if p.is_file() and not p.name.startswith('.')
+                           and str(p.relative_to(path)) not in SIDECAR_FILES)
+            return {str(p.relative_to(path)): file_digest(p, self.stat_cache) for p in files} or None
+        return {'': file_digest(path, self.stat_cache)} if path.exists() else None
+
+    @staticmethod
+    def digest(tree):
+        if tree is None:
+            return None
+        return hashlib.sha256(json.dumps(tree, sort_keys=True).encode()).hexdigest()[:16]
+
+    # --- objects ---
+    def object_path(self, digest):
+        return self.root / 'objects' / digest[:2] / digest
+
+    def ingest(self, path):
+        """Copy a workspace artifact into the object store; returns its tree."""
+        tree = self.tree(path)
+        if tree is None:
+            raise FileNotFoundError(path)
+        for rel, d in tree.items():
+            obj = self.object_path(d)
+            if not obj.exists():
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                tmp = obj.with_name(f'.{uuid.uuid4().hex}.tmp')
+                shutil.copy2(Path(path) / rel if rel else path, tmp)
+                tmp.replace(obj)
+        return tree
+
+    def restore(self, path, tree):
+        """Make the workspace artifact at `path` match `tree` (False if objects are gone)."""
+        if any(not self.object_path(d).exists() for d in tree.values()):
+            return False
+        path = Path(path)
+        current = self.tree(path) or {}
+        if '' not in tree and path.is_dir():             # drop files the stage never wrote
+            for rel in set(current) - set(tree):
+                (path / rel).unlink()
+        for rel, d in tree.items():
+            if current.get(rel) == d:
+                continue
+            dst = path / rel if rel else path
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(f'.{dst.name}.{uuid.uuid4().hex}.tmp')
+            shutil.copy2(self.object_path(d), tmp)
+            tmp.replace(dst)
+        return True
+
+    # --- run records ---
+    def record(self, key):
+        path = self.root / 'runs' / f'{key}.json'
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def save_record(self, key, rec):
+        self._write_json(self.root / 'runs' / f'{key}.json', rec)
+
+
+# ── Scheduling ────────────────────────────────────────────────────────────────
+
+def _code_part(obj):
+    if callable(obj):
+        return code_hash(obj, modules=False)
+    module, _, attr = obj.partition(':')
+    target = importlib.import_module(module)
+    if attr:
+        target = getattr(target, attr)
+        if not callable(target):                         # a constant: hash its value
+            return hashlib.sha256(repr(target).encode()).hexdigest()[:16]
+        return code_hash(target, modules=False)
+    return hashlib.sha256(inspect.getsource(target).encode()).hexdigest()[:16]
+
+
+def stage_key(name, digests):
+    spec  = STAGES[name]
+    parts = [str(FORMAT_VERSION), name, code_hash(spec['fn'], modules=False),
+             *map(_code_part, spec['code']), json.dumps(spec['params'], sort_keys=True)]
+    parts += [f'{a}={digests[a]}' for a in spec['inputs']]
+    return hashlib.sha256(' '.join(parts).encode()).hexdigest()[:16]
+
+
+def upstream(targets):
+    """`targets` plus every stage they (transitively) read from, in registration order."""
+    need, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in STAGES:
+            raise KeyError(f'unknown stage {name!r}; known: {list(STAGES)}')
+        if name not in need:
+            need.add(name)
+            todo += [PRODUCERS[a] for a in STAGES[name]['inputs'] if a in PRODUCERS]
+    return [n for n in STAGES if n in need]
+
+
+def downstream(name):
+    out, todo = set(), [name]
+    while todo:
+        for n, spec in STAGES.items():
+            if n not in out and any(PRODUCERS.get(a) in todo for a in spec['inputs']):
+                out.add(n)
+                todo.append(n)
+        todo = todo[1:]
+    return out
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _run_stage(job):
+    """Worker: run one stage with its output captured; returns (name, seconds, error)."""
+    name, threads, log_path = job
+    spec = STAGES[name]
+    Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with open(log_path, 'w') as log, contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log):
+        try:
+            with trace.span(f'stage:{name}', profile=True):
+                spec['fn'](threads, **spec['params'])
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+            log.write(error)
+    return name, time.perf_counter() - t0, error
+
+
+def run(targets=None, workers=1, force=(), dry_run=False, root=ARTIFACTS_DIR, log=print):
+    """
+    Bring `targets` (default: every stage) up to date. Returns
+    {stage: (status, seconds)} with status 'cached', 'restored', 'kept', 'ran',
+    'failed' or 'blocked'. In a dry run, stages that would execute are 'run'
+    and stages after them are 'pending' (they run only if an input changes).
+    """
+    store   = ArtifactStore(root)
+    names   = upstream(targets or list(STAGES))
+    force   = set(force)
+    threads = max(1, (os.cpu_count() or 1) // max(workers, 1))
+    digests = {a: store.digest(store.tree(p)) for a, p in ARTIFACTS.items() if a not in PRODUCERS}
+    result, keys, pending, running = {}, {}, list(names), {}
+
+    def resolve(name):
+        """Decide a ready stage: reuse its record, or return True if it must run."""
+        spec = STAGES[name]
+        if any(digests.get(a) is None for a in spec['inputs']):
+            blocked = [a for a in spec['inputs'] if digests.get(a) is None]
+            result[name] = ('blocked', 0.0)
+            log(f'  {name:24s} blocked (missing {", ".join(blocked)})')
+            digests.update({a: None for a in spec['outputs']})
+            return False
+        keys[name] = stage_key(name, digests)
+        rec = store.record(keys[name])
+        current = {a: store.tree(ARTIFACTS[a]) for a in spec['outputs']}
+        if rec is not None and name not in force and current == rec['outputs']:
+            result[name] = ('cached', 0.0)
+            digests.update({a: store.digest(t) for a, t in current.items()})
+            left(current)
+            log(f'  {name:24s} cached ({keys[name]})')
+            return False
+        changed = [a for a, t in current.items() if store.modified(a, t)]
+        if changed and name not in force:
+            result[name] = ('kept', 0.0)
+            digests.update({a: store.digest(t) for a, t in current.items()})
+            log(f'  {name:24s} kept: {", ".join(changed)} changed outside the pipeline '
+                f'(--force {name} to overwrite)')
+            return False
+        if rec is not None and name not in force:
+            trees = rec['outputs']
+            if dry_run or all(store.restore(ARTIFACTS[a], t) for a, t in trees.items()):
+                status = 'restore' if dry_run else 'restored'
+                result[name] = (status, 0.0)
+                digests.update({a: store.digest(t) for a, t in trees.items()})
+                if not dry_run:
+                    left(trees)
+                log(f'  {name:24s} {status} ({keys[name]})')
+                return False
+        return True
+
+    def left(trees):
+        """Remember the output content this run leaves in the workspace."""
+        store.workspace.update({a: store.digest(t) for a, t in trees.items() if t is not None})
+
+    def finish(name, seconds, error):
+        if error:
+            result[name] = ('failed', seconds)
+            digests.update({a: None for a in STAGES[name]['outputs']})
+            log(f'  {name:24s} FAILED after {seconds:.1f}s — see logs/{name}.log\n{error}')
+            return
+        try:
+            trees = {a: store.ingest(ARTIFACTS[a]) for a in STAGES[name]['outputs']}
+        except FileNotFoundError as e:
+            result[name] = ('failed', seconds)
+            digests.update({a: None for a in STAGES[name]['outputs']})
+            log(f'  {name:24s} FAILED: stage did not write {e}')
+            return
+        store.save_record(keys[name], {'stage': name, 'outputs': trees, 'seconds': seconds,
+                                       'created': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        digests.update({a: store.digest(t) for a, t in trees.items()})
+        left(trees)
+        result[name] = ('ran', seconds)
+        log(f'  {name:24s} ran in {seconds:.1f}s')
+
+    pool = None
+    if workers > 1 and not dry_run:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker)
+    else:
+        _init_worker()
+    try:
+        while pending or running:
+            ready = [n for n in pending
+                     if all(PRODUCERS.get(a) not in pending and PRODUCERS.get(a) not in running.values()
+                            for a in STAGES[n]['inputs'])]
+            for name in ready:
+                pending.remove(name)
+                if not resolve(name):
+                    continue
+                if dry_run:
+                    result[name] = ('run', 0.0)
+                    log(f'  {name:24s} run')
+                    later = downstream(name) & set(pending)
+                    for n in [n for n in pending if n in later]:
+                        result[n] = ('pending', 0.0)
+                        log(f'  {n:24s} pending (after {name})')
+                    pending = [n for n in pending if n not in later]
+                    continue
+                job = (name, threads, str(Path(root) / 'logs' / f'{name}.log'))
+                if pool is None:
+                    finish(*_run_stage(job))
+                else:
+                    running[pool.submit(trace.remote, trace.config(), _run_stage, job)] = name
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    running.pop(fut)
+                    finish(*trace.absorb(fut.result()))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        store.save_index()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.pipeline',
+                                     description='Run the pipeline DAG incrementally.')
+    parser.add_argument('stages', nargs='*',
+                        help='bring only these stages (and what they read) up to date')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        help='re-execute STAGE even if it has a record (repeatable)')
+    parser.add_argument('--dry-run', action='store_true', help='only show what would run')
+    parser.add_argument('--graph', action='store_true', help='print the stage graph and exit')
+    parser.add_argument('--root', default=str(ARTIFACTS_DIR))
+    args = parser.parse_args(argv)
+
+    if args.graph:
+        for name in upstream(args.stages or list(STAGES)):
+            spec = STAGES[name]
+            after = sorted({PRODUCERS[a] for a in spec['inputs'] if a in PRODUCERS})
+            print(f'{name:24s} ← {", ".join(after) or "(raw data)"}')
+            print(f'{"":24s}   writes {", ".join(spec["outputs"])}')
+        return
+
+    t0 = time.perf_counter()
+    result = run(args.stages, args.workers, args.force, args.dry_run, args.root)
+    counts = {}
+    for s, _ in result.values():
+        counts[s] = counts.get(s, 0) + 1
+    print(f'{len(result)} stages: ' + ', '.join(f'{n} {s}' for s, n in sorted(counts.items()))
+          + f' in {time.perf_counter() - t0:.1f}s')
+    if counts.get('failed') or counts.get('blocked'):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
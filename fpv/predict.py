@@ -0,0 +1,231 @@
+"""
+Batch inference for the saved `best_regressor.pkl` / `best_classifier.pkl`.
+
+Reads raw players (same schema as fifa_player_performance_market_value.csv)
+from CSV or Parquet in fixed-size batches, rebuilds the feature matrix with
+`FeatureTransformer`, and streams one output row per player:
+
+    player_id, fpvi_pred, risk_low, risk_medium, risk_high, risk_level
+
+`fpvi_pred` is the regressor output back-transformed with `expm1` (M€
+equivalent). With `--workers N` batches are scored in a process pool; each
+worker unpickles the models once and runs them single-threaded. Pointing
+`--regressor` / `--classifier` at `.flat.npz` exports (`python -m fpv.flat
+export`) scores with the NumPy-only predictor instead. `--joint` scores
+with one joint model from `fpv.fused` (a fused `.npz` or the shared-tree
+`.pkl`) and adds a `market_value_pred` column.
+
+Run: python -m fpv.predict players.csv -o predictions.csv --workers 4
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import CLASSES, OUTPUTS_DIR
+from .features import FeatureTransformer, iter_chunks
+from . import trace
+from .trace import span
+
+REGRESSOR_PATH  = OUTPUTS_DIR / 'best_regressor.pkl'
+CLASSIFIER_PATH = OUTPUTS_DIR / 'best_classifier.pkl'
+RISK_COLS       = [f'risk_{c.lower()}' for c in CLASSES]
+
+
+def load_bundle(path):
+    """A `best_*.pkl` bundle, or a `.flat.npz` export (see `fpv.flat`)."""
+    if str(path).endswith('.npz'):
+        from .flat import FlatEnsemble
+        return FlatEnsemble.load(path).bundle()
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _single_thread(model):
+    """Pin a fitted estimator to one thread (process-pool workers)."""
+    params = model.get_params() if hasattr(model, 'get_params') else {}
+    for key in ('n_jobs', 'nthread'):
+        if key in params:
+            model.set_params(**{key: 1})
+    return model
+
+
+class Scorer:
+    """Feature pipeline + FPVI regressor + transfer-risk classifier."""
+
+    def __init__(self, reg_bundle, cls_bundle, n_jobs=None):
+        self.reg = reg_bundle['model']
+        self.cls = cls_bundle['model']
+        self.classes = cls_bundle.get('classes', CLASSES)
+        self.reg_cols = list(reg_bundle['feature_cols'])
+        self.cls_cols = list(cls_bundle['feature_cols'])
+        self.reg_ft = FeatureTransformer.from_feature_cols(self.reg_cols)
+        self.cls_ft = (self.reg_ft if self.cls_cols == self.reg_cols
+                       else FeatureTransformer.from_feature_cols(self.cls_cols))
+        if n_jobs == 1:
+            _single_thread(self.reg)
+            _single_thread(self.cls)
+
+    @classmethod
+    def from_paths(cls, reg_path=REGRESSOR_PATH, cls_path=CLASSIFIER_PATH, n_jobs=None):
+        return cls(load_bundle(reg_path), load_bundle(cls_path), n_jobs=n_jobs)
+
+    def features(self, df):
+        X_reg = self.reg_ft.transform(df)
+        X_cls = X_reg if self.cls_ft is self.reg_ft else self.cls_ft.transform(df)
+        return X_reg, X_cls
+
+    def predict_arrays(self, X_reg, X_cls):
+        """Raw model outputs for prebuilt feature matrices: (fpvi, proba)."""
+        X_reg = pd.DataFrame(X_reg, columns=self.reg_cols, copy=False)
+        X_cls = pd.DataFrame(X_cls, columns=self.cls_cols, copy=False)
+        with span('score.predict', rows=len(X_reg)):
+            fpvi = np.clip(np.expm1(self.reg.predict(X_reg)), 0, None)
+        with span('score.predict_proba', rows=len(X_cls)):
+            proba = self.cls.predict_proba(X_cls)
+        return fpvi, proba
+
+    def score(self, df):
+        """Score one batch of raw players; returns the output frame."""
+        fpvi, proba = self.predict_arrays(*self.features(df))
+        out = pd.DataFrame({'player_id': df['player_id'].to_numpy()} if 'player_id' in df
+                           else {}, index=df.index)
+        out['fpvi_pred'] = fpvi
+        for j, col in enumerate(RISK_COLS):
+            out[col] = proba[:, j]
+        out['risk_level'] = np.asarray(self.classes, dtype=object)[proba.argmax(axis=1)]
+        return out
+
+
+# ── Process-pool workers ──────────────────────────────────────────────────────
+
+_WORKER_SCORER = None
+
+
+def _scorer(reg_path, cls_path, joint_path=None, n_jobs=None):
+    if joint_path:
+        from .fused import JointScorer
+        scorer = JointScorer.from_path(joint_path)
+        if n_jobs == 1 and hasattr(scorer.model, 'model'):
+            _single_thread(scorer.model.model)
+        return scorer
+    return Scorer.from_paths(reg_path, cls_path, n_jobs=n_jobs)
+
+
+def _init_worker(reg_path, cls_path, joint_path=None):
+    global _WORKER_SCORER
+    _WORKER_SCORER = _scorer(reg_path, cls_path, joint_path, n_jobs=1)
+
+
+def _score_in_worker(df):
+    return _WORKER_SCORER.score(df)
+
+
+def score_batches(batches, reg_path=REGRESSOR_PATH, cls_path=CLASSIFIER_PATH, workers=1,
+                  joint_path=None):
+    """
+    Yield scored frames for an iterable of raw batches, in input order.
+    `joint_path` (see `fpv.fused`) replaces the regressor / classifier pair.
+
+    With `workers > 1` at most `2 * workers` batches are in flight, so memory
+    stays bounded however long the input is.
+    """
+    if workers <= 1:
+        scorer = _scorer(reg_path, cls_path, joint_path)
+        for df in batches:
+            yield scorer.score(df)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(str(reg_path), str(cls_path),
+                                       joint_path and str(joint_path))) as pool:
+        pending, cfg = deque(), trace.config()
+        for df in batches:
+            pending.append(pool.submit(trace.remote, cfg, _score_in_worker, df))
+            if len(pending) >= 2 * workers:
+                yield trace.absorb(pending.popleft().result())
+        while pending:
+            yield trace.absorb(pending.popleft().result())
+
+
+class _Sink:
+    """Append-only CSV / Parquet writer."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.parquet = self.path.suffix == '.parquet'
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self._header else 'a',
+                      header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run(input_path, output_path, batch_size=100_000, workers=1,
+        reg_path=REGRESSOR_PATH, cls_path=CLASSIFIER_PATH, log=sys.stderr, joint_path=None):
+    """Score `input_path` into `output_path`; returns (rows, seconds)."""
+    sink = _Sink(output_path)
+    rows, t0 = 0, time.perf_counter()
+    try:
+        for out in score_batches(iter_chunks(input_path, batch_size),
+                                 reg_path, cls_path, workers, joint_path):
+            with span('score.write', rows=len(out)):
+                sink.write(out)
+            rows += len(out)
+            if log is not None:
+                elapsed = time.perf_counter() - t0
+                print(f'{rows:>12,d} rows  {rows / elapsed:>12,.0f} rows/s', file=log)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - t0
+    if log is not None:
+        print(f'Scored {rows:,d} rows in {elapsed:.2f}s '
+              f'({rows / max(elapsed, 1e-9):,.0f} rows/s) → {output_path}', file=log)
+    return rows, elapsed
+
+
+def build_parser(parser=None):
+    parser = parser or argparse.ArgumentParser(
+        prog='fpv.predict', description='Batch FPVI + transfer-risk scoring.')
+    parser.add_argument('input', help='raw players CSV or Parquet')
+    parser.add_argument('-o', '--output', required=True, help='output CSV or Parquet')
+    parser.add_argument('--batch-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='process-pool size (1 = score in-process)')
+    parser.add_argument('--regressor', default=str(REGRESSOR_PATH))
+    parser.add_argument('--classifier', default=str(CLASSIFIER_PATH))
+    parser.add_argument('--joint', metavar='PATH',
+                        help='one joint model for all heads (fpv.fused: fused .npz or '
+                             'shared-tree .pkl); overrides --regressor / --classifier')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    run(args.input, args.output, args.batch_size, args.workers,
+        args.regressor, args.classifier, joint_path=args.joint)
+
+
+if __name__ == '__main__':
+    main()
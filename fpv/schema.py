@@ -0,0 +1,245 @@
+"""
+Compact dtypes for the raw table, the feature matrix and the targets.
+
+`read_csv` and `get_dummies(..., dtype=int)` give every column 8 bytes,
+including binary flags, one-hots and ratings that fit in one byte. Each
+schema here maps a column to (dtype, min, max):
+
+    RAW_SCHEMA       raw CSV columns: uint8 ratings/ages, int16 counts,
+                     categoricals for the string columns
+    FEATURE_SCHEMA   the 02_features columns: uint8 flags and one-hots,
+                     int16 integer features, float32 ratios
+    TARGET_SCHEMA    uint8 risk codes (regression targets stay float64)
+
+`compact` checks every column against its range before downcasting, so a
+value that would not fit (or a rating of 140) raises instead of wrapping.
+`read_raw` validates the raw table on load and `store.write_store` the
+features and targets before writing. The store keeps the risk codes as
+uint8; X splits stay float64 on disk, and their compact dtypes are an
+on-demand view (`FeatureStore.compact`).
+
+Tree models get a different layout: `FeatureStore.model_frame` gives one
+C-contiguous float32 block wrapped in a DataFrame without a copy. XGBoost,
+LightGBM and the sklearn forests read that block directly; a float64
+Fortran frame is converted by each of them on every fit.
+
+`python -m fpv.schema` reports the memory saved per stage (the `features`
+rows by the on-demand compact view, the others as stored or fitted).
+`--fit` refits the tree models on both layouts and compares metrics and the
+peak memory the Python-side wrappers allocated during each fit (traced by
+tracemalloc).
+
+Run: python -m fpv.schema --fit
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .config import CLASSES, DATA_PATH
+from .features import ENGINEERED_COLS, NUMERIC_COLS
+from .store import SPLITS, STORE_DIR, FeatureStore
+from .trace import span
+
+RAW_SCHEMA = {                        # column -> (dtype, min, max)
+    'player_id':                ('uint32',  1, 2**32 - 1),
+    'age':                      ('uint8',  14, 50),
+    'overall_rating':           ('uint8',   0, 100),
+    'potential_rating':         ('uint8',   0, 100),
+    'matches_played':           ('uint8',   0, 120),
+    'goals':                    ('int16',   0, 500),
+    'assists':                  ('int16',   0, 500),
+    'minutes_played':           ('int16',   0, 120 * 120),
+    'market_value_million_eur': ('float64', 0, 10_000),   # regression target
+    'contract_years_left':      ('uint8',   0, 10),
+}
+CATEGORIES = {                        # string column -> allowed values (None: open)
+    'nationality':         None,
+    'club':                None,
+    'position':            None,
+    'injury_prone':        ['No', 'Yes'],
+    'transfer_risk_level': CLASSES,
+}
+FEATURE_SCHEMA = {
+    **{c: RAW_SCHEMA[c] for c in NUMERIC_COLS},
+    'goals_per_90':       ('float32', 0, 4),
+    'assists_per_90':     ('float32', 0, 4),
+    'contributions_p90':  ('float32', 0, 8),
+    'rating_gap':         ('int16', -100, 100),
+    'rating_x_potential': ('int16',    0, 100 * 100),
+    'age_rating_ratio':   ('float32',  0, 10),
+    'expiring_soon':      ('uint8',    0, 1),
+    'injury_prone_bin':   ('uint8',    0, 1),
+}
+ONE_HOT       = ('uint8', 0, 1)
+TARGET_SCHEMA = {'y_cls': ('uint8', 0, len(CLASSES) - 1)}
+
+assert set(FEATURE_SCHEMA) == set(NUMERIC_COLS + ENGINEERED_COLS)
+
+
+def feature_schema(feature_cols):
+    """Schema for a `feature_cols` layout (everything after the dense block is one-hot)."""
+    return {c: FEATURE_SCHEMA.get(c, ONE_HOT) for c in feature_cols}
+
+
+# ── Validation / downcasting ──────────────────────────────────────────────────
+
+def check_column(name, values, spec):
+    """Problems (as strings) that keep `values` from being stored as `spec`."""
+    dtype, lo, hi = spec
+    values = np.asarray(values)
+    problems = []
+    with np.errstate(invalid='ignore'):
+        bad = ~((values >= lo) & (values <= hi))              # also catches NaN
+        if np.dtype(dtype).kind in 'iu':
+            bad |= values != np.round(values)
+    if bad.any():
+        sample = values[bad][:3].tolist()
+        problems.append(f'{name}: {int(bad.sum())} value(s) outside {dtype} [{lo}, {hi}] '
+                        f'or not integral, e.g. {sample}')
+    return problems
+
+
+def compact(df, schema, categories=None):
+    """
+    Validated copy of `df` with `schema` dtypes (and `categories` as
+    categoricals). Columns in neither are kept as they are. Raises
+    ValueError listing every offending column.
+    """
+    categories = categories or {}
+    problems = []
+    for col, spec in schema.items():
+        if col in df:
+            problems += check_column(col, df[col].to_numpy(), spec)
+    for col, allowed in categories.items():
+        if col in df and allowed is not None:
+            unknown = sorted(set(df[col].dropna().unique()) - set(allowed))
+            if unknown:
+                problems.append(f'{col}: unexpected values {unknown[:5]} (allowed {allowed})')
+    if problems:
+        raise ValueError('schema violations:\n  ' + '\n  '.join(problems))
+    out = {}
+    for col in df.columns:
+        if col in schema:
+            out[col] = df[col].to_numpy().astype(schema[col][0])
+        elif col in categories:
+            out[col] = pd.Categorical(df[col], categories=categories[col])
+        else:
+            out[col] = df[col]
+    return pd.DataFrame(out, index=df.index)
+
+
+def compact_matrix(X, feature_cols, index=None):
+    """Validated, per-column compact DataFrame from a float feature matrix."""
+    schema = feature_schema(feature_cols)
+    problems = [p for j, c in enumerate(feature_cols) for p in check_column(c, X[:, j], schema[c])]
+    if problems:
+        raise ValueError('schema violations:\n  ' + '\n  '.join(problems))
+    return pd.DataFrame({c: X[:, j].astype(schema[c][0]) for j, c in enumerate(feature_cols)},
+                        index=index)
+
+
+def read_raw(path=DATA_PATH, **kwargs):
+    """The raw player CSV with compact dtypes, validated against RAW_SCHEMA."""
+    with span('schema.read_raw') as s:
+        df = compact(pd.read_csv(path, **kwargs), RAW_SCHEMA, CATEGORIES)
+        s.set(rows=len(df))
+    return df
+
+
+def frame_nbytes(obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(deep=True, index=False)))
+    return int(np.asarray(obj).nbytes)
+
+
+# ── Reports ───────────────────────────────────────────────────────────────────
+
+def memory_report(data=DATA_PATH, store_path=STORE_DIR):
+    """Default vs compact bytes for each stage's in-memory data."""
+    store = FeatureStore(store_path)
+    rows = []
+
+    def row(stage, default, compact_):
+        d, c = frame_nbytes(default), frame_nbytes(compact_)
+        rows.append({'stage': stage, 'default MB': d / 1e6, 'compact MB': c / 1e6,
+                     'saved MB': (d - c) / 1e6, 'saved %': 100 * (1 - c / d)})
+
+    row('raw table (read_csv)', pd.read_csv(data), read_raw(data))
+    for split, (x_key, sfx) in SPLITS.items():
+        X = store[x_key]
+        row(f'features {x_key} (view)', X, store.compact(x_key))
+        row(f'model input {x_key}', X, store.model_frame(x_key))
+        row(f'target y_cls_{sfx} (stored)', store.array(f'y_cls_{sfx}').astype(np.int64),
+            store.compact(f'y_cls_{sfx}'))
+    return pd.DataFrame(rows)
+
+
+def _traced_fit(model, X, y):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    model.fit(X, y)
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def fit_report(store_path=STORE_DIR):
+    """
+    Refit every tree model of MODEL_SPECS (FPVI target) and of the classifier
+    specs on the float64 store frame and on the float32 model frame; returns
+    metrics, fit time and traced peak allocations per layout.
+    """
+    from .zoo import classifier_specs, model_specs, score_classification, score_regression
+
+    store = FeatureStore(store_path)
+    tasks = [('regression', s, 'y_fpvi_log', 'y_fpvi_raw') for s in model_specs()]
+    tasks += [('classification', s, 'y_cls', 'y_cls') for s in classifier_specs()]
+    rows = []
+    for task, (name, _, scaled), fit_key, score_key in tasks:
+        if scaled:                                       # linear models keep float64
+            continue
+        y_tr, y_te = store.array(f'{fit_key}_tr'), store.array(f'{score_key}_te')
+        for layout in ('float64', 'float32'):
+            X_tr, X_te = ((store['X_train'], store['X_test']) if layout == 'float64' else
+                          (store.model_frame('X_train'), store.model_frame('X_test')))
+            specs = model_specs() if task == 'regression' else classifier_specs()
+            model = next(m for n, m, _ in specs if n == name)
+            seconds, peak = _traced_fit(model, X_tr, y_tr)
+            if task == 'regression':
+                metrics = score_regression(y_te, model.predict(X_te))
+            else:
+                metrics = score_classification(y_te, model.predict_proba(X_te))
+            rows.append({'task': task, 'Model': name, 'layout': layout, 'fit s': seconds,
+                         'traced peak MB': peak / 1e6, **metrics})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.schema',
+                                     description='Compact-dtype memory and metric report.')
+    parser.add_argument('--data', default=str(DATA_PATH))
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--fit', action='store_true',
+                        help='also refit the tree models on both layouts and compare')
+    args = parser.parse_args(argv)
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(memory_report(args.data, args.store).round(3).to_string(index=False))
+        if args.fit:
+            rep = fit_report(args.store)
+            print()
+            print(rep.round(4).to_string(index=False))
+            metrics = [c for c in rep.columns if c not in
+                       ('task', 'Model', 'layout', 'fit s', 'traced peak MB')]
+            both = rep.set_index(['task', 'Model', 'layout'])[metrics]
+            delta = (both.xs('float32', level='layout') - both.xs('float64', level='layout')).abs()
+            print(f'\nmax |Δ metric| float32 vs float64: {np.nanmax(delta.to_numpy()):.2e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""
+Low-latency local scoring service for the scouting UI.
+
+A dependency-free asyncio HTTP/1.1 server that loads both model bundles once
+at startup (and warms them with one prediction), then coalesces concurrent
+requests into micro-batches so `predict` / `predict_proba` run once per
+batch rather than once per player.
+
+Endpoints
+    POST /score    one player object or a list of them (raw CSV schema)
+    GET  /stats    request / batch counters and p50 / p99 latency in ms
+    GET  /health   liveness probe
+
+Run: python -m fpv.serve --port 8765 --max-batch 64 --max-wait-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from .features import NUMERIC_COLS
+from .predict import CLASSIFIER_PATH, REGRESSOR_PATH, RISK_COLS, Scorer
+
+TEXT_COLS     = ['position', 'nationality', 'club', 'injury_prone']
+REQUIRED_COLS = NUMERIC_COLS + TEXT_COLS
+
+WARMUP_PLAYER = {
+    'player_id': 0, 'age': 25, 'nationality': 'Spain', 'club': 'Real Madrid',
+    'position': 'CM', 'overall_rating': 80, 'potential_rating': 85,
+    'matches_played': 30, 'goals': 5, 'assists': 7, 'minutes_played': 2500,
+    'contract_years_left': 3, 'injury_prone': 'No',
+}
+
+HTTP_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+
+class LatencyStats:
+    """Rolling latency window plus cumulative counters."""
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+        self.requests  = 0
+        self.players   = 0
+        self.batches   = 0
+
+    def record(self, seconds, n_players):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.players  += n_players
+
+    def snapshot(self):
+        lat = np.asarray(self.latencies) * 1e3
+        p50, p99 = np.percentile(lat, [50, 99]) if len(lat) else (float('nan'),) * 2
+        return {
+            'requests':       self.requests,
+            'players':        self.players,
+            'batches':        self.batches,
+            'mean_batch':     self.players / self.batches if self.batches else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+        }
+
+
+class MicroBatcher:
+    """
+    Collect players from concurrent requests and score them together.
+
+    A batch is flushed when it reaches `max_batch` players or when the oldest
+    waiting player has waited `max_wait_ms`, whichever comes first. Model
+    calls run in the default executor so the event loop keeps accepting.
+    """
+
+    def __init__(self, scorer, stats, max_batch=64, max_wait_ms=2.0):
+        self.scorer    = scorer
+        self.stats     = stats
+        self.max_batch = max_batch
+        self.max_wait  = max_wait_ms / 1e3
+        self.queue     = asyncio.Queue()
+        self._task     = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def submit(self, players):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((players, fut))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            size  = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+
+            players = [p for batch, _ in items for p in batch]
+            try:
+                results = await loop.run_in_executor(None, self.score, players)
+            except Exception as exc:
+                await self._score_separately(items, exc)
+                continue
+            self.stats.batches += 1
+            start = 0
+            for batch, fut in items:
+                fut.set_result(results[start:start + len(batch)])
+                start += len(batch)
+
+    async def _score_separately(self, items, exc):
+        """After a failed batch, score each request alone so only the bad ones fail."""
+        if len(items) == 1:
+            items[0][1].set_exception(exc)
+            return
+        loop = asyncio.get_running_loop()
+        for batch, fut in items:
+            try:
+                result = await loop.run_in_executor(None, self.score, batch)
+            except Exception as e:
+                fut.set_exception(e)
+            else:
+                self.stats.batches += 1
+                fut.set_result(result)
+
+    def score(self, players):
+        cols = {c: [p.get(c) for p in players] for c in REQUIRED_COLS}
+        fpvi, proba = self.scorer.predict_arrays(*self.scorer.features(cols))
+        labels = np.asarray(self.scorer.classes, dtype=object)[proba.argmax(axis=1)]
+        out = []
+        for i, p in enumerate(players):
+            row = {'player_id': p.get('player_id'), 'fpvi_pred': float(fpvi[i])}
+            row.update({c: float(proba[i, j]) for j, c in enumerate(RISK_COLS)})
+            row['risk_level'] = labels[i]
+            out.append(row)
+        return out
+
+
+def _number(value):
+    """A finite float from a JSON number or numeric string, else None."""
+    if isinstance(value, bool):
+        return None
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        return None
+    return x if math.isfinite(x) else None
+
+
+def _validate(players):
+    """Checked copies of the players, numeric fields as floats; ValueError → 400."""
+    if isinstance(players, dict):
+        players = [players]
+    if not isinstance(players, list) or not players:
+        raise ValueError('body must be a player object or a non-empty list of them')
+    out = []
+    for i, p in enumerate(players):
+        if not isinstance(p, dict):
+            raise ValueError(f'player #{i} must be an object, got {type(p).__name__}')
+        missing = [c for c in REQUIRED_COLS if c not in p]
+        if missing:
+            raise ValueError(f'player {p.get("player_id")!r} is missing {missing}')
+        p = dict(p)
+        bad = []
+        for c in NUMERIC_COLS:
+            p[c] = _number(p[c])
+            if p[c] is None:
+                bad.append(c)
+        bad += [c for c in TEXT_COLS if not isinstance(p[c], str)]
+        if bad:
+            raise ValueError(f'player {p.get("player_id")!r} has invalid values for {bad} '
+                             '(numbers must be finite, categories strings)')
+        out.append(p)
+    return out
+
+
+class ScoringServer:
+    def __init__(self, scorer, max_batch=64, max_wait_ms=2.0):
+        self.stats   = LatencyStats()
+        self.batcher = MicroBatcher(scorer, self.stats, max_batch, max_wait_ms)
+
+    @classmethod
+    def from_paths(cls, reg_path=REGRESSOR_PATH, cls_path=CLASSIFIER_PATH, **kwargs):
+        scorer = Scorer.from_paths(reg_path, cls_path)
+        server = cls(scorer, **kwargs)
+        server.batcher.score([WARMUP_PLAYER])       # warm-load: first predict is slow
+        return server
+
+    async def handle(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats.snapshot()
+        if method == 'POST' and path == '/score':
+            t0 = time.perf_counter()
+            try:
+                payload = json.loads(body or b'null')
+                single  = isinstance(payload, dict)
+                players = _validate(payload)
+            except ValueError as exc:
+                return 400, {'error': str(exc)}
+            results = await self.batcher.submit(players)
+            self.stats.record(time.perf_counter() - t0, len(players))
+            return 200, results[0] if single else results
+        return 404, {'error': f'no route for {method} {path}'}
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body   = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload = await self.handle(method, path.split('?')[0], body)
+                except Exception as exc:
+                    status, payload = 500, {'error': repr(exc)}
+                data = json.dumps(payload).encode()
+                keep = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f'HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n'
+                    f'Content-Type: application/json\r\nContent-Length: {len(data)}\r\n'
+                    f'Connection: {"keep-alive" if keep else "close"}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        self.batcher.start()
+        server = await asyncio.start_server(self._connection, host, port)
+        print(f'Scoring service listening on http://{host}:{port}')
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.serve', description='Local FPVI scoring service.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--regressor', default=str(REGRESSOR_PATH))
+    parser.add_argument('--classifier', default=str(CLASSIFIER_PATH))
+    args = parser.parse_args(argv)
+
+    server = ScoringServer.from_paths(args.regressor, args.classifier,
+                                      max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""
+Stacked ensembles of the leaderboard models, pruned by gain per millisecond.
+
+03_regression keeps the lowest-RMSE model and discards the other four fits;
+04 does the same with `cls_lb`. This module blends them instead, without
+refitting any of them:
+
+    members      the fitted models returned by `run_zoo` or `run_classifiers`,
+                 both read from the model cache. Their test predictions
+                 (`pred_log` / `proba`) are reused; the only extra work is
+                 one `predict` on the validation split, which nothing else
+                 uses, plus a timing of each member's inference cost
+    meta         a non-negative linear blend of the log predictions
+                 (regression), or a logistic regression on the members'
+                 log-probabilities (risk), fitted on the validation split
+    selection    the path starts from the best single member by validation
+                 loss; members are then added greedily by the marginal
+                 validation gain per ms of inference (per 1 000 rows) they
+                 bring. The meta-learner's loss is cross-validated within
+                 the validation split; the test split is only used for the
+                 final report
+
+Every step of the path is reported, so the trade-off is explicit:
+`--min-gain-per-ms` keeps a member only if it lowers the validation loss by
+at least that much per ms it adds to scoring 1 000 rows. When no addition
+clears it, the result is the best single member on its own.
+
+The saved bundle has the `best_*.pkl` layout, so `fpv.predict --regressor`
+or `--classifier` can score with it directly.
+
+Run: python -m fpv.stacking --task fpvi --min-gain-per-ms 0.001 --out outputs/stacked_fpvi.pkl
+"""
+
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from .config import CLASSES, RANDOM_STATE
+from .store import STORE_DIR, FeatureStore
+from .trace import span
+from .zoo import (CACHE_DIR, TARGETS, classifier_specs, model_input, model_specs,
+                  run_classifiers, run_zoo, score_classification, score_regression)
+
+TASKS = (*TARGETS, 'risk')
+MIN_GAIN_PER_MS = 1e-4          # 0.001 validation loss per 10 ms per 1 000 rows
+
+
+def _kind(task):
+    return 'classification' if task == 'risk' else 'regression'
+
+
+# ── Members ───────────────────────────────────────────────────────────────────
+
+def inference_ms(model, X, kind, repeats=3):
+    """Best-of-`repeats` milliseconds per 1 000 rows for one member."""
+    predict = model.predict_proba if kind == 'classification' else model.predict
+    best = float('inf')
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        predict(X)
+        best = min(best, time.perf_counter() - t0)
+    return 1e6 * best / len(X)
+
+
+def members(task='fpvi', store_path=STORE_DIR, workers=1):
+    """
+    Fitted leaderboard models for `task` with their validation and test
+    predictions and inference cost. Fits come from the zoo's model cache
+    (and are added to it when missing).
+    """
+    store = FeatureStore(store_path)
+    kind = _kind(task)
+    rs = store['random_state'] or RANDOM_STATE
+    if kind == 'regression':
+        scaled = {n: s for n, _, s in model_specs(rs)}
+        entries = run_zoo(store_path, (task,), workers, write=False)[task]
+        fitted = [(e['Model'], e['model_obj'], e['pred_log']) for e in entries]
+    else:
+        scaled = {n: s for n, _, s in classifier_specs(rs)}
+        fitted = [(e['Model'], e['model_obj'], e['proba'])
+                  for e in run_classifiers(store_path, write=False, cache_dir=CACHE_DIR)]
+
+    out = []
+    for name, model, test_pred in fitted:
+        X = model_input(store, scaled[name])
+        X_val = X('X_val')
+        val_pred = model.predict_proba(X_val) if kind == 'classification' else model.predict(X_val)
+        out.append({'name': name, 'model': model, 'scaled': scaled[name], 'val': val_pred,
+                    'test': test_pred, 'ms': inference_ms(model, X('X_test'), kind)})
+    return out
+
+
+# ── Meta-learner ──────────────────────────────────────────────────────────────
+
+def meta_features(preds, kind):
+    """One column per member (log target) or per member × class (log-probability)."""
+    if kind == 'classification':
+        return np.hstack([np.log(np.clip(p, 1e-6, 1.0)) for p in preds])
+    return np.column_stack(preds)
+
+
+def meta_model(kind):
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+
+    if kind == 'classification':
+        return LogisticRegression(C=1.0, max_iter=2000)
+    return LinearRegression(positive=True)
+
+
+def meta_loss(F, y, kind, n_splits=5, seed=RANDOM_STATE):
+    """Cross-validated loss of the meta-learner on `F` (log-target RMSE or log loss)."""
+    from sklearn.metrics import log_loss
+    from sklearn.model_selection import KFold, StratifiedKFold, cross_val_predict
+
+    cv = (StratifiedKFold if kind == 'classification' else KFold)(
+        n_splits=n_splits, shuffle=True, random_state=seed)
+    if kind == 'classification':
+        p = cross_val_predict(meta_model(kind), F, y, cv=cv, method='predict_proba')
+        return float(log_loss(y, p, labels=range(len(CLASSES))))
+    return float(np.sqrt(np.mean((y - cross_val_predict(meta_model(kind), F, y, cv=cv)) ** 2)))
+
+
+def member_loss(pred, y, kind):
+    """Validation loss of one member on its own (log-target RMSE or log loss)."""
+    from sklearn.metrics import log_loss
+
+    if kind == 'classification':
+        return float(log_loss(y, pred, labels=range(len(CLASSES))))
+    return float(np.sqrt(np.mean((y - pred) ** 2)))
+
+
+def forward_path(pool, y_val, kind):
+    """
+    Greedy selection from the best single member by validation loss: each
+    further step adds the member with the highest marginal validation gain
+    per ms of inference, until no remaining member lowers the loss.
+    Returns one row per step; the first step has no gain per ms.
+    """
+    first = min(pool, key=lambda m: member_loss(m['val'], y_val, kind))
+    loss = member_loss(first['val'], y_val, kind)
+    chosen, remaining = [first], [m for m in pool if m is not first]
+    path = [{'step': 1, 'added': first['name'], 'val loss': loss, 'gain': float('nan'),
+             'member ms': first['ms'], 'gain per ms': float('nan'),
+             'ensemble ms': first['ms']}]
+    while remaining:
+        cands = []
+        for m in remaining:
+            with span('stacking.meta_cv', rows=len(y_val), member=m['name']):
+                l = meta_loss(meta_features([c['val'] for c in chosen + [m]], kind), y_val, kind)
+            cands.append((m, l, (loss - l) / m['ms']))
+        gaining = [c for c in cands if c[1] < loss]
+        if not gaining:
+            break
+        m, l, ratio = max(gaining, key=lambda c: c[2])
+        chosen.append(m)
+        remaining.remove(m)
+        path.append({'step': len(chosen), 'added': m['name'], 'val loss': l,
+                     'gain': loss - l, 'member ms': m['ms'], 'gain per ms': ratio,
+                     'ensemble ms': sum(c['ms'] for c in chosen)})
+        loss = l
+    return path
+
+
+# ── Ensemble ──────────────────────────────────────────────────────────────────
+
+class StackedEnsemble:
+    """
+    Fitted members plus the meta-learner, scoring a `feature_cols` matrix.
+    Exposes `predict` (log target / class index) and, for risk,
+    `predict_proba`, like the single models it replaces. With `meta=None`
+    it wraps a single member and passes its output through.
+    """
+
+    def __init__(self, kind, members, meta, scaler, feature_cols, classes=None):
+        self.kind = kind
+        self.members = members                   # [(name, fitted model, uses_scaled_X)]
+        self.meta = meta
+        self.scaler = scaler
+        self.feature_cols = list(feature_cols)
+        self.classes = classes
+
+    def member_outputs(self, X):
+        X = pd.DataFrame(np.asarray(X, dtype=np.float64), columns=self.feature_cols, copy=False)
+        frames = {}
+
+        def frame(scaled):
+            if scaled not in frames:
+                arr = (self.scaler.transform(X) if scaled
+                       else np.ascontiguousarray(X.to_numpy(), dtype=np.float32))
+                frames[scaled] = pd.DataFrame(arr, columns=self.feature_cols, copy=False)
+            return frames[scaled]
+
+        if self.kind == 'classification':
+            return [m.predict_proba(frame(s)) for _, m, s in self.members]
+        return [m.predict(frame(s)) for _, m, s in self.members]
+
+    def predict_proba(self, X):
+        if self.kind != 'classification':
+            raise AttributeError('predict_proba is only available for the risk ensemble')
+        outputs = self.member_outputs(X)
+        if self.meta is None:
+            return outputs[0]
+        return self.meta.predict_proba(meta_features(outputs, self.kind))
+
+    def predict(self, X):
+        outputs = self.member_outputs(X)
+        if self.meta is None:
+            return outputs[0].argmax(axis=1) if self.kind == 'classification' else outputs[0]
+        F = meta_features(outputs, self.kind)
+        if self.kind == 'classification':
+            return self.meta.predict_proba(F).argmax(axis=1)
+        return self.meta.predict(F)
+
+
+def fit_ensemble(chosen, y_val, kind, store):
+    """Meta-learner over `chosen`; a single member is used as is."""
+    meta = (None if len(chosen) == 1 else
+            meta_model(kind).fit(meta_features([m['val'] for m in chosen], kind), y_val))
+    return StackedEnsemble(kind, [(m['name'], m['model'], m['scaled']) for m in chosen], meta,
+                           store['scaler'], store.feature_cols,
+                           CLASSES if kind == 'classification' else None)
+
+
+def stack(task='fpvi', store_path=STORE_DIR, min_gain_per_ms=MIN_GAIN_PER_MS, workers=1):
+    """
+    Build the pruned ensemble for `task`. Returns (ensemble, path, report):
+    the selection path and a test-split comparison of the best single
+    member, the stack of every member and the pruned stack (the path's
+    first member alone when no addition reaches `min_gain_per_ms`).
+    """
+    store = FeatureStore(store_path)
+    kind = _kind(task)
+    pool = members(task, store_path, workers)
+    fit_key, score_key = (('y_cls', 'y_cls') if kind == 'classification'
+                          else TARGETS[task][:2])
+    y_val = store.array(f'{fit_key}_val')
+    y_te = store.array(f'{score_key}_te')
+    path = forward_path(pool, y_val, kind)
+
+    keep = 1
+    while keep < len(path) and path[keep]['gain per ms'] >= min_gain_per_ms:
+        keep += 1
+    by_name = {m['name']: m for m in pool}
+    chosen = [by_name[p['added']] for p in path[:keep]]
+
+    score = score_classification if kind == 'classification' else score_regression
+    main_metric, lower = ('Macro F1', False) if kind == 'classification' else ('RMSE', True)
+    singles = [{'ensemble': f'single: {m["name"]}', 'members': 1, 'ms per 1k rows': m['ms'],
+                **score(y_te, m['test'])} for m in pool]
+    best_single = sorted(singles, key=lambda r: r[main_metric] if lower else -r[main_metric])[0]
+
+    rows = [best_single]
+    ensemble = None
+    for label, group in (('stack: all members', pool), ('stack: pruned', chosen)):
+        ens = fit_ensemble(group, y_val, kind, store)
+        F_te = meta_features([m['test'] for m in group], kind)
+        if ens.meta is None:
+            pred = group[0]['test']
+        else:
+            pred = (ens.meta.predict_proba(F_te) if kind == 'classification'
+                    else ens.meta.predict(F_te))
+        rows.append({'ensemble': label, 'members': len(group),
+                     'ms per 1k rows': sum(m['ms'] for m in group), **score(y_te, pred)})
+        ensemble = ens
+    return ensemble, pd.DataFrame(path), pd.DataFrame(rows)
+
+
+def save_bundle(ensemble, task, path):
+    names = [n for n, _, _ in ensemble.members]
+    name = names[0] if ensemble.meta is None else f'Stacked ({" + ".join(names)})'
+    bundle = {'model': ensemble, 'name': name,
+              'feature_cols': ensemble.feature_cols}
+    if ensemble.kind == 'classification':
+        bundle['classes'] = CLASSES
+    else:
+        bundle['task'] = {'fpvi': 'FPVI', 'market_value': 'market value'}[task]
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(bundle, f)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.stacking',
+                                     description='Stack the leaderboard models without refitting.')
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--task', choices=TASKS, default='fpvi')
+    parser.add_argument('--min-gain-per-ms', type=float, default=MIN_GAIN_PER_MS,
+                        help='keep a member only if its validation gain per ms of '
+                             'inference (per 1 000 rows) reaches this')
+    parser.add_argument('--workers', type=int, default=1, help='zoo workers for uncached fits')
+    parser.add_argument('--out', help='save the pruned ensemble as a best_*.pkl-style bundle')
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    ensemble, path, report = stack(args.task, args.store, args.min_gain_per_ms, args.workers)
+    loss = 'log loss' if args.task == 'risk' else 'log RMSE'
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(f'Selection path (validation {loss}, cross-validated meta-learner):')
+        print(path.round(5).to_string(index=False))
+        print('\nTest split:')
+        print(report.round(4).to_string(index=False))
+    print(f'\nPruned ensemble: {", ".join(n for n, _, _ in ensemble.members)} '
+          f'({time.perf_counter() - t0:.1f}s)')
+    if args.out:
+        save_bundle(ensemble, args.task, args.out)
+        print(f'Saved → {args.out}')
+
+
+if __name__ == '__main__':
+    from fpv.stacking import main   # pickle StackedEnsemble under its import path
+    main()
@@ -0,0 +1,320 @@
+"""
+Columnar, memory-mapped feature store replacing `processed_data.pkl`.
+
+Layout of a store directory:
+
+    meta.json           feature_cols, split sizes, array catalogue
+    preprocess.pkl      fitted StandardScaler + risk OrdinalEncoder (a few KB)
+    X_train.npy ...     one column-major (Fortran) matrix per split
+    index_train.npy ... original row labels per split
+    y_cls_tr.npy ...    one 1-D array per target and split
+
+Every array is opened with `np.load(mmap_mode='r')`, so reading `X_train`
+or `y_cls_te` touches only that file, and each feature column of an X split
+is a contiguous zero-copy slice. Scaled matrices (`X_*_sc`) are not stored;
+they are derived on demand from the stored scaler.
+
+`write_store` checks every feature column and target against the
+fpv.schema ranges and stores the risk codes as uint8. X splits stay one
+float64 matrix each (the scaler and the linear models read them as is);
+their compact per-column dtypes are an on-demand view, `store.compact`.
+Each array's dtype is recorded in meta.json and checked when it is opened.
+
+`FeatureStore` is a read-only mapping with the same keys as the old pickle
+bundle, so `d = FeatureStore(path)` is a drop-in for `d = pickle.load(f)`.
+"""
+
+import argparse
+import json
+import pickle
+import time
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import CLASSES, DATA_PATH, OUTPUTS_DIR, RANDOM_STATE
+from .trace import span
+
+STORE_DIR      = OUTPUTS_DIR / 'feature_store'
+FORMAT_VERSION = 1
+
+# Files fpv.incremental keeps inside the store directory; `write_store` never
+# writes them, so they are not part of the store's content.
+MANIFEST      = 'manifest.npz'
+VOCAB         = 'vocab.json'
+SIDECAR_FILES = (MANIFEST, VOCAB)
+
+SPLITS      = {'train': ('X_train', 'tr'), 'val': ('X_val', 'val'), 'test': ('X_test', 'te')}
+TARGET_SETS = {                       # key prefix -> Series name
+    'y_mv_log':   'log_market_value',
+    'y_mv_raw':   'market_value_million_eur',
+    'y_fpvi_log': 'log_fpvi',
+    'y_fpvi_raw': 'fpvi',
+    'y_cls':      'transfer_risk_encoded',
+}
+META_KEYS = ('feature_cols', 'scaler', 'risk_encoder', 'random_state')
+
+
+def _save(path, arr):
+    # write-then-rename: open memory maps of the old file stay valid
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'wb') as f:
+        np.lib.format.write_array(f, arr, allow_pickle=False)
+    tmp.replace(path)
+
+
+def write_store(bundle, path=STORE_DIR):
+    """
+    Persist a processed-data bundle (the dict built by 02_features) as a
+    feature store. Scaled `X_*_sc` entries are ignored; they are re-derived
+    from `bundle['scaler']` on load.
+    """
+    from .schema import TARGET_SCHEMA, check_column, feature_schema
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    feature_cols = list(bundle['feature_cols'])
+    schema = feature_schema(feature_cols)
+
+    arrays, sizes, mats, problems = {}, {}, {}, []
+    for split, (x_key, suffix) in SPLITS.items():
+        X = mats[x_key] = np.asfortranarray(bundle[x_key][feature_cols].to_numpy(dtype=np.float64))
+        problems += [p for j, c in enumerate(feature_cols)
+                     for p in check_column(f'{x_key}.{c}', X[:, j], schema[c])]
+        for prefix in TARGET_SCHEMA:
+            problems += check_column(f'{prefix}_{suffix}', np.asarray(bundle[f'{prefix}_{suffix}']),
+                                     TARGET_SCHEMA[prefix])
+    if problems:
+        raise ValueError('schema violations:\n  ' + '\n  '.join(problems))
+
+    for split, (x_key, suffix) in SPLITS.items():
+        X = bundle[x_key]
+        sizes[split] = len(X)
+        with span('store.write', rows=len(X), split=split):
+            _save(path / f'{x_key}.npy', mats[x_key])
+            _save(path / f'index_{split}.npy', X.index.to_numpy(dtype=np.int64))
+            arrays[x_key] = {'split': split, 'kind': 'features', 'dtype': mats[x_key].dtype.str}
+
+            for prefix, name in TARGET_SETS.items():
+                key = f'{prefix}_{suffix}'
+                y   = np.asarray(bundle[key])
+                if prefix in TARGET_SCHEMA:
+                    y = y.astype(TARGET_SCHEMA[prefix][0])
+                _save(path / f'{key}.npy', y)
+                arrays[key] = {'split': split, 'kind': 'target', 'name': name,
+                               'dtype': y.dtype.str}
+
+    tmp = path / '.preprocess.pkl.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump({'scaler': bundle['scaler'],
+                     'risk_encoder': bundle.get('risk_encoder')}, f)
+    tmp.replace(path / 'preprocess.pkl')
+
+    meta = {
+        'format':       FORMAT_VERSION,
+        'feature_cols': feature_cols,
+        'splits':       sizes,
+        'arrays':       arrays,
+        'random_state': bundle.get('random_state'),
+    }
+    tmp = path / '.meta.json.tmp'                  # written last: the store is complete
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=1)
+    tmp.replace(path / 'meta.json')
+    return path
+
+
+def build_bundle(df, random_state=RANDOM_STATE):
+    """
+    The 02_features processed-data bundle for a raw player frame: engineered
+    features, targets, the stratified 70 / 15 / 15 split and the fitted
+    StandardScaler / risk OrdinalEncoder.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+
+    from .features import FeatureTransformer, build_targets
+
+    transformer = FeatureTransformer().fit(df)
+    X   = transformer.transform_frame(df)
+    tgt = build_targets(df)
+    risk_enc = OrdinalEncoder(categories=[CLASSES]).fit(df[['transfer_risk_level']])
+
+    y_cls = tgt['transfer_risk_encoded']
+    with span('features.split', rows=len(X)):
+        X_tr, X_tmp, t_tr, t_tmp = train_test_split(X, tgt, test_size=0.30,
+                                                    random_state=random_state, stratify=y_cls)
+        X_val, X_te, t_val, t_te = train_test_split(X_tmp, t_tmp, test_size=0.50,
+                                                    random_state=random_state,
+                                                    stratify=t_tmp['transfer_risk_encoded'])
+    bundle = {'X_train': X_tr, 'X_val': X_val, 'X_test': X_te}
+    for prefix, name in TARGET_SETS.items():
+        for sfx, t in (('tr', t_tr), ('val', t_val), ('te', t_te)):
+            bundle[f'{prefix}_{sfx}'] = t[name]
+    bundle.update({'feature_cols': transformer.feature_cols,
+                   'scaler': StandardScaler().fit(X_tr),
+                   'risk_encoder': risk_enc,
+                   'random_state': random_state})
+    return bundle
+
+
+def convert_pickle(pkl_path=OUTPUTS_DIR / 'processed_data.pkl', path=STORE_DIR):
+    """One-off migration from a legacy `processed_data.pkl` bundle."""
+    with open(pkl_path, 'rb') as f:
+        return write_store(pickle.load(f), path)
+
+
+class FeatureStore(Mapping):
+    """
+    Lazy, read-only view over a feature-store directory.
+
+    `store['X_train']`     DataFrame backed by a memory map (no copy)
+    `store['y_cls_te']`    Series backed by a memory map (no copy)
+    `store['X_test_sc']`   scaled on demand with the stored StandardScaler
+    `store.array(key)`     the raw memory-mapped ndarray
+    `store.column(split, col)` a single contiguous feature column
+    """
+
+    def __init__(self, path=STORE_DIR):
+        self.path = Path(path)
+        with open(self.path / 'meta.json') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported feature-store format: {self.meta.get("format")}')
+        self.feature_cols = self.meta['feature_cols']
+        self._preprocess  = None
+        self._cache       = {}
+
+    # --- Mapping interface ---
+    def _keys(self):
+        keys = list(self.meta['arrays'])
+        keys += [f'{x_key}_sc' for x_key, _ in SPLITS.values()]
+        return keys + list(META_KEYS)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __contains__(self, key):
+        return key in self._keys()
+
+    def __getitem__(self, key):
+        if key == 'feature_cols':
+            return list(self.feature_cols)
+        if key == 'random_state':
+            return self.meta['random_state']
+        if key in ('scaler', 'risk_encoder'):
+            return self.preprocess[key]
+        if key.endswith('_sc') and key[:-3] in self.meta['arrays']:
+            return self.scaled(key[:-3])
+        if key not in self.meta['arrays']:
+            raise KeyError(key)
+
+        spec  = self.meta['arrays'][key]
+        index = pd.Index(self.index(spec['split']))
+        arr   = self.array(key)
+        if spec['kind'] == 'features':
+            return pd.DataFrame(arr, columns=self.feature_cols, index=index, copy=False)
+        return pd.Series(arr, index=index, name=spec['name'], copy=False)
+
+    # --- raw access ---
+    def array(self, key):
+        """Memory-mapped ndarray for a stored key (opened once, then cached)."""
+        if key not in self._cache:
+            if key not in self.meta['arrays'] and not key.startswith('index_'):
+                raise KeyError(key)
+            arr = np.load(self.path / f'{key}.npy', mmap_mode='r')
+            expected = self.meta['arrays'].get(key, {}).get('dtype')
+            if expected is not None and arr.dtype.str != expected:
+                raise ValueError(f'{self.path / key}.npy holds {arr.dtype}, '
+                                 f'meta.json records {np.dtype(expected)}')
+            self._cache[key] = arr
+        return self._cache[key]
+
+    def index(self, split):
+        return self.array(f'index_{split}')
+
+    def column(self, split, col):
+        """One feature column of a split as a zero-copy 1-D view."""
+        return self.array(SPLITS[split][0])[:, self.feature_cols.index(col)]
+
+    @property
+    def preprocess(self):
+        if self._preprocess is None:
+            with open(self.path / 'preprocess.pkl', 'rb') as f:
+                self._preprocess = pickle.load(f)
+        return self._preprocess
+
+    def scaled(self, x_key):
+        """Standardised copy of an X split, derived from the stored scaler."""
+        X = self[x_key]
+        return pd.DataFrame(self.preprocess['scaler'].transform(X),
+                            columns=self.feature_cols, index=X.index)
+
+    def compact(self, key):
+        """
+        An X split or target with the fpv.schema compact dtypes (uint8 flags
+        and one-hots, int16 counts, float32 ratios), range-checked on load.
+        """
+        from .schema import TARGET_SCHEMA, check_column, compact_matrix
+
+        spec = self.meta['arrays'][key]
+        index = pd.Index(self.index(spec['split']))
+        if spec['kind'] == 'features':
+            return compact_matrix(self.array(key), self.feature_cols, index)
+        arr = self.array(key)
+        target = TARGET_SCHEMA.get(key.rsplit('_', 1)[0])
+        if target is not None:
+            problems = check_column(key, arr, target)
+            if problems:
+                raise ValueError('schema violations:\n  ' + '\n  '.join(problems))
+            arr = arr.astype(target[0])
+        return pd.Series(arr, index=index, name=spec['name'], copy=False)
+
+    def model_frame(self, x_key, dtype=np.float32):
+        """
+        An X split (or scaled `_sc` split) as one C-contiguous `dtype` block in a
+        DataFrame that does not copy it. XGBoost, LightGBM and sklearn trees read
+        the block as is; it is built once per store and cached.
+        """
+        key = (x_key, np.dtype(dtype).str)
+        if key not in self._cache:
+            X = self[x_key]
+            arr = np.ascontiguousarray(X.to_numpy(), dtype=dtype)
+            self._cache[key] = pd.DataFrame(arr, columns=self.feature_cols, index=X.index,
+                                            copy=False)
+        return self._cache[key]
+
+    def to_bundle(self):
+        """Materialise the unscaled splits, targets and metadata as an in-memory dict."""
+        bundle = {k: self[k].copy() for k in self.meta['arrays']}
+        bundle.update({k: self[k] for k in META_KEYS})
+        return bundle
+
+    def nbytes(self):
+        """On-disk size of the store in bytes."""
+        return sum(p.stat().st_size for p in self.path.iterdir() if p.is_file())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.store',
+                                     description='Build the feature store from the raw CSV.')
+    parser.add_argument('--data', default=str(DATA_PATH))
+    parser.add_argument('--out', default=str(STORE_DIR))
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    from .schema import read_raw
+    bundle = build_bundle(read_raw(args.data), args.seed)
+    write_store(bundle, args.out)
+    sizes = ' | '.join(f'{s}: {len(bundle[x])}' for s, (x, _) in SPLITS.items())
+    print(f'{sizes} → {args.out} in {time.perf_counter() - t0:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""
+Synthetic player tables in the source CSV schema, at any scale.
+
+`SyntheticModel` learns the distribution of
+`data/fifa_player_performance_market_value.csv` as a Gaussian copula over
+every column:
+
+- categorical columns (position, club, nationality, injury flag,
+  `transfer_risk_level`) and discrete numerics (age, ratings, matches,
+  goals, assists, contract years) keep their exact empirical frequencies;
+- continuous numerics (minutes, market value) use a fine quantile grid;
+- the joint structure is the correlation matrix of the columns' normal
+  scores, where categories are mapped with the distributional transform.
+
+Sampling is one matrix product plus vectorized inverse-CDF lookups, so
+`write` can stream tens of millions of rows in chunks to CSV or Parquet,
+across a process pool. Chunk `i` always draws from the seed `(seed, i)`,
+so the output is identical for any worker count. Generated tables keep the
+raw schema: `build_targets` / `compute_fpvi` apply the 02_features FPVI
+formula to them, and `with_fpvi=True` appends that column directly.
+
+Run: python -m fpv.synthetic out.parquet --rows 20M --workers 8
+     python -m fpv.synthetic out_dir/ --rows 50M --format parquet --workers 8
+     python -m fpv.synthetic --check --rows 200k
+"""
+
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .bench import parse_size
+from .config import DATA_PATH, RANDOM_STATE
+from .features import RAW_COLUMNS, compute_fpvi
+
+ID_COLS       = ['player_id', 'player_name']
+MODEL_COLS    = [c for c in RAW_COLUMNS if c not in ID_COLS]
+MAX_DISCRETE  = 64          # numerics with more distinct values use a quantile grid
+GRID_POINTS   = 1025
+
+
+# ── Model ─────────────────────────────────────────────────────────────────────
+
+class SyntheticModel:
+    """Gaussian copula with empirical marginals for the raw player columns."""
+
+    def __init__(self, marginals, corr):
+        self.marginals = marginals
+        self.corr      = np.asarray(corr, dtype=np.float64)
+        self._chol     = np.linalg.cholesky(self.corr)
+
+    @classmethod
+    def fit(cls, df, seed=RANDOM_STATE):
+        from scipy.special import ndtri
+
+        rng = np.random.RandomState(seed)
+        marginals, scores = {}, []
+        for col in MODEL_COLS:
+            x = df[col].to_numpy()
+            if x.dtype.kind in 'OUSTb' or len(np.unique(x)) <= MAX_DISCRETE:
+                values, codes, counts = np.unique(x, return_inverse=True, return_counts=True)
+                cum = np.concatenate([[0.0], np.cumsum(counts) / len(x)])
+                # distributional transform: uniform within the category's CDF step
+                u = cum[codes] + rng.uniform(size=len(x)) * (cum[codes + 1] - cum[codes])
+                marginals[col] = {'kind': 'discrete', 'values': values.tolist(),
+                                  'cum': cum[1:].tolist(), 'dtype': str(x.dtype)}
+            else:
+                ranks = np.argsort(np.argsort(x + 0.0, kind='stable'), kind='stable')
+                u = (ranks + 0.5) / len(x)
+                q = np.linspace(0, 1, GRID_POINTS)
+                marginals[col] = {'kind': 'continuous', 'probs': q.tolist(),
+                                  'quantiles': np.quantile(x, q).tolist(),
+                                  'dtype': str(x.dtype),
+                                  'decimals': _decimals(x)}
+            scores.append(ndtri(np.clip(u, 1e-9, 1 - 1e-9)))
+        corr = np.corrcoef(np.vstack(scores))
+        return cls(marginals, _nearest_corr(corr))
+
+    # --- sampling ---
+    def sample_columns(self, n_rows, rng):
+        from scipy.special import ndtr
+
+        Z = rng.standard_normal((n_rows, len(MODEL_COLS))) @ self._chol.T
+        U = ndtr(Z)
+        out = {}
+        for j, col in enumerate(MODEL_COLS):
+            m = self.marginals[col]
+            if m['kind'] == 'discrete':
+                idx = np.searchsorted(np.asarray(m['cum']), U[:, j], side='right')
+                values = np.asarray(m['values'], dtype=object if m['dtype'] in ('object', 'str')
+                                    else m['dtype'])
+                out[col] = values[np.minimum(idx, len(values) - 1)]
+            else:
+                x = np.interp(U[:, j], m['probs'], m['quantiles'])
+                out[col] = (np.round(x).astype(m['dtype']) if m['dtype'].startswith('int')
+                            else np.round(x, m['decimals']))
+        return out
+
+    def sample(self, n_rows, seed=RANDOM_STATE, start_id=1, with_fpvi=False):
+        """One table of `n_rows` players (ids from `start_id`)."""
+        rng = np.random.RandomState(seed)
+        ids = np.arange(start_id, start_id + n_rows, dtype=np.int64)
+        cols = {'player_id': ids,
+                'player_name': 'Player_' + pd.Series(ids).astype(str).to_numpy(dtype=object)}
+        cols.update(self.sample_columns(n_rows, rng))
+        df = pd.DataFrame(cols, columns=RAW_COLUMNS)
+        if with_fpvi:
+            df['fpvi'] = compute_fpvi(df, seed=seed)
+        return df
+
+    # --- persistence ---
+    def to_dict(self):
+        return {'marginals': self.marginals, 'corr': self.corr.tolist()}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            d = json.load(f)
+        return cls(d['marginals'], d['corr'])
+
+
+def _decimals(x):
+    """Decimal places used in a float column (0 for integers), capped at 6."""
+    if x.dtype.kind in 'iu':
+        return 0
+    for d in range(7):
+        if np.allclose(x, np.round(x, d)):
+            return d
+    return 6
+
+
+def _nearest_corr(corr, eps=1e-8):
+    """Clip eigenvalues so the correlation matrix is positive definite."""
+    w, V = np.linalg.eigh(corr)
+    c = (V * np.maximum(w, eps)) @ V.T
+    d = np.sqrt(np.diag(c))
+    return c / np.outer(d, d)
+
+
+@lru_cache(maxsize=4)
+def fitted_model(source=str(DATA_PATH), seed=RANDOM_STATE):
+    return SyntheticModel.fit(pd.read_csv(source), seed)
+
+
+def generate(n_rows, seed=RANDOM_STATE, source=DATA_PATH, start_id=1, with_fpvi=False):
+    """`n_rows` synthetic players drawn from the model learned on `source`."""
+    return fitted_model(str(source)).sample(n_rows, seed, start_id, with_fpvi)
+
+
+# ── Streaming writer ──────────────────────────────────────────────────────────
+
+_WORKER = {}
+
+
+def _init_worker(model_dict):
+    _WORKER['model'] = SyntheticModel(model_dict['marginals'], model_dict['corr'])
+
+
+def _chunk(job):
+    """Worker: build chunk `i`; writes it to `part_path` or returns the frame."""
+    i, n_rows, start_id, seed, with_fpvi, part_path = job
+    df = _WORKER['model'].sample(n_rows, seed=[seed, i], start_id=start_id,
+                                 with_fpvi=with_fpvi)
+    if part_path is None:
+        return df
+    _write_frame(df, part_path)
+    return len(df)
+
+
+def _write_frame(df, path):
+    path = Path(path)
+    if path.suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def _jobs(n_rows, chunk_size, seed, with_fpvi, part_dir=None, fmt='parquet'):
+    for i, offset in enumerate(range(0, n_rows, chunk_size)):
+        n = min(chunk_size, n_rows - offset)
+        part = None if part_dir is None else Path(part_dir) / f'part-{i:05d}.{fmt}'
+        yield (i, n, offset + 1, seed, with_fpvi, part)
+
+
+class _Stream:
+    """Appends chunks, in order, to one CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path, self.writer, self.first = Path(path), None, True
+
+    def write(self, df):
+        if self.path.suffix == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self.first else 'a', header=self.first, index=False)
+        self.first = False
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def write(path, n_rows, chunk_size=1_000_000, workers=1, seed=RANDOM_STATE,
+          source=DATA_PATH, with_fpvi=False, fmt='parquet', model=None):
+    """
+    Stream `n_rows` synthetic players to `path`.
+
+    A path with a `.csv` / `.parquet` suffix becomes one file written in
+    chunk order by this process. Any other path is a directory of part files
+    (`part-00000.<fmt>`, ...) written by the workers themselves, which
+    scales with `workers`. Returns the number of rows written.
+    """
+    model = model or fitted_model(str(source))
+    path  = Path(path)
+    single = path.suffix in ('.csv', '.parquet')
+    if not single:
+        path.mkdir(parents=True, exist_ok=True)
+    jobs = _jobs(n_rows, chunk_size, seed, with_fpvi, None if single else path, fmt)
+    sink = _Stream(path) if single else None
+
+    written = 0
+    if workers <= 1:
+        _init_worker(model.to_dict())
+        for job in jobs:
+            out = _chunk(job)
+            written += out if sink is None else len(out)
+            if sink is not None:
+                sink.write(out)
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(model.to_dict(),)) as pool:
+            window = deque()
+            for job in jobs:
+                window.append(pool.submit(_chunk, job))
+                if len(window) >= 2 * workers:
+                    out = window.popleft().result()
+                    written += out if sink is None else len(out)
+                    if sink is not None:
+                        sink.write(out)
+            while window:
+                out = window.popleft().result()
+                written += out if sink is None else len(out)
+                if sink is not None:
+                    sink.write(out)
+    if sink is not None:
+        sink.close()
+    return written
+
+
+# ── Fidelity check ────────────────────────────────────────────────────────────
+
+def compare(synth, source):
+    """Per-column distribution distance and the largest correlation error."""
+    rows = []
+    for col in MODEL_COLS:
+        a, b = synth[col], source[col]
+        if a.dtype.kind in 'iuf' and b.dtype.kind in 'iuf':
+            grid = np.union1d(np.unique(a), np.unique(b))
+            fa = np.searchsorted(np.sort(a), grid, side='right') / len(a)
+            fb = np.searchsorted(np.sort(b), grid, side='right') / len(b)
+            rows.append({'column': col, 'metric': 'KS', 'distance': float(np.abs(fa - fb).max())})
+        else:
+            pa, pb = a.value_counts(normalize=True), b.value_counts(normalize=True)
+            tv = 0.5 * pa.sub(pb, fill_value=0).abs().sum()
+            rows.append({'column': col, 'metric': 'TV', 'distance': float(tv)})
+    num = [c for c in MODEL_COLS if source[c].dtype.kind in 'iuf']
+    corr_err = float(np.abs(synth[num].corr().to_numpy() - source[num].corr().to_numpy()).max())
+    return pd.DataFrame(rows), corr_err
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.synthetic',
+                                     description='Stream synthetic player tables.')
+    parser.add_argument('output', nargs='?', help='.csv / .parquet file, or a directory')
+    parser.add_argument('--rows', default='1M', help='e.g. 100k, 20M')
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet',
+                        help='part-file format when OUTPUT is a directory')
+    parser.add_argument('--with-fpvi', action='store_true', help='append the FPVI column')
+    parser.add_argument('--source', default=str(DATA_PATH))
+    parser.add_argument('--check', action='store_true',
+                        help='compare a sample of --rows against the source instead of writing')
+    args = parser.parse_args(argv)
+
+    n_rows = parse_size(args.rows)
+    if args.check:
+        source = pd.read_csv(args.source)
+        table, corr_err = compare(generate(n_rows, args.seed, args.source), source)
+        print(table.round(4).to_string(index=False))
+        print(f'max |corr error| = {corr_err:.4f}')
+        return
+    if not args.output:
+        parser.error('OUTPUT is required unless --check is given')
+
+    t0 = time.perf_counter()
+    n = write(args.output, n_rows, args.chunk_size, args.workers, args.seed, args.source,
+              args.with_fpvi, args.format)
+    elapsed = time.perf_counter() - t0
+    print(f'{n:,} rows → {args.output} in {elapsed:.1f}s ({n / elapsed:,.0f} rows/s)')
+
+
+if __name__ == '__main__':
+    main()
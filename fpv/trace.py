@@ -0,0 +1,288 @@
+"""
+Timing spans, row counts and peak-memory sampling for the pipeline hot paths.
+
+The features, model-fit, scoring, SHAP and clustering code wraps its
+expensive steps in spans:
+
+    with trace.span('features.transform', rows=len(df)):
+        ...
+
+Tracing is off by default. `span` then returns one shared no-op context
+manager, so an instrumented call costs a global lookup and a function call.
+`enable()` (or `python -m fpv --trace out.json <command>`) installs a
+`Tracer`, which records for every span:
+
+    start / duration         perf_counter_ns (monotonic, shared by processes)
+    rows                     rows processed, where the caller knows them
+    rss / peak / delta       resident memory at entry, the peak a background
+                             thread sampled while the span was open, and the
+                             change at exit (MB)
+
+Work done in process pools is traced too. `pool_map` / `remote` run each
+job under a tracer in the worker and merge its spans back into the parent.
+
+Exports: `write_chrome` (chrome://tracing / Perfetto `traceEvents`),
+`write_json` (spans plus a per-name summary) and `summary` (a text table).
+With `profile_dir` set, each span opened with `profile=True` (one per
+pipeline stage or CLI command) runs under cProfile and is dumped to
+`<profile_dir>/<name>.prof`, ready for snakeviz, flameprof or gprof2dot.
+A nested profiled span pauses the outer profiler, so each dump covers only
+its own stage.
+
+Run: python -m fpv --trace outputs/trace.json --profile outputs/profiles pipeline
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+_TRACER = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+def span(name, rows=None, profile=False, **args):
+    """Context manager timing `name`; a shared no-op while tracing is off."""
+    if _TRACER is None:
+        return _NULL
+    return Span(_TRACER, name, rows, profile, args)
+
+
+def active():
+    return _TRACER
+
+
+def enable(memory=True, profile_dir=None, interval=0.005):
+    """Install (and return) a fresh process-wide tracer."""
+    global _TRACER
+    disable()
+    _TRACER = Tracer(memory, profile_dir, interval)
+    return _TRACER
+
+
+def disable():
+    """Stop tracing; returns the tracer that was active (or None)."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        tracer.stop()
+    return tracer
+
+
+# ── Spans ─────────────────────────────────────────────────────────────────────
+
+class Span:
+    __slots__ = ('tracer', 'name', 'rows', 'profile', 'args', 'start', 'rss', 'peak',
+                 'profiler')
+
+    def __init__(self, tracer, name, rows, profile, args):
+        self.tracer, self.name, self.rows = tracer, name, rows
+        self.profile, self.args = profile, args
+        self.profiler = None
+
+    def set(self, rows=None, **args):
+        """Attach a row count or other arguments known only inside the span."""
+        if rows is not None:
+            self.rows = rows
+        self.args.update(args)
+
+    def __enter__(self):
+        t = self.tracer
+        if self.profile and t.profile_dir is not None:
+            self.profiler = t.push_profiler()
+        if t.rss is not None:
+            self.rss = self.peak = t.rss()
+            t.open.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        t = self.tracer
+        event = {'name': self.name, 'start_ns': self.start, 'dur_ns': end - self.start,
+                 'pid': os.getpid(), 'tid': threading.get_ident(), 'rows': self.rows,
+                 'args': {k: v if isinstance(v, (int, float, bool)) else str(v)
+                          for k, v in self.args.items()}}
+        if exc[0] is not None:
+            event['args']['error'] = exc[0].__name__
+        if t.rss is not None:
+            t.open.remove(self)
+            rss = t.rss()
+            event.update(rss_mb=self.rss / 1e6, peak_mb=max(self.peak, rss) / 1e6,
+                         delta_mb=(rss - self.rss) / 1e6)
+        if self.profiler is not None:
+            t.pop_profiler(self.profiler, self.name)
+        t.events.append(event)
+        return False
+
+
+class Tracer:
+    """Collected span events plus the memory sampler and the profiler stack."""
+
+    def __init__(self, memory=True, profile_dir=None, interval=0.005):
+        self.events = []
+        self.open = []
+        self.origin_ns = time.perf_counter_ns()
+        self.memory, self.interval = memory, interval
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self._profilers = []
+        self._stop = threading.Event()
+        self.rss = None
+        if memory:
+            from .bench import current_rss
+            self.rss = current_rss
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = self.rss()
+            for s in tuple(self.open):
+                if rss > s.peak:
+                    s.peak = rss
+
+    def stop(self):
+        self._stop.set()
+
+    def config(self):
+        """Picklable settings for tracers in worker processes."""
+        return {'memory': self.memory, 'interval': self.interval,
+                'profile_dir': str(self.profile_dir) if self.profile_dir else None}
+
+    def merge(self, events):
+        self.events.extend(events or ())
+
+    # --- cProfile ---
+    def push_profiler(self):
+        import cProfile
+
+        if self._profilers:
+            self._profilers[-1].disable()
+        prof = cProfile.Profile()
+        self._profilers.append(prof)
+        prof.enable()
+        return prof
+
+    def pop_profiler(self, prof, name):
+        prof.disable()
+        self._profilers.remove(prof)
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(self.profile_dir / f'{re.sub(r"[^A-Za-z0-9_.-]+", "_", name)}.prof')
+        if self._profilers:
+            self._profilers[-1].enable()
+
+    # --- exports ---
+    def summary_rows(self):
+        """Per span name: calls, total seconds, rows, rows/s and peak MB."""
+        rows = {}
+        for e in self.events:
+            r = rows.setdefault(e['name'], {'name': e['name'], 'calls': 0, 'seconds': 0.0,
+                                            'rows': 0, 'peak_mb': None})
+            r['calls'] += 1
+            r['seconds'] += e['dur_ns'] / 1e9
+            r['rows'] += e['rows'] or 0
+            if 'peak_mb' in e:
+                r['peak_mb'] = max(r['peak_mb'] or 0.0, e['peak_mb'])
+        for r in rows.values():
+            r['rows_per_s'] = r['rows'] / r['seconds'] if r['rows'] and r['seconds'] else None
+        return sorted(rows.values(), key=lambda r: -r['seconds'])
+
+    def summary(self, top=25):
+        lines = [f'{"span":<36}{"calls":>7}{"seconds":>10}{"rows":>12}{"rows/s":>12}'
+                 f'{"peak MB":>10}']
+        for r in self.summary_rows()[:top]:
+            lines.append(
+                f'{r["name"][:35]:<36}{r["calls"]:>7}{r["seconds"]:>10.3f}'
+                f'{r["rows"] or "":>12}'
+                f'{format(r["rows_per_s"], ",.0f") if r["rows_per_s"] else "":>12}'
+                f'{format(r["peak_mb"], ".1f") if r["peak_mb"] is not None else "":>10}')
+        return '\n'.join(lines)
+
+    def chrome_events(self):
+        """Complete ('X') events in µs from the tracer origin, one track per process."""
+        out, pids = [], {}
+        for e in sorted(self.events, key=lambda e: e['start_ns']):
+            pids.setdefault(e['pid'], 'fpv' if e['pid'] == os.getpid() else f'worker {e["pid"]}')
+            args = dict(e['args'])
+            for k in ('rows', 'rss_mb', 'peak_mb', 'delta_mb'):
+                if e.get(k) is not None:
+                    args[k] = round(e[k], 3) if isinstance(e[k], float) else e[k]
+            out.append({'name': e['name'], 'cat': e['name'].split('.')[0].split(':')[0],
+                        'ph': 'X', 'ts': (e['start_ns'] - self.origin_ns) / 1e3,
+                        'dur': e['dur_ns'] / 1e3, 'pid': e['pid'], 'tid': e['tid'],
+                        'args': args})
+        meta = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                 'args': {'name': label}} for pid, label in pids.items()]
+        return meta + out
+
+    def write_chrome(self, path):
+        _write_json(path, {'traceEvents': self.chrome_events(), 'displayTimeUnit': 'ms'})
+
+    def write_json(self, path):
+        spans = [{**{k: v for k, v in e.items() if k not in ('start_ns', 'dur_ns')},
+                  'start_ms': (e['start_ns'] - self.origin_ns) / 1e6, 'ms': e['dur_ns'] / 1e6}
+                 for e in sorted(self.events, key=lambda e: e['start_ns'])]
+        _write_json(path, {'spans': spans, 'summary': self.summary_rows()})
+
+
+def _write_json(path, obj):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(obj, f, indent=1)
+    tmp.replace(path)
+
+
+# ── Process pools ─────────────────────────────────────────────────────────────
+
+def config():
+    """Settings to hand to worker processes (None while tracing is off)."""
+    return None if _TRACER is None else _TRACER.config()
+
+
+def remote(cfg, fn, *args):
+    """Worker side: run `fn(*args)`, traced if `cfg` is set; returns (result, events)."""
+    global _TRACER
+    if cfg is None:
+        return fn(*args), None
+    outer, _TRACER = _TRACER, Tracer(**cfg)
+    try:
+        return fn(*args), _TRACER.events
+    finally:
+        _TRACER.stop()
+        _TRACER = outer
+
+
+def absorb(out):
+    """Parent side of `remote`: merge the worker's spans and return its result."""
+    result, events = out
+    if _TRACER is not None:
+        _TRACER.merge(events)
+    return result
+
+
+def pool_map(pool, fn, jobs):
+    """`list(pool.map(fn, jobs))`, carrying the workers' spans back when tracing."""
+    if _TRACER is None:
+        return list(pool.map(fn, jobs))
+    jobs = list(jobs)
+    cfg = _TRACER.config()
+    return [absorb(out) for out in pool.map(remote, [cfg] * len(jobs), [fn] * len(jobs), jobs)]
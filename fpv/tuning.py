@@ -0,0 +1,275 @@
+"""
+Budgeted hyperparameter search (successive halving / Hyperband).
+
+Tunes the existing 03 / 04 estimators on the 02_features validation split.
+Each bracket samples many configurations on a small budget and keeps the
+best `1/eta` at every rung while multiplying the budget by `eta`. The budget
+("resource") is either boosting rounds (`n_estimators`) or training rows.
+
+Trials within a rung run in a process pool. Every finished trial is appended
+to a JSON-lines log; configurations are sampled from a seeded generator, so
+re-running with the same log resumes an interrupted search and skips every
+trial already recorded. Trials are keyed by a hash of (params, resource,
+budget), and the log's first line records the search settings (model,
+target, seed, eta, budgets, space) and a hash of the store arrays it fits
+and scores on: a log written by a different search, or on a rebuilt
+store, is refused rather than mixed in.
+
+Run: python -m fpv.tuning --model LightGBM --task regression --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .config import OUTPUTS_DIR, RANDOM_STATE
+from .store import STORE_DIR, FeatureStore
+from .zoo import (array_hash, classifier_specs, model_input, model_specs, set_threads,
+                  thread_budget)
+
+TUNING_DIR = OUTPUTS_DIR / 'tuning'
+
+# name -> {param: (kind, *args)}; kinds: uniform, loguniform, int, choice
+SEARCH_SPACES = {
+    'LightGBM': {
+        'learning_rate':     ('loguniform', 0.01, 0.2),
+        'num_leaves':        ('int', 15, 127),
+        'max_depth':         ('int', 3, 10),
+        'min_child_samples': ('int', 5, 60),
+        'subsample':         ('uniform', 0.5, 1.0),
+        'subsample_freq':    ('int', 1, 5),          # 0 would switch `subsample` off
+        'colsample_bytree':  ('uniform', 0.5, 1.0),
+        'reg_alpha':         ('loguniform', 1e-3, 10.0),
+    },
+    'XGBoost': {
+        'learning_rate':     ('loguniform', 0.01, 0.2),
+        'max_depth':         ('int', 3, 10),
+        'min_child_weight':  ('loguniform', 0.5, 20.0),
+        'subsample':         ('uniform', 0.5, 1.0),
+        'colsample_bytree':  ('uniform', 0.5, 1.0),
+        'reg_alpha':         ('loguniform', 1e-3, 10.0),
+    },
+    'Gradient Boosting': {
+        'learning_rate':     ('loguniform', 0.01, 0.2),
+        'max_depth':         ('int', 2, 6),
+        'min_samples_leaf':  ('int', 1, 20),
+        'subsample':         ('uniform', 0.5, 1.0),
+    },
+    'Random Forest': {
+        'min_samples_leaf':  ('int', 1, 10),
+        'max_features':      ('choice', ['sqrt', 'log2', 0.3, 0.5]),
+        'max_depth':         ('choice', [None, 8, 16, 32]),
+    },
+    'Logistic Regression': {
+        'C':                 ('loguniform', 1e-3, 100.0),
+    },
+}
+
+
+def sample_config(space, rng):
+    params = {}
+    for name, (kind, *args) in space.items():
+        if kind == 'uniform':
+            params[name] = float(rng.uniform(*args))
+        elif kind == 'loguniform':
+            params[name] = float(np.exp(rng.uniform(np.log(args[0]), np.log(args[1]))))
+        elif kind == 'int':
+            params[name] = int(rng.randint(args[0], args[1] + 1))
+        elif kind == 'choice':
+            params[name] = args[0][rng.randint(len(args[0]))]
+        else:
+            raise ValueError(f'Unknown distribution {kind!r} for {name}')
+    return params
+
+
+def _base_spec(task, name, random_state):
+    specs = model_specs(random_state) if task == 'regression' else classifier_specs(random_state)
+    spec = next((s for s in specs if s[0] == name), None)
+    if spec is None:
+        raise ValueError(f'No {task} model named {name!r}')
+    return spec
+
+
+def _y_keys(task, target):
+    if task == 'classification':
+        return 'y_cls_tr', 'y_cls_val'
+    prefix = {'fpvi': 'y_fpvi_log', 'market_value': 'y_mv_log'}[target]
+    return f'{prefix}_tr', f'{prefix}_val'
+
+
+def _evaluate(job):
+    """Worker: fit one configuration on one budget; returns the val loss."""
+    from sklearn.base import clone
+    from sklearn.metrics import log_loss
+
+    task, target, name, params, kind, budget, store_path, seed, n_threads = job
+    d = FeatureStore(store_path)
+    _, model, scaled = _base_spec(task, name, d['random_state'] or RANDOM_STATE)
+    model = set_threads(clone(model).set_params(**params), n_threads)
+
+    X = model_input(d, scaled)
+    X_tr, X_val = X('X_train'), X('X_val')
+    y_tr_key, y_val_key = _y_keys(task, target)
+    y_tr, y_val = d[y_tr_key], d[y_val_key]
+    if kind == 'rounds':
+        model.set_params(n_estimators=int(budget))
+    else:
+        rows = np.random.RandomState(seed).permutation(len(X_tr))[:int(budget)]
+        X_tr, y_tr = X_tr.iloc[np.sort(rows)], y_tr.iloc[np.sort(rows)]
+
+    t0 = time.perf_counter()
+    model.fit(X_tr, y_tr)
+    if task == 'classification':
+        loss = log_loss(y_val, model.predict_proba(X_val), labels=[0, 1, 2])
+    else:
+        loss = float(np.sqrt(np.mean((y_val.to_numpy() - model.predict(X_val)) ** 2)))
+    return float(loss), time.perf_counter() - t0
+
+
+def trial_key(params, resource, budget):
+    """Content key of one trial: the same configuration on the same budget."""
+    blob = json.dumps({'params': params, 'resource': resource, 'budget': int(budget)},
+                      sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+class TrialLog:
+    """
+    Append-only JSON-lines record of finished trials keyed by `trial_key`.
+    The first line is the search `header`; a log with another header is refused.
+    """
+
+    def __init__(self, path, header):
+        self.path = Path(path)
+        self.header = json.loads(json.dumps(header))     # as it reads back from JSON
+        self.done = {}
+        if not self.path.exists():
+            return
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines:
+            return
+        found = lines[0].get('header')
+        if found != self.header:
+            diff = sorted(k for k in set(self.header) | set(found or {})
+                          if (found or {}).get(k) != self.header.get(k))
+            raise ValueError(f'{self.path} was written by a different search '
+                             f'(differs in: {", ".join(diff) or "header missing"}); '
+                             'pass a new --log to start over')
+        for rec in lines[1:]:
+            self.done[rec['key']] = rec
+
+    def get(self, params, resource, budget):
+        return self.done.get(trial_key(params, resource, budget))
+
+    def append(self, rec):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        rec = {'key': trial_key(rec['params'], rec['resource'], rec['budget']), **rec}
+        with open(self.path, 'a') as f:
+            if f.tell() == 0:
+                f.write(json.dumps({'header': self.header}) + '\n')
+            f.write(json.dumps(rec) + '\n')
+        self.done[rec['key']] = rec
+
+
+def hyperband_brackets(min_budget, max_budget, eta, all_brackets):
+    """[(s, n_configs, first_budget)] — one bracket for plain successive halving."""
+    s_max = int(math.floor(math.log(max_budget / min_budget, eta) + 1e-9))
+    brackets = []
+    for s in (range(s_max, -1, -1) if all_brackets else [s_max]):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        brackets.append((s, n, max_budget * eta ** -s))
+    return brackets
+
+
+def search(model, task='regression', target='fpvi', resource=None, eta=3,
+           min_budget=None, max_budget=None, hyperband=False, workers=1,
+           store_path=STORE_DIR, log_path=None, seed=RANDOM_STATE, verbose=True):
+    """
+    Run successive halving (or full Hyperband) for one model and return the
+    best trial of this search's final rungs: {'trial', 'params', 'budget',
+    'loss', ...}.
+    """
+    d = FeatureStore(store_path)
+    space = SEARCH_SPACES.get(model)
+    if space is None:
+        raise ValueError(f'No search space for {model!r}; choose from {list(SEARCH_SPACES)}')
+    _, base, _ = _base_spec(task, model, d['random_state'] or RANDOM_STATE)
+
+    resource = resource or ('rounds' if 'n_estimators' in base.get_params() else 'rows')
+    if max_budget is None:
+        max_budget = base.n_estimators if resource == 'rounds' else d.meta['splits']['train']
+    min_budget = min_budget or max(1, max_budget // eta ** 3)
+    y_keys = _y_keys(task, target)
+    header = {'model': model, 'task': task, 'target': target, 'resource': resource,
+              'seed': seed, 'eta': eta, 'min_budget': min_budget, 'max_budget': max_budget,
+              'space': space, 'data': array_hash(d.array('X_train'), d.array('X_val'),
+                                                 *map(d.array, y_keys))}
+    log = TrialLog(log_path or TUNING_DIR / f'{task}_{target}_{model.replace(" ", "_")}.jsonl',
+                   header)
+    finals = []                                  # this run's final-rung records
+    n_threads = thread_budget(workers)
+
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        for s, n, r in hyperband_brackets(min_budget, max_budget, eta, hyperband):
+            rng = np.random.RandomState(seed + s)
+            trials = {f'b{s}-t{j}': sample_config(space, rng) for j in range(n)}
+            for i in range(s + 1):
+                budget = int(round(r * eta ** i))
+                todo = [t for t in trials if log.get(trials[t], resource, budget) is None]
+                jobs = [(task, target, model, trials[t], resource, budget,
+                         str(d.path), seed, n_threads) for t in todo]
+                outs = pool.map(_evaluate, jobs) if pool else map(_evaluate, jobs)
+                for t, (loss, secs) in zip(todo, outs):
+                    log.append({'trial': t, 'bracket': s, 'rung': i, 'budget': budget,
+                                'resource': resource, 'params': trials[t],
+                                'loss': loss, 'seconds': secs})
+                recs = {t: log.get(p, resource, budget) for t, p in trials.items()}
+                ranked = sorted(trials, key=lambda t: recs[t]['loss'])
+                if i == s:
+                    finals += recs.values()
+                if verbose:
+                    best = recs[ranked[0]]
+                    print(f'bracket {s} rung {i}: {len(trials):3d} trials × {budget:5d} '
+                          f'{resource} ({len(todo)} run, {len(trials) - len(todo)} resumed)  '
+                          f'best loss={best["loss"]:.4f}')
+                trials = {t: trials[t] for t in ranked[:max(1, len(trials) // eta)]}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return min(finals, key=lambda rec: rec['loss'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.tuning', description='Successive-halving search.')
+    parser.add_argument('--model', required=True, choices=list(SEARCH_SPACES))
+    parser.add_argument('--task', choices=['regression', 'classification'], default='regression')
+    parser.add_argument('--target', choices=['fpvi', 'market_value'], default='fpvi')
+    parser.add_argument('--resource', choices=['rounds', 'rows'])
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--min-budget', type=int)
+    parser.add_argument('--max-budget', type=int)
+    parser.add_argument('--hyperband', action='store_true', help='run every bracket')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--log', help='trial log (JSON lines); reused to resume')
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    args = parser.parse_args(argv)
+
+    best = search(args.model, args.task, args.target, args.resource, args.eta,
+                  args.min_budget, args.max_budget, args.hyperband, args.workers,
+                  args.store, args.log, args.seed)
+    print(f'\nBest {args.model}: loss={best["loss"]:.4f} at {best["budget"]} {best["resource"]}')
+    print(json.dumps(best['params'], indent=1))
+
+
+if __name__ == '__main__':
+    main()
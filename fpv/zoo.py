@@ -0,0 +1,343 @@
+"""
+Parallel, cached runner for the 03_regression `MODEL_SPECS` leaderboard.
+
+The (model × target) grid is fanned out over a process pool. Each booster
+gets an explicit thread budget so the pool never oversubscribes the
+machine. Every fitted model is cached on disk under a key built from a hash
+of the data split, the target and the estimator's parameters. Re-running
+with unchanged data and hyperparameters loads the cached fits and rewrites
+`leaderboard_market_value.csv` / `leaderboard_fpvi.csv` without refitting.
+
+Run: python -m fpv.zoo --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import OUTPUTS_DIR, RANDOM_STATE
+from .early_stopping import fit_early_stopping
+from .store import STORE_DIR, FeatureStore
+from .trace import pool_map, span
+
+CACHE_DIR = OUTPUTS_DIR / 'model_cache'
+
+# target name -> (log-target key prefix, raw-target key prefix, leaderboard file)
+TARGETS = {
+    'market_value': ('y_mv_log',   'y_mv_raw',   'leaderboard_market_value.csv'),
+    'fpvi':         ('y_fpvi_log', 'y_fpvi_raw', 'leaderboard_fpvi.csv'),
+}
+TREE_MODELS = ['LightGBM', 'XGBoost', 'Gradient Boosting', 'Random Forest']
+
+
+def model_specs(random_state=RANDOM_STATE):
+    """The 03_regression MODEL_SPECS as (name, estimator, uses_scaled_X)."""
+    from lightgbm import LGBMRegressor
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import RidgeCV
+    from xgboost import XGBRegressor
+
+    return [
+        ('Ridge',
+         RidgeCV(alphas=[0.01, 0.1, 1, 10, 100, 1000], cv=5), True),
+        ('Random Forest',
+         RandomForestRegressor(n_estimators=400, min_samples_leaf=2, max_features='sqrt',
+                               n_jobs=-1, random_state=random_state), False),
+        ('Gradient Boosting',
+         GradientBoostingRegressor(n_estimators=500, learning_rate=0.05, max_depth=4,
+                                   subsample=0.8, min_samples_leaf=5,
+                                   random_state=random_state), False),
+        ('XGBoost',
+         XGBRegressor(n_estimators=600, learning_rate=0.04, max_depth=5, subsample=0.8,
+                      colsample_bytree=0.8, reg_alpha=0.1, random_state=random_state,
+                      verbosity=0), False),
+        ('LightGBM',
+         LGBMRegressor(n_estimators=600, learning_rate=0.04, max_depth=5, num_leaves=40,
+                       subsample=0.8, colsample_bytree=0.8, reg_alpha=0.1,
+                       random_state=random_state, verbose=-1), False),
+    ]
+
+
+def classifier_specs(random_state=RANDOM_STATE):
+    """The 04_classification_shap models as (name, estimator, uses_scaled_X)."""
+    from lightgbm import LGBMClassifier
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from xgboost import XGBClassifier
+
+    return [
+        ('Logistic Regression',
+         LogisticRegression(max_iter=2000, C=1.0, solver='lbfgs',
+                            random_state=random_state), True),
+        ('Random Forest',
+         RandomForestClassifier(n_estimators=400, max_depth=None, min_samples_leaf=2,
+                                max_features='sqrt', n_jobs=-1,
+                                random_state=random_state), False),
+        ('XGBoost',
+         XGBClassifier(n_estimators=500, learning_rate=0.05, max_depth=5, subsample=0.8,
+                       colsample_bytree=0.8, eval_metric='mlogloss',
+                       random_state=random_state, verbosity=0), False),
+        ('LightGBM',
+         LGBMClassifier(n_estimators=500, learning_rate=0.05, max_depth=5, num_leaves=40,
+                        subsample=0.8, colsample_bytree=0.8,
+                        random_state=random_state, verbose=-1), False),
+    ]
+
+
+# ── Hashing / thread budgets ──────────────────────────────────────────────────
+
+THREAD_PARAMS = ('n_jobs', 'nthread', 'num_threads', 'thread_count')
+
+
+def array_hash(*arrays):
+    h = hashlib.sha256()
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str((a.shape, a.dtype.str)).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()[:16]
+
+
+def params_hash(model):
+    """Hash of the estimator class and its parameters, ignoring thread counts."""
+    params = {k: v for k, v in model.get_params().items() if k not in THREAD_PARAMS}
+    blob = json.dumps([type(model).__qualname__, params], sort_keys=True, default=repr)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def set_threads(model, n_threads):
+    """Give an estimator an explicit thread budget (if it is threaded at all)."""
+    params = model.get_params()
+    for key in THREAD_PARAMS:
+        if key in params:
+            model.set_params(**{key: n_threads})
+    return model
+
+
+def thread_budget(workers):
+    return max(1, (os.cpu_count() or 1) // max(workers, 1))
+
+
+# ── Evaluation ────────────────────────────────────────────────────────────────
+
+def score_regression(y_raw_te, pred_log):
+    """03_regression metrics: raw-space RMSE/MAE/R² plus log-space R²."""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    pred_raw = np.clip(np.expm1(pred_log), 0, None)
+    return {
+        'RMSE':   float(np.sqrt(mean_squared_error(y_raw_te, pred_raw))),
+        'MAE':    float(mean_absolute_error(y_raw_te, pred_raw)),
+        'R²':     float(r2_score(y_raw_te, pred_raw)),
+        'R²_log': float(r2_score(np.log1p(y_raw_te), pred_log)),
+    }
+
+
+def score_classification(y_te, proba):
+    """04_classification_shap metrics: accuracy, macro F1, OvR ROC-AUC."""
+    from sklearn.metrics import f1_score, roc_auc_score
+
+    preds = proba.argmax(axis=1)
+    try:
+        auc = float(roc_auc_score(y_te, proba, multi_class='ovr', average='macro'))
+    except ValueError:
+        auc = float('nan')
+    return {
+        'Accuracy':      float((preds == y_te).mean()),
+        'Macro F1':      float(f1_score(y_te, preds, average='macro')),
+        'ROC-AUC (OvR)': auc,
+    }
+
+
+def model_input(store, scaled):
+    """
+    `x_key -> X` for one spec: the float64 scaled frame for linear models, the
+    cached float32 C-contiguous frame (fpv.schema) for trees, which use float32
+    internally anyway, so their fits are unchanged and skip a conversion copy.
+    """
+    if scaled:
+        return lambda x_key: store[f'{x_key}_sc']
+    return store.model_frame
+
+
+def _load_entry(cache_file):
+    with open(cache_file, 'rb') as f:
+        entry = pickle.load(f)
+    entry['cached'] = True
+    return entry
+
+
+def _save_entry(entry, cache_file):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump(entry, f)
+    tmp.replace(cache_file)                      # atomic: no torn cache entries
+    entry['cached'] = False
+    return entry
+
+
+def _fit_task(task):
+    """Worker: fit one (model, target) cell, or load it from the cache."""
+    name, model, scaled, target, key, store_path, cache_dir, n_threads, es_rounds = task
+    cache_file = Path(cache_dir) / f'{key}.pkl'
+    if cache_file.exists():
+        return _load_entry(cache_file)
+
+    d = FeatureStore(store_path)
+    log_key, raw_key, _ = TARGETS[target]
+    X = model_input(d, scaled)
+    X_tr, X_te = X('X_train'), X('X_test')
+
+    set_threads(model, n_threads)
+    t0 = time.perf_counter()
+    with span(f'fit:{name}', rows=len(X_tr), target=target):
+        if es_rounds:
+            best_iter = fit_early_stopping(model, X_tr, d[f'{log_key}_tr'],
+                                           X('X_val'), d[f'{log_key}_val'], es_rounds)
+        else:
+            best_iter = None
+            model.fit(X_tr, d[f'{log_key}_tr'])
+    fit_s = time.perf_counter() - t0
+    with span(f'predict:{name}', rows=len(X_te), target=target):
+        pred_log = model.predict(X_te)
+
+    entry = {'Model': name, 'target': target, 'key': key, 'model_obj': model,
+             'pred_log': pred_log, 'fit_seconds': fit_s, 'best_iteration': best_iter,
+             **score_regression(d[f'{raw_key}_te'].to_numpy(), pred_log)}
+    return _save_entry(entry, cache_file)
+
+
+def build_tasks(store, specs, targets, cache_dir, n_threads, early_stopping=None):
+    tasks = []
+    x_hash = array_hash(store.array('X_train'), store.array('X_test'))
+    for target in targets:
+        log_key, raw_key, _ = TARGETS[target]
+        split_hash = array_hash(store.array(f'{log_key}_tr'), store.array(f'{raw_key}_te'))
+        es = ''
+        if early_stopping:                       # the validation split now matters too
+            es = f'-es{early_stopping}{array_hash(store.array("X_val"), store.array(f"{log_key}_val"))}'
+        for name, model, scaled in specs:
+            key = (f'{target}-{name.replace(" ", "_")}{"-sc" if scaled else "-f32"}'
+                   f'-{x_hash}{split_hash}-{params_hash(model)}{es}')
+            tasks.append((name, model, scaled, target, key,
+                          str(store.path), str(cache_dir), n_threads, early_stopping))
+    return tasks
+
+
+def run_zoo(store_path=STORE_DIR, targets=tuple(TARGETS), workers=1,
+            cache_dir=CACHE_DIR, out_dir=OUTPUTS_DIR, specs=None, write=True,
+            early_stopping=None, n_threads=None):
+    """
+    Fit (or load) every MODEL_SPECS entry for each target and write the
+    leaderboards. Returns {target: [result dict, ...]} in spec order.
+    `early_stopping=N` stops boosters after N rounds without validation gain.
+    """
+    store = FeatureStore(store_path)
+    specs = specs or model_specs(store['random_state'] or RANDOM_STATE)
+    n_threads = n_threads or thread_budget(workers)
+    tasks = build_tasks(store, specs, targets, cache_dir, n_threads, early_stopping)
+
+    if workers <= 1:
+        entries = [_fit_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            entries = pool_map(pool, _fit_task, tasks)
+
+    results = {t: [e for e in entries if e['target'] == t] for t in targets}
+    if write:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        for target, res in results.items():
+            leaderboard(res).to_csv(Path(out_dir) / TARGETS[target][2], index=False)
+    return results
+
+
+def leaderboard(results):
+    cols = ['Model', 'RMSE', 'MAE', 'R²', 'R²_log']
+    return pd.DataFrame([{k: r[k] for k in cols} for r in results]).sort_values('RMSE')
+
+
+def best_tree(results):
+    """Lowest-RMSE tree model (the 03_regression `best_tree` choice)."""
+    return min((r for r in results if r['Model'] in TREE_MODELS), key=lambda r: r['RMSE'])
+
+
+def run_classifiers(store_path=STORE_DIR, specs=None, n_threads=None, out_dir=OUTPUTS_DIR,
+                    write=True, cache_dir=None):
+    """
+    Fit every 04_classification_shap model on the train split and score it on
+    test. Returns result dicts (metrics, `proba`, `model_obj`) sorted by macro
+    F1 like the notebook's `cls_lb`, and writes `classification_leaderboard.csv`.
+    With `cache_dir`, fits are cached like `run_zoo`'s (same key layout).
+    """
+    store = FeatureStore(store_path)
+    specs = specs or classifier_specs(store['random_state'] or RANDOM_STATE)
+    y_tr, y_te = store.array('y_cls_tr'), store.array('y_cls_te')
+    if cache_dir is not None:
+        data_hash = (array_hash(store.array('X_train'), store.array('X_test'))
+                     + array_hash(y_tr, y_te))
+    results = []
+    for name, model, scaled in specs:
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir) / (f'risk-{name.replace(" ", "_")}'
+                                            f'{"-sc" if scaled else "-f32"}'
+                                            f'-{data_hash}-{params_hash(model)}.pkl')
+            if cache_file.exists():
+                results.append(_load_entry(cache_file))
+                continue
+        X = model_input(store, scaled)
+        set_threads(model, n_threads or thread_budget(1))
+        t0 = time.perf_counter()
+        with span(f'fit:{name}', rows=len(y_tr), target='risk'):
+            model.fit(X('X_train'), y_tr)
+        fit_s = time.perf_counter() - t0
+        with span(f'predict_proba:{name}', rows=len(y_te), target='risk'):
+            proba = model.predict_proba(X('X_test'))
+        entry = {'Model': name, 'model_obj': model, 'proba': proba,
+                 'fit_seconds': fit_s, **score_classification(y_te, proba)}
+        results.append(_save_entry(entry, cache_file) if cache_file else entry)
+    results.sort(key=lambda r: -r['Macro F1'])
+    if write:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        cols = ['Model', 'Accuracy', 'Macro F1', 'ROC-AUC (OvR)']
+        pd.DataFrame([{k: r[k] for k in cols} for r in results]).to_csv(
+            Path(out_dir) / 'classification_leaderboard.csv', index=False)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fpv.zoo', description='Parallel cached MODEL_SPECS run.')
+    parser.add_argument('--store', default=str(STORE_DIR))
+    parser.add_argument('--target', choices=list(TARGETS), action='append',
+                        help='restrict to one target (repeatable)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--cache-dir', default=str(CACHE_DIR))
+    parser.add_argument('--out-dir', default=str(OUTPUTS_DIR))
+    parser.add_argument('--early-stopping', type=int, metavar='ROUNDS',
+                        help='stop boosters after ROUNDS rounds without validation gain')
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    results = run_zoo(args.store, tuple(args.target or TARGETS), args.workers,
+                      args.cache_dir, args.out_dir, early_stopping=args.early_stopping)
+    for target, res in results.items():
+        print(f'\n[{target}]')
+        for r in res:
+            src = 'cache' if r['cached'] else f'fit {r["fit_seconds"]:.1f}s'
+            if r.get('best_iteration'):
+                src += f', best_iteration={r["best_iteration"]}'
+            print(f"  {r['Model']:20s} RMSE={r['RMSE']:.2f}  R²={r['R²']:.4f}  ({src})")
+    print(f'\nDone in {time.perf_counter() - t0:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
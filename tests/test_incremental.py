@@ -0,0 +1,44 @@
+"""`fpv.incremental.update` must never fit the model on validation / test rows."""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fpv import incremental
+from fpv.config import DATA_PATH, OUTPUTS_DIR
+from fpv.store import STORE_DIR, FeatureStore
+
+BUNDLE = OUTPUTS_DIR / 'best_regressor.pkl'
+
+pytestmark = pytest.mark.skipif(not (STORE_DIR / 'meta.json').exists() or not BUNDLE.exists(),
+                                reason='needs the built feature store and regressor bundle')
+
+
+def test_held_out_rows_never_reach_continue_boosting(tmp_path, monkeypatch):
+    store_path = tmp_path / 'feature_store'
+    shutil.copytree(STORE_DIR, store_path)
+    store = FeatureStore(store_path)
+    held_out = np.concatenate([store.index('val')[:10], store.index('test')[:10]])
+    train = store.index('train')[:10]
+
+    df = pd.read_csv(DATA_PATH)                  # store labels are CSV row positions
+    df.loc[np.concatenate([held_out, train]), 'goals'] += 5
+    new_path = tmp_path / 'new.csv'
+    df.to_csv(new_path, index=False)
+
+    fitted = []
+
+    def spy(model, X, y, rounds):
+        fitted.append(X.index)
+        return model
+
+    monkeypatch.setattr(incremental, 'continue_boosting', spy)
+    report = incremental.update(new_path, BUNDLE, store_path, out_path=tmp_path / 'bundle.pkl')
+
+    assert report['changed'] == len(held_out) + len(train)
+    assert report['unseen_by_model'] == len(train)
+    assert len(fitted) == 1
+    assert not fitted[0].isin(held_out).any()
+    assert fitted[0].isin(train).sum() == len(train)
@@ -0,0 +1,39 @@
+"""Stage keys cover the code a stage declares, not every module it imports."""
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+KEYS = """
+import json
+from fpv.pipeline import STAGES, stage_key
+digests = {a: 'x' for spec in STAGES.values() for a in spec['inputs']}
+print(json.dumps({name: stage_key(name, digests) for name in STAGES}))
+"""
+
+
+def stage_keys(tree):
+    out = subprocess.run([sys.executable, '-c', KEYS], cwd=tree, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_model_specs_edit_only_reruns_regression(tmp_path):
+    shutil.copytree(ROOT / 'fpv', tmp_path / 'fpv',
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    before = stage_keys(tmp_path)
+
+    zoo = tmp_path / 'fpv' / 'zoo.py'
+    source = zoo.read_text()
+    assert 'RandomForestRegressor(n_estimators=400' in source
+    zoo.write_text(source.replace('RandomForestRegressor(n_estimators=400',
+                                  'RandomForestRegressor(n_estimators=401'))
+    after = stage_keys(tmp_path)
+
+    assert before['regression'] != after['regression']
+    for name in ['classification', 'clustering', 'eda_figures', 'classification_figures']:
+        assert before[name] == after[name], name